@@ -1,6 +1,7 @@
 from flask import Flask
 from app.config import Config
-from app.extensions import db, migrate, cors, scheduler
+from app.extensions import db, cors
+from app.startup import StartupTimer
 import os
 from dotenv import load_dotenv
 
@@ -8,34 +9,82 @@ from dotenv import load_dotenv
 load_dotenv()
 
 def create_app(config_class=Config):
-    """Application factory pattern"""
+    """
+    Application factory pattern
+
+    Booting only loads config, extensions and routes. The schema is managed
+    by Flask-Migrate (`flask db upgrade`). The scheduler is never started
+    here, so the `flask` CLI and other scripts don't run jobs: worker.py,
+    gunicorn's post_worker_init and run.py start it.
+    """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    timer = StartupTimer(app.config.get('STARTUP_PROFILE', False))
+
+    # Queued, sampled logging (first, so startup messages go through it)
+    with timer.phase('logging'):
+        from app.log_config import init_logging
+        init_logging(app)
+
+    # JSON encoding and response compression
+    with timer.phase('json'):
+        from app.json_provider import AppJSONProvider
+        from app.compression import init_compression
+
+        app.json = AppJSONProvider(app)
+        init_compression(app)
 
     # Initialize extensions
-    db.init_app(app)
-    migrate.init_app(app, db)
-    cors.init_app(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
+    with timer.phase('extensions'):
+        from app.db_profiles import configure_engine_options, register_engine_events
+
+        from app.metrics import init_metrics
+        from app.profiling import init_profiling
+
+        configure_engine_options(app)
+        db.init_app(app)
+        register_engine_events(app, db)
+        init_metrics(app, db)
+        init_profiling(app, db)
+        cors.init_app(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
+
+        from app.services.change_tracking import init_change_tracking
+        from app.services.circuit_breaker import breakers
+        from app.services.event_bus import event_bus
+        from app.services.lead_writer import lead_writer
+        from app.services.page_lanes import page_lanes
+        init_change_tracking()
+        breakers.init_app(app)
+        event_bus.init_app(app)
+        lead_writer.init_app(app)
+        page_lanes.init_app(app)
+
+    # Migrations are only needed by the `flask` CLI (alembic is slow to import)
+    if os.getenv('FLASK_RUN_FROM_CLI'):
+        with timer.phase('migrate'):
+            from flask_migrate import Migrate
+            Migrate(app, db)
 
     # Register blueprints
-    from app.routes.ads import ads_bp
-    from app.routes.messages import messages_bp
-    from app.routes.leads import leads_bp
-    from app.routes.webhook import webhook_bp
-
-    app.register_blueprint(ads_bp, url_prefix='/api/ads')
-    app.register_blueprint(messages_bp, url_prefix='/api/messages')
-    app.register_blueprint(leads_bp, url_prefix='/api/leads')
-    app.register_blueprint(webhook_bp, url_prefix='/api/webhook')
-
-    # Initialize scheduler
-    if not scheduler.running:
-        from app.jobs.ad_sync_job import schedule_ad_sync
-        schedule_ad_sync(app)
-        scheduler.start()
-
-    # Create tables
-    with app.app_context():
-        db.create_all()
+    with timer.phase('blueprints'):
+        from app.routes.ads import ads_bp
+        from app.routes.messages import messages_bp
+        from app.routes.leads import leads_bp
+        from app.routes.webhook import webhook_bp
+        from app.routes.graph import graph_bp
+        from app.routes.campaigns import campaigns_bp
+
+        app.register_blueprint(ads_bp, url_prefix='/api/ads')
+        app.register_blueprint(messages_bp, url_prefix='/api/messages')
+        app.register_blueprint(leads_bp, url_prefix='/api/leads')
+        app.register_blueprint(webhook_bp, url_prefix='/api/webhook')
+        app.register_blueprint(graph_bp, url_prefix='/api/graph')
+        app.register_blueprint(campaigns_bp, url_prefix='/api/campaigns')
+
+        if app.config.get('METRICS_ENABLED'):
+            from app.routes.metrics import metrics_bp
+            app.register_blueprint(metrics_bp, url_prefix='/metrics')
+
+    timer.report(app.logger)
 
     return app
@@ -0,0 +1,172 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from app.routes.webhook import (
+    handle_leadgen_change,
+    iter_leadgen_changes,
+    verify_subscription,
+    verify_webhook_signature,
+)
+
+# Same URL as the Flask webhook blueprint
+WEBHOOK_PATH = '/api/webhook/webhook'
+
+# Facebook deliveries are a few KB; larger bodies are rejected before buffering
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class WebhookASGIApp:
+    """
+    ASGI receiver for Facebook webhook deliveries
+
+    Serves GET (subscription verification) and POST (events) on
+    WEBHOOK_PATH; every other path is left to the Flask app behind the
+    reverse proxy. Deliveries are held open on the event loop, so thousands
+    of concurrent ones cost no threads while they wait. The signature check
+    and JSON parsing run on the loop (both are short CPU work on small
+    bodies) and each leadgen event is processed by the regular lead
+    pipeline on a small thread pool. The response is sent once the
+    delivery's leads are stored, like the Flask route, so a crash before
+    that makes Facebook retry.
+
+    Args:
+        flask_app: Flask application providing config, logging and the
+            lead pipeline
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self._executor = None
+
+    @property
+    def executor(self):
+        """Thread pool running the blocking lead pipeline (created on first use)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.flask_app.config['ASGI_WEBHOOK_THREADS'],
+                thread_name_prefix='webhook'
+            )
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] != WEBHOOK_PATH:
+            await _respond(send, 404, {'error': 'Not found'}, self.flask_app)
+            return
+
+        # App context per request task (contexts are contextvars, so tasks don't share them)
+        with self.flask_app.app_context():
+            if scope['method'] == 'GET':
+                await self._verify(scope, send)
+            elif scope['method'] == 'POST':
+                await self._event(scope, receive, send)
+            else:
+                await _respond(send, 405, {'error': 'Method not allowed'}, self.flask_app)
+
+    async def _verify(self, scope, send):
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        mode = query.get('hub.mode', [None])[0]
+        token = query.get('hub.verify_token', [None])[0]
+        challenge = query.get('hub.challenge', [''])[0]
+
+        if verify_subscription(mode, token):
+            await _send(send, 200, challenge.encode('utf-8'), b'text/html; charset=utf-8')
+        else:
+            await _send(send, 403, b'Forbidden', b'text/html; charset=utf-8')
+
+    async def _event(self, scope, receive, send):
+        payload = await _read_body(receive)
+        if payload is None:
+            await _respond(send, 413, {'error': 'Payload too large'}, self.flask_app)
+            return
+
+        headers = dict(scope['headers'])
+        signature = headers.get(b'x-hub-signature-256', b'').decode('latin-1') or None
+        if not verify_webhook_signature(payload, signature):
+            self.flask_app.logger.warning('Invalid webhook signature')
+            await _respond(send, 403, {'error': 'Invalid signature'}, self.flask_app)
+            return
+
+        try:
+            data = self.flask_app.json.loads(payload)
+            if not isinstance(data, dict):
+                raise ValueError('webhook body is not an object')
+        except Exception as e:
+            self.flask_app.logger.error('Failed to parse webhook JSON: %s', e)
+            await _respond(send, 400, {'error': 'Invalid JSON'}, self.flask_app)
+            return
+
+        self.flask_app.logger.info('Received webhook: %s', data.get('object'))
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, self._handle_change, value)
+            for value in iter_leadgen_changes(data)
+        ))
+
+        # Always 200 so Facebook doesn't retry events that failed on our side
+        await _respond(send, 200, {'status': 'ok'}, self.flask_app)
+
+    def _handle_change(self, value):
+        with self.flask_app.app_context():
+            handle_leadgen_change(value)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _shutdown(self):
+        # Finish in-flight leads, then park their queued sends and drain writes
+        from app.services.lead_processor import shutdown_send_lanes
+        from app.services.lead_writer import lead_writer
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        shutdown_send_lanes()
+        lead_writer.shutdown(wait=True)
+
+
+async def _read_body(receive):
+    """Read a request body, or None once it exceeds MAX_BODY_BYTES"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+async def _respond(send, status, data, flask_app):
+    await _send(send, status, flask_app.json.dumps(data).encode('utf-8'), b'application/json')
+
+
+async def _send(send, status, body, content_type):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode('latin-1'))
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,57 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def _compress(data, encoding, app):
+    """Compress response bytes with the negotiated encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=app.config.get('COMPRESS_BR_QUALITY', 4))
+    return gzip.compress(data, compresslevel=app.config.get('COMPRESS_LEVEL', 6))
+
+
+def init_compression(app):
+    """
+    Register negotiated gzip/brotli compression for API responses
+
+    Only buffered responses above COMPRESS_MIN_SIZE with a compressible
+    mimetype are compressed. Brotli is offered only when the brotli package
+    is installed.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = request.accept_encodings.best_match(encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.set_data(_compress(data, encoding, app))
+        response.headers['Content-Encoding'] = encoding
+        return response
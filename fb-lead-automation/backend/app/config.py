@@ -11,21 +11,165 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Engine profile: 'auto' tunes SQLite/PostgreSQL, 'none' uses driver defaults
+    DB_ENGINE_PROFILE = os.getenv('DB_ENGINE_PROFILE', 'auto')
+
+    # SQLite engine profile
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))  # Negative = KiB
+
+    # PostgreSQL engine profile
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+
     # Facebook API configuration
     FACEBOOK_APP_ID = os.getenv('FACEBOOK_APP_ID', '')
     FACEBOOK_APP_SECRET = os.getenv('FACEBOOK_APP_SECRET', '')
     FACEBOOK_ACCESS_TOKEN = os.getenv('FACEBOOK_ACCESS_TOKEN', '')
+    FACEBOOK_GRAPH_URL = os.getenv('FACEBOOK_GRAPH_URL', 'https://graph.facebook.com')
     FACEBOOK_AD_ACCOUNT_ID = os.getenv('FACEBOOK_AD_ACCOUNT_ID', '')
+    # Comma-separated ad accounts to sync; falls back to FACEBOOK_AD_ACCOUNT_ID
+    FACEBOOK_AD_ACCOUNT_IDS = [
+        account_id.strip().replace('act_', '', 1)
+        for account_id in os.getenv('FACEBOOK_AD_ACCOUNT_IDS', '').split(',')
+        if account_id.strip()
+    ]
+
+    # Graph API timeouts and per-family circuit breakers (ads, leads, messages)
+    GRAPH_CONNECT_TIMEOUT_SECONDS = float(os.getenv('GRAPH_CONNECT_TIMEOUT_SECONDS', '5'))
+    GRAPH_READ_TIMEOUT_SECONDS = float(os.getenv('GRAPH_READ_TIMEOUT_SECONDS', '30'))
+    GRAPH_BREAKER_WINDOW = int(os.getenv('GRAPH_BREAKER_WINDOW', '20'))
+    GRAPH_BREAKER_MIN_CALLS = int(os.getenv('GRAPH_BREAKER_MIN_CALLS', '10'))
+    GRAPH_BREAKER_ERROR_RATE = float(os.getenv('GRAPH_BREAKER_ERROR_RATE', '0.5'))
+    GRAPH_BREAKER_SLOW_SECONDS = float(os.getenv('GRAPH_BREAKER_SLOW_SECONDS', '10'))
+    GRAPH_BREAKER_SLOW_RATE = float(os.getenv('GRAPH_BREAKER_SLOW_RATE', '0.5'))
+    GRAPH_BREAKER_COOLDOWN_SECONDS = float(os.getenv('GRAPH_BREAKER_COOLDOWN_SECONDS', '30'))
+    GRAPH_BREAKER_RECOVERY_CALLS = int(os.getenv('GRAPH_BREAKER_RECOVERY_CALLS', '5'))
+
+    # Work parked while a circuit is open is retried with exponential backoff
+    DEFERRED_RETRY_INTERVAL_SECONDS = int(os.getenv('DEFERRED_RETRY_INTERVAL_SECONDS', '60'))
+    DEFERRED_RETRY_BATCH_SIZE = int(os.getenv('DEFERRED_RETRY_BATCH_SIZE', '100'))
+    DEFERRED_RETRY_BASE_SECONDS = int(os.getenv('DEFERRED_RETRY_BASE_SECONDS', '30'))
+    DEFERRED_RETRY_MAX_BACKOFF_SECONDS = int(os.getenv('DEFERRED_RETRY_MAX_BACKOFF_SECONDS', '3600'))
+    # Attempts after which parked work is marked dead (0 retries forever)
+    DEFERRED_MAX_ATTEMPTS = int(os.getenv('DEFERRED_MAX_ATTEMPTS', '10'))
 
     # Messenger API configuration
     PAGE_ACCESS_TOKEN = os.getenv('PAGE_ACCESS_TOKEN', '')
+    # Per-page tokens as comma-separated page_id:token pairs
+    PAGE_ACCESS_TOKENS = dict(
+        pair.strip().split(':', 1)
+        for pair in os.getenv('PAGE_ACCESS_TOKENS', '').split(',')
+        if ':' in pair
+    )
+    # Limits applied to each page's send lane independently
+    PAGE_SEND_CONCURRENCY = int(os.getenv('PAGE_SEND_CONCURRENCY', '2'))
+    PAGE_SEND_RATE_PER_SECOND = float(os.getenv('PAGE_SEND_RATE_PER_SECOND', '10'))
+    # Sends each lane may hold in memory (0 = no limit); the rest are deferred
+    PAGE_SEND_QUEUE_SIZE = int(os.getenv('PAGE_SEND_QUEUE_SIZE', '1000'))
+    # Queued sends still unsent after this long are assumed lost and re-queued
+    STALE_SEND_MINUTES = int(os.getenv('STALE_SEND_MINUTES', '30'))
+    STALE_SEND_INTERVAL_MINUTES = int(os.getenv('STALE_SEND_INTERVAL_MINUTES', '5'))
 
     # Webhook configuration
     VERIFY_TOKEN = os.getenv('VERIFY_TOKEN', 'my_webhook_token')
 
     # Scheduler configuration
     AD_SYNC_INTERVAL_MINUTES = int(os.getenv('AD_SYNC_INTERVAL_MINUTES', '10'))
+    AD_SYNC_MAX_WORKERS = int(os.getenv('AD_SYNC_MAX_WORKERS', '8'))
+    # Safety cap on ads fetched per account (0 = no limit); a capped account
+    # is not checked for ads to deactivate
+    AD_SYNC_MAX_ADS = int(os.getenv('AD_SYNC_MAX_ADS', '0'))
     SCHEDULER_API_ENABLED = True
+    # Whether gunicorn workers and run.py start the scheduler (create_app never does)
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() in ['true', '1', 'yes']
+    SCHEDULER_LEASE_TTL_SECONDS = int(os.getenv('SCHEDULER_LEASE_TTL_SECONDS', '30'))
+    SCHEDULER_HEARTBEAT_SECONDS = int(os.getenv('SCHEDULER_HEARTBEAT_SECONDS', '10'))
+
+    # Logging (records are written by a background thread, see app/log_config.py)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # 'json' or 'text'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # Per-message sampling: at most LOG_RATE_LIMIT records per window (0 = off)
+    LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', '20'))
+    LOG_RATE_WINDOW_SECONDS = float(os.getenv('LOG_RATE_WINDOW_SECONDS', '10'))
+
+    # Log a per-phase breakdown of create_app()
+    STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'false').lower() in ['true', '1', 'yes']
+
+    # Lead retention configuration (0 disables archiving)
+    LEAD_RETENTION_DAYS = int(os.getenv('LEAD_RETENTION_DAYS', '0'))
+    LEAD_ARCHIVE_BATCH_SIZE = int(os.getenv('LEAD_ARCHIVE_BATCH_SIZE', '1000'))
+
+    # Lead backfill configuration
+    LEAD_BACKFILL_WORKERS = int(os.getenv('LEAD_BACKFILL_WORKERS', '4'))
+    LEAD_BACKFILL_DAYS = int(os.getenv('LEAD_BACKFILL_DAYS', '90'))
+    # A run's claim on a form lapses if it stops renewing it for this long
+    LEAD_BACKFILL_CLAIM_SECONDS = int(os.getenv('LEAD_BACKFILL_CLAIM_SECONDS', '600'))
+
+    # Lead writes are group-committed every LEAD_WRITE_BATCH_SIZE writes or
+    # LEAD_WRITE_MAX_DELAY_MS, whichever comes first
+    LEAD_WRITE_BATCH_SIZE = int(os.getenv('LEAD_WRITE_BATCH_SIZE', '100'))
+    LEAD_WRITE_MAX_DELAY_MS = float(os.getenv('LEAD_WRITE_MAX_DELAY_MS', '5'))
+    LEAD_WRITE_TIMEOUT_SECONDS = float(os.getenv('LEAD_WRITE_TIMEOUT_SECONDS', '10'))
+
+    # Event stream configuration
+    EVENT_HISTORY_SIZE = int(os.getenv('EVENT_HISTORY_SIZE', '1000'))
+    EVENT_CLIENT_BUFFER = int(os.getenv('EVENT_CLIENT_BUFFER', '256'))
+    EVENT_HEARTBEAT_SECONDS = int(os.getenv('EVENT_HEARTBEAT_SECONDS', '15'))
+    # Open /api/leads/stream connections per process; each holds a server
+    # thread, so keep this below WEB_THREADS (0 = no limit)
+    EVENT_MAX_STREAMS = int(os.getenv('EVENT_MAX_STREAMS', '2'))
+
+    # Production server (gunicorn.conf.py); 0 workers = 2 * CPU cores + 1
+    PORT = int(os.getenv('PORT', '5000'))
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '0'))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '4'))
+    WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', '5'))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', '60'))
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', '2000'))
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '200'))
+    WEB_PRELOAD = os.getenv('WEB_PRELOAD', 'true').lower() in ['true', '1', 'yes']
+
+    # Optional ASGI webhook receiver (asgi.py): threads running the lead
+    # pipeline for deliveries held open on the event loop
+    ASGI_WEBHOOK_THREADS = int(os.getenv('ASGI_WEBHOOK_THREADS', '8'))
+
+    # Largest array accepted by the bulk template/ad endpoints
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '1000'))
+
+    # Delta sync (?since=): changes per delta before the client has to
+    # refetch everything, and how long tombstones of deleted rows are kept
+    SYNC_MAX_CHANGES = int(os.getenv('SYNC_MAX_CHANGES', '1000'))
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '7'))
 
     # CORS configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
+
+    # Response compression configuration
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() in ['true', '1', 'yes']
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+    COMPRESS_BR_QUALITY = int(os.getenv('COMPRESS_BR_QUALITY', '4'))
+    COMPRESS_MIMETYPES = ['application/json', 'text/plain', 'text/csv']
+
+    # Metrics configuration (Prometheus text format at /metrics)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ['true', '1', 'yes']
+    # Directory shared by all worker processes; empty = this process only
+    METRICS_DIR = os.getenv('METRICS_DIR', '')
+    METRICS_FLUSH_SECONDS = int(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+
+    # Opt-in per-request profiling (see app/profiling.py)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ['true', '1', 'yes']
+    PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
+    # If set, the profile header must carry this value
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_N_PLUS_ONE_THRESHOLD = int(os.getenv('PROFILE_N_PLUS_ONE_THRESHOLD', '5'))
+    PROFILE_BLUEPRINTS = os.getenv('PROFILE_BLUEPRINTS', 'ads,leads,messages,webhook').split(',')
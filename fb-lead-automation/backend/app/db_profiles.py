@@ -0,0 +1,92 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def build_engine_options(config):
+    """
+    Build SQLAlchemy engine options for the configured database backend
+
+    Args:
+        config: Flask config mapping
+
+    Returns:
+        dict: Engine options for SQLALCHEMY_ENGINE_OPTIONS
+    """
+    if config.get('DB_ENGINE_PROFILE') == 'none':
+        return {}
+
+    backend = make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+
+    if backend == 'sqlite':
+        return {
+            'connect_args': {
+                # Seconds the driver waits on a locked database
+                'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                'check_same_thread': False,
+            },
+        }
+
+    if backend == 'postgresql':
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            'pool_recycle': config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': True,
+            'connect_args': {
+                'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}",
+            },
+        }
+
+    return {'pool_pre_ping': True}
+
+
+def _sqlite_pragmas(config):
+    return [
+        'PRAGMA journal_mode=WAL',
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+    ]
+
+
+def configure_engine_options(app):
+    """
+    Merge the backend engine profile into SQLALCHEMY_ENGINE_OPTIONS
+
+    Must run before db.init_app, which creates the engine. Options set
+    explicitly in the config take precedence over the profile.
+
+    Args:
+        app: Flask application instance
+    """
+    engine_options = build_engine_options(app.config)
+    engine_options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+
+def register_engine_events(app, db):
+    """
+    Set WAL and tuning pragmas on every new SQLite connection
+
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension, already initialized for the app
+    """
+    if app.config.get('DB_ENGINE_PROFILE') == 'none':
+        return
+
+    if make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name() != 'sqlite':
+        return
+
+    pragmas = _sqlite_pragmas(app.config)
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', set_sqlite_pragmas)
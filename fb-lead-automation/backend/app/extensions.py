@@ -1,10 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
 cors = CORS()
 scheduler = BackgroundScheduler()
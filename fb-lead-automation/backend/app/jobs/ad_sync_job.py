@@ -1,81 +1,374 @@
 from app.extensions import db, scheduler
-from app.models import Ad
-from app.services.facebook_service import FacebookService
-from datetime import datetime
+from app.metrics import ad_sync_duration_seconds, ad_sync_rows_total, ad_sync_account_errors_total
+from app.models import Ad, AdSet, Campaign
+from app.services.change_tracking import session_version
+from app.services.facebook_service import AdListingTruncated
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_
+import queue
+import threading
+import time
 
-def sync_ads_job(app):
+
+def get_ad_account_ids(app):
     """
-    Background job to sync ads from Facebook Marketing API
-    Runs periodically to keep local database in sync
+    Get the ad accounts to sync
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        list: Ad account IDs (without the 'act_' prefix)
+    """
+    account_ids = app.config.get('FACEBOOK_AD_ACCOUNT_IDS') or []
+    if not account_ids and app.config.get('FACEBOOK_AD_ACCOUNT_ID'):
+        account_ids = [app.config['FACEBOOK_AD_ACCOUNT_ID']]
+    return account_ids
+
+
+def fetch_account_ad_pages(app, account_id, pages, stop):
+    """
+    Fetch the ads of one ad account and queue them page by page (runs in a
+    worker thread)
+
+    The queue is bounded, so a worker fetches at most one page ahead of the
+    writer instead of buffering the whole account.
+
+    Args:
+        app: Flask application instance
+        account_id: Ad account ID
+        pages: Queue receiving (account_id, ads) per page, then
+            (account_id, None) on success or (account_id, exception) on error
+            (AdListingTruncated if AD_SYNC_MAX_ADS cut the listing short)
+        stop: Event set when the writer gives up; the worker then stops fetching
     """
+    from app.services.facebook_service import FacebookService
+
     with app.app_context():
         try:
-            app.logger.info('Starting ad sync job...')
-
-            facebook_service = FacebookService()
-            ads_data = facebook_service.get_active_ads()
-
-            if not ads_data:
-                app.logger.warning('No ads fetched from Facebook')
-                return
-
-            # Get all existing ad IDs
-            existing_ad_ids = {ad.ad_id for ad in Ad.query.all()}
-            synced_ad_ids = set()
-
-            # Upsert ads
-            synced_count = 0
-            created_count = 0
-
-            for ad_data in ads_data:
-                ad_id = ad_data.get('id')
-                synced_ad_ids.add(ad_id)
-
-                ad = Ad.query.filter_by(ad_id=ad_id).first()
-
-                if ad:
-                    # Update existing ad
-                    ad.ad_name = ad_data.get('name', ad.ad_name)
-                    ad.status = ad_data.get('status', ad.status)
-                    ad.is_active = True
-                    ad.last_synced_at = datetime.utcnow()
-                    synced_count += 1
-                else:
-                    # Create new ad
-                    ad = Ad(
-                        ad_id=ad_id,
-                        ad_name=ad_data.get('name', ''),
-                        campaign_id=ad_data.get('campaign', {}).get('id'),
-                        campaign_name=ad_data.get('campaign', {}).get('name'),
-                        adset_id=ad_data.get('adset', {}).get('id'),
-                        adset_name=ad_data.get('adset', {}).get('name'),
-                        status=ad_data.get('status'),
-                        is_active=True,
-                        last_synced_at=datetime.utcnow()
-                    )
-                    db.session.add(ad)
-                    created_count += 1
-
-            # Mark missing ads as inactive (don't delete)
-            missing_ad_ids = existing_ad_ids - synced_ad_ids
-            deactivated_count = 0
-
-            for ad_id in missing_ad_ids:
-                ad = Ad.query.filter_by(ad_id=ad_id).first()
-                if ad and ad.is_active:
-                    ad.is_active = False
-                    deactivated_count += 1
+            for ads in FacebookService(ad_account_id=account_id).get_active_ad_pages():
+                if not _put_page(pages, (account_id, ads), stop):
+                    return
+        except Exception as e:
+            _put_page(pages, (account_id, e), stop)
+            return
 
-            db.session.commit()
+        _put_page(pages, (account_id, None), stop)
+
+
+def _put_page(pages, item, stop):
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def get_ad_page_id(ad_data):
+    """
+    Get the Facebook page an ad runs as from its creative
+
+    Args:
+        ad_data: Ad dictionary from the Marketing API
+
+    Returns:
+        str: Page ID or None if unknown
+    """
+    creative = ad_data.get('creative') or {}
+    if creative.get('actor_id'):
+        return creative['actor_id']
+
+    # effective_object_story_id is '<page_id>_<post_id>'
+    story_id = creative.get('effective_object_story_id') or ''
+    return story_id.split('_', 1)[0] or None
+
+
+def upsert_account_campaigns(account_id, ads_data):
+    """
+    Create the campaigns and ad sets referenced by an account's ads and
+    apply name changes
+
+    A renamed campaign or ad set is a single-row update; its ads only
+    reference it by ID.
+
+    Args:
+        account_id: Ad account ID
+        ads_data: Ads fetched from Facebook for this account
+
+    Returns:
+        dict: created and renamed counts
+    """
+    campaigns = {}
+    adsets = {}
+    for ad_data in ads_data:
+        campaign = ad_data.get('campaign') or {}
+        adset = ad_data.get('adset') or {}
+        if campaign.get('id'):
+            campaigns[campaign['id']] = campaign.get('name')
+        if adset.get('id'):
+            adsets[adset['id']] = (adset.get('name'), campaign.get('id'))
+
+    stats = {'created': 0, 'renamed': 0}
 
-            app.logger.info(
-                f'Ad sync completed: {created_count} created, '
-                f'{synced_count} updated, {deactivated_count} deactivated'
+    existing_campaigns = {
+        campaign.campaign_id: campaign
+        for campaign in Campaign.query.filter(Campaign.campaign_id.in_(campaigns))
+    }
+    for campaign_id, name in campaigns.items():
+        campaign = existing_campaigns.get(campaign_id)
+        if campaign is None:
+            db.session.add(Campaign(campaign_id=campaign_id, account_id=account_id, name=name))
+            stats['created'] += 1
+        elif name is not None and campaign.name != name:
+            campaign.name = name
+            stats['renamed'] += 1
+
+    existing_adsets = {
+        adset.adset_id: adset
+        for adset in AdSet.query.filter(AdSet.adset_id.in_(adsets))
+    }
+    for adset_id, (name, campaign_id) in adsets.items():
+        adset = existing_adsets.get(adset_id)
+        if adset is None:
+            db.session.add(AdSet(adset_id=adset_id, campaign_id=campaign_id, name=name))
+            stats['created'] += 1
+        elif name is not None and adset.name != name:
+            adset.name = name
+            stats['renamed'] += 1
+
+    return stats
+
+
+def upsert_ad_page(account_id, ads_data, synced_at):
+    """
+    Upsert one page of an account's ads
+
+    Args:
+        account_id: Ad account ID
+        ads_data: Ads of one page fetched from Facebook for this account
+        synced_at: Start of the sync run, stored as the ads' last_synced_at
+
+    Returns:
+        dict: total, created and updated counts
+    """
+    existing_ads = {
+        ad.ad_id: ad
+        for ad in Ad.query.filter(Ad.ad_id.in_({ad_data.get('id') for ad_data in ads_data}))
+    }
+
+    created_count = 0
+    updated_count = 0
+
+    for ad_data in ads_data:
+        ad = existing_ads.get(ad_data.get('id'))
+
+        if ad:
+            # Update existing ad
+            ad.ad_name = ad_data.get('name', ad.ad_name)
+            ad.status = ad_data.get('status', ad.status)
+            ad.account_id = account_id
+            ad.page_id = get_ad_page_id(ad_data) or ad.page_id
+            ad.is_active = True
+            ad.last_synced_at = synced_at
+            updated_count += 1
+        else:
+            # Create new ad
+            ad = Ad(
+                ad_id=ad_data.get('id'),
+                account_id=account_id,
+                page_id=get_ad_page_id(ad_data),
+                ad_name=ad_data.get('name', ''),
+                campaign_id=ad_data.get('campaign', {}).get('id'),
+                adset_id=ad_data.get('adset', {}).get('id'),
+                status=ad_data.get('status'),
+                is_active=True,
+                last_synced_at=synced_at
             )
+            db.session.add(ad)
+            created_count += 1
 
-        except Exception as e:
-            app.logger.error(f'Error in ad sync job: {str(e)}')
-            db.session.rollback()
+    return {
+        'total': len(ads_data),
+        'created': created_count,
+        'updated': updated_count
+    }
+
+
+def next_sync_time():
+    """
+    Get the last_synced_at of a new sync run
+
+    Whole seconds, so comparisons hold on databases that drop microseconds,
+    and later than every stored last_synced_at, so back-to-back runs are
+    told apart.
+
+    Returns:
+        datetime: Sync run timestamp
+    """
+    synced_at = datetime.utcnow().replace(microsecond=0)
+    latest = db.session.query(func.max(Ad.last_synced_at)).scalar()
+    if latest is not None and latest.replace(microsecond=0) >= synced_at:
+        synced_at = latest.replace(microsecond=0) + timedelta(seconds=1)
+    return synced_at
+
+
+def deactivate_unsynced_ads(account_id, synced_at):
+    """
+    Mark an account's active ads that this sync run didn't see as inactive
+
+    Runs once every page of the account was upserted. Ads seen by the run
+    have last_synced_at = synced_at, so no set of synced IDs is kept. Only
+    ads belonging to account_id are deactivated, so a failed or partial
+    fetch of another account never touches its ads.
+
+    Args:
+        account_id: Ad account ID
+        synced_at: Start of the sync run
+
+    Returns:
+        int: Number of ads deactivated
+    """
+    return Ad.query.filter(
+        Ad.account_id == account_id,
+        Ad.is_active == True,
+        or_(Ad.last_synced_at.is_(None), Ad.last_synced_at < synced_at)
+    ).update(
+        {'is_active': False, 'change_version': session_version(db.session)},
+        synchronize_session=False
+    )
+
+
+def run_ad_sync(app):
+    """
+    Sync ads of all configured ad accounts
+
+    Accounts are fetched concurrently and streamed page by page: each page
+    is upserted and committed as it arrives while the workers fetch the next
+    ones, so memory stays at a few pages and writes overlap network waits.
+    An account's missing ads are deactivated only after all of its pages
+    were written, and never when AD_SYNC_MAX_ADS cut its listing short
+    (reported as truncated); one account's error doesn't affect the others.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        dict: Totals plus per-account stats and errors
+    """
+    started = time.perf_counter()
+    account_ids = get_ad_account_ids(app)
+    max_workers = max(1, min(len(account_ids), app.config.get('AD_SYNC_MAX_WORKERS', 8)))
+    summary = {'total': 0, 'created': 0, 'updated': 0, 'deactivated': 0, 'accounts': {}}
+
+    if not account_ids:
+        return summary
+
+    accounts = {
+        account_id: {'total': 0, 'created': 0, 'updated': 0, 'deactivated': 0}
+        for account_id in account_ids
+    }
+    pages = queue.Queue(maxsize=max_workers)
+    stop = threading.Event()
+
+    with app.app_context(), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        synced_at = next_sync_time()
+        try:
+            for account_id in account_ids:
+                executor.submit(fetch_account_ad_pages, app, account_id, pages, stop)
+
+            pending = set(account_ids)
+            while pending:
+                account_id, item = pages.get()
+                stats = accounts[account_id]
+                if 'error' in stats:
+                    # Drain the rest of an account whose write failed
+                    if not isinstance(item, list):
+                        pending.discard(account_id)
+                    continue
+
+                try:
+                    if isinstance(item, list):
+                        upsert_account_campaigns(account_id, item)
+                        for key, count in upsert_ad_page(account_id, item, synced_at).items():
+                            stats[key] += count
+                        db.session.commit()
+                        continue
+
+                    pending.discard(account_id)
+                    if isinstance(item, AdListingTruncated):
+                        app.logger.warning('%s; its missing ads are not deactivated', item)
+                        stats['truncated'] = True
+                    elif item is not None:
+                        stats['error'] = str(item)
+                    elif not stats['total']:
+                        stats['error'] = 'No ads fetched from Facebook'
+                    else:
+                        stats['deactivated'] = deactivate_unsynced_ads(account_id, synced_at)
+                        db.session.commit()
+
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error('Error syncing ad account %s: %s', account_id, e)
+                    stats['error'] = str(e)
+
+        finally:
+            stop.set()
+
+        for account_id, stats in accounts.items():
+            if 'error' in stats:
+                # Pages committed before the error are kept, like an interrupted run
+                summary['accounts'][account_id] = {'error': stats['error']}
+                continue
+
+            summary['accounts'][account_id] = stats
+            for key in ('total', 'created', 'updated', 'deactivated'):
+                summary[key] += stats[key]
+
+        # Ads synced before accounts were tracked have no account_id; they can
+        # only be deactivated once every account was fetched successfully
+        if all(
+            'error' not in stats and not stats.get('truncated')
+            for stats in summary['accounts'].values()
+        ):
+            summary['deactivated'] += Ad.query.filter(
+                Ad.account_id.is_(None),
+                Ad.is_active == True
+            ).update(
+                {'is_active': False, 'change_version': session_version(db.session)},
+                synchronize_session=False
+            )
+            db.session.commit()
+
+    ad_sync_duration_seconds.observe(time.perf_counter() - started)
+    for action in ('created', 'updated', 'deactivated'):
+        ad_sync_rows_total.inc(action, amount=summary[action])
+    ad_sync_account_errors_total.inc(
+        amount=sum(1 for stats in summary['accounts'].values() if 'error' in stats)
+    )
+
+    return summary
+
+
+def sync_ads_job(app):
+    """
+    Background job to sync ads from Facebook Marketing API
+    Runs periodically to keep local database in sync
+    """
+    app.logger.info('Starting ad sync job...')
+
+    summary = run_ad_sync(app)
+
+    for account_id, stats in summary['accounts'].items():
+        if 'error' in stats:
+            app.logger.warning('Ad sync failed for account %s: %s', account_id, stats['error'])
+
+    app.logger.info(
+        'Ad sync completed: %d created, %d updated, %d deactivated across %d accounts',
+        summary['created'], summary['updated'], summary['deactivated'], len(summary['accounts'])
+    )
 
 
 def schedule_ad_sync(app):
@@ -96,4 +389,4 @@ def schedule_ad_sync(app):
         replace_existing=True
     )
 
-    app.logger.info(f'Ad sync job scheduled to run every {interval_minutes} minutes')
+    app.logger.info('Ad sync job scheduled to run every %s minutes', interval_minutes)
@@ -0,0 +1,110 @@
+from app.extensions import db, scheduler
+from app.models import DeferredWork
+from app.services.circuit_breaker import breakers
+from app.services.deferred_work import KIND_FAMILIES, retry_delay
+from datetime import datetime
+
+
+def retry_deferred_work(app):
+    """
+    Replay parked lead fetches and Messenger sends that are due
+
+    Work whose circuit is still open and cooling down is left for the next
+    run. Replayed work that fails on the Graph API again is parked anew by
+    its handler with one more attempt.
+
+    Lead fetches run inside the job. Messenger sends run on their page's send
+    lane, so their item stays stored, rescheduled as if the send failed,
+    until the send deletes it: a send lost with its process is replayed.
+    A send whose lane is full waits for its next replay.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        dict: replayed, waiting and failed counts
+    """
+    from app.services.lead_processor import process_lead, deliver_lead_message
+    from app.services.page_lanes import LaneFull, page_lanes
+
+    stats = {'replayed': 0, 'waiting': 0, 'failed': 0}
+
+    with app.app_context():
+        items = DeferredWork.query.filter(
+            DeferredWork.dead_at.is_(None),
+            DeferredWork.next_attempt_at <= datetime.utcnow()
+        ).order_by(DeferredWork.next_attempt_at).limit(
+            app.config.get('DEFERRED_RETRY_BATCH_SIZE', 100)
+        ).all()
+
+        for item in items:
+            if not breakers.get(KIND_FAMILIES.get(item.kind, item.kind)).accepting():
+                stats['waiting'] += 1
+                continue
+
+            payload = item.get_payload()
+            attempts = (item.attempts or 0) + 1
+            try:
+                if item.kind == 'lead':
+                    process_lead(payload['leadgen_id'], payload['ad_id'], payload['form_id'], attempts=attempts)
+                    db.session.delete(item)
+                    db.session.commit()
+                elif item.kind == 'message':
+                    # In flight: replayed again unless the send reports back first
+                    item.attempts = attempts
+                    item.next_attempt_at = datetime.utcnow() + retry_delay(attempts)
+                    db.session.commit()
+                    page_lanes.submit(
+                        payload['page_id'],
+                        deliver_lead_message,
+                        app,
+                        payload['lead_id'],
+                        payload['page_id'],
+                        payload['message_text'],
+                        attempts,
+                        item.id
+                    )
+                else:
+                    raise ValueError(f'Unknown deferred work kind: {item.kind}')
+
+                stats['replayed'] += 1
+
+            except LaneFull:
+                # Stays in flight and is replayed after its backoff
+                stats['waiting'] += 1
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error('Error replaying deferred %s work %s: %s', item.kind, item.id, e)
+                item.attempts = attempts
+                item.last_error = str(e)
+                item.next_attempt_at = datetime.utcnow() + retry_delay(attempts)
+                db.session.commit()
+                stats['failed'] += 1
+
+        if items:
+            app.logger.info(
+                'Deferred work: %d replayed, %d waiting, %d failed',
+                stats['replayed'], stats['waiting'], stats['failed']
+            )
+        return stats
+
+
+def schedule_deferred_work_retry(app):
+    """
+    Schedule the deferred work retry job
+
+    Args:
+        app: Flask application instance
+    """
+    interval_seconds = app.config.get('DEFERRED_RETRY_INTERVAL_SECONDS', 60)
+
+    scheduler.add_job(
+        id='retry_deferred_work',
+        func=retry_deferred_work,
+        args=[app],
+        trigger='interval',
+        seconds=interval_seconds,
+        replace_existing=True
+    )
+
+    app.logger.info('Deferred work retry scheduled to run every %s seconds', interval_seconds)
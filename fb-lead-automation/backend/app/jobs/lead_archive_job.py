@@ -0,0 +1,130 @@
+from app.extensions import db, scheduler
+from app.models import Lead, LeadField, ArchivedLead, LeadArchiveStat
+from app.services.change_tracking import record_deletes
+from sqlalchemy import select, func, case
+from datetime import datetime, timedelta
+
+ARCHIVED_COLUMNS = [
+    'lead_id', 'ad_id', 'user_fb_id', 'user_name', 'message_sent',
+    'message_text', 'message_sent_at', 'error_message', 'form_data', 'created_at'
+]
+
+
+def archive_lead_batch(lead_ids):
+    """
+    Move a batch of leads into the archive in the current transaction
+
+    Copies the rows into archived_leads, adds them to the per-ad archive
+    counters and deletes them (and their normalized fields) from the hot
+    tables. Delta sync clients see archived leads as deleted.
+
+    Args:
+        lead_ids: Primary keys of the leads to archive
+    """
+    leads_table = Lead.__table__
+
+    db.session.execute(
+        ArchivedLead.__table__.insert().from_select(
+            ['original_id'] + ARCHIVED_COLUMNS,
+            select(leads_table.c.id, *[leads_table.c[name] for name in ARCHIVED_COLUMNS])
+            .where(leads_table.c.id.in_(lead_ids))
+        )
+    )
+
+    counts = db.session.execute(
+        select(
+            Lead.ad_id,
+            func.count(Lead.id),
+            func.sum(case((Lead.message_sent == True, 1), else_=0)),
+            func.sum(case(
+                ((Lead.message_sent == False) & Lead.error_message.isnot(None), 1),
+                else_=0
+            ))
+        ).where(Lead.id.in_(lead_ids)).group_by(Lead.ad_id)
+    ).all()
+
+    for ad_id, total, sent, failed in counts:
+        stat = db.session.get(LeadArchiveStat, ad_id)
+        if not stat:
+            stat = LeadArchiveStat(ad_id=ad_id, total=0, sent=0, failed=0)
+            db.session.add(stat)
+        stat.total += total
+        stat.sent += sent or 0
+        stat.failed += failed or 0
+
+    record_deletes(db.session, 'lead', select(leads_table.c.id).where(leads_table.c.id.in_(lead_ids)))
+    db.session.execute(LeadField.__table__.delete().where(LeadField.lead_id.in_(lead_ids)))
+    db.session.execute(leads_table.delete().where(leads_table.c.id.in_(lead_ids)))
+
+
+def archive_leads_job(app):
+    """
+    Background job that moves leads past the retention age to the archive
+
+    Works in id-ordered batches, one transaction per batch, so the hot
+    leads table stays small without long-running locks.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        int: Number of leads archived
+    """
+    with app.app_context():
+        retention_days = app.config.get('LEAD_RETENTION_DAYS', 0)
+        if not retention_days:
+            return 0
+
+        batch_size = app.config.get('LEAD_ARCHIVE_BATCH_SIZE', 1000)
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        archived_count = 0
+
+        try:
+            app.logger.info('Starting lead archive job (cutoff %s)...', cutoff.isoformat())
+
+            while True:
+                lead_ids = [
+                    lead_id for (lead_id,) in
+                    db.session.query(Lead.id)
+                    .filter(Lead.created_at < cutoff)
+                    .order_by(Lead.id)
+                    .limit(batch_size)
+                ]
+                if not lead_ids:
+                    break
+
+                archive_lead_batch(lead_ids)
+                db.session.commit()
+                archived_count += len(lead_ids)
+
+            app.logger.info('Lead archive completed: %s leads archived', archived_count)
+
+        except Exception as e:
+            app.logger.error('Error in lead archive job: %s', e)
+            db.session.rollback()
+
+        return archived_count
+
+
+def schedule_lead_archive(app):
+    """
+    Schedule the lead archive job to run daily when retention is enabled
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('LEAD_RETENTION_DAYS'):
+        return
+
+    scheduler.add_job(
+        id='archive_leads',
+        func=archive_leads_job,
+        args=[app],
+        trigger='interval',
+        hours=24,
+        replace_existing=True
+    )
+
+    app.logger.info(
+        'Lead archive job scheduled for leads older than %s days', app.config['LEAD_RETENTION_DAYS']
+    )
@@ -0,0 +1,318 @@
+from app.extensions import db
+from app.models import Ad, Lead, LeadFormCursor, ArchivedLead
+from app.services.facebook_service import FacebookService
+from app.services.lead_processor import parse_field_data, parse_graph_time, send_lead_message
+from app.services.rollups import RollupDeltas, lead_status
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+import threading
+import uuid
+
+
+def discover_lead_forms(app, ad_ids, max_workers):
+    """
+    Find the lead forms used by the given ads
+
+    Args:
+        app: Flask application instance
+        ad_ids: Facebook ad IDs to inspect
+        max_workers: Size of the request pool
+
+    Returns:
+        set: Lead form IDs
+    """
+    def fetch_form_id(ad_id):
+        with app.app_context():
+            return FacebookService().get_ad_lead_form_id(ad_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return {form_id for form_id in executor.map(fetch_form_id, ad_ids) if form_id}
+
+
+def claim_form(form_id, run_id, ttl):
+    """
+    Create a form's cursor if needed and claim it for a backfill run
+
+    The claim is a conditional UPDATE of the cursor row, so concurrent runs
+    never import the same form; it lapses after ttl unless renewed.
+
+    Args:
+        form_id: Facebook lead form ID
+        run_id: Unique ID of the claiming run
+        ttl: timedelta the claim is held for
+
+    Returns:
+        bool: True if the run holds the claim
+    """
+    if not LeadFormCursor.query.filter_by(form_id=form_id).first():
+        db.session.add(LeadFormCursor(form_id=form_id, leads_imported=0))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Created by a concurrent run
+            db.session.rollback()
+
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        update(LeadFormCursor)
+        .where(
+            LeadFormCursor.form_id == form_id,
+            or_(LeadFormCursor.claimed_until.is_(None), LeadFormCursor.claimed_until < now)
+        )
+        .values(claimed_by=run_id, claimed_until=now + ttl)
+    ).rowcount
+    db.session.commit()
+    return claimed == 1
+
+
+def renew_claim(form_id, run_id, ttl):
+    """Extend a run's claim on a form in the current transaction; False if it was lost"""
+    return db.session.execute(
+        update(LeadFormCursor)
+        .where(LeadFormCursor.form_id == form_id, LeadFormCursor.claimed_by == run_id)
+        .values(claimed_until=datetime.utcnow() + ttl)
+    ).rowcount == 1
+
+
+def release_claim(form_id, run_id):
+    """Drop a run's claim on a form"""
+    db.session.execute(
+        update(LeadFormCursor)
+        .where(LeadFormCursor.form_id == form_id, LeadFormCursor.claimed_by == run_id)
+        .values(claimed_by=None, claimed_until=None)
+    )
+    db.session.commit()
+
+
+def build_lead(lead_data, ad_pk, form_data):
+    """Create an unsaved Lead from a Graph API lead"""
+    lead = Lead(
+        lead_id=lead_data.get('id'),
+        ad_id=ad_pk,
+        user_name=form_data.get('full_name') or form_data.get('first_name'),
+        created_at=parse_graph_time(lead_data.get('created_time'))
+    )
+    lead.set_form_data(form_data)
+    return lead
+
+
+def insert_leads_one_by_one(candidates):
+    """
+    Insert leads in a transaction each, skipping those stored meanwhile
+
+    Args:
+        candidates: (lead_data, ad_pk, form_data) tuples
+
+    Returns:
+        list: (lead, form_data) of the inserted leads
+    """
+    inserted = []
+    for lead_data, ad_pk, form_data in candidates:
+        lead = build_lead(lead_data, ad_pk, form_data)
+        try:
+            db.session.add(lead)
+            deltas = RollupDeltas()
+            deltas.lead_added(lead.ad_id, lead_status(lead.message_sent, lead.error_message))
+            deltas.apply(db.session)
+            db.session.commit()
+            inserted.append((lead, form_data))
+        except IntegrityError:
+            db.session.rollback()
+    return inserted
+
+
+def backfill_form(app, form_id, since, send_messages=False, batch_size=100, default_since=None):
+    """
+    Import leads of a single lead form that are missing locally
+
+    Progress is stored in the form's LeadFormCursor after every page, so an
+    interrupted run resumes from the last committed page. A run claims the
+    form's cursor first and skips the form while another run holds it.
+
+    Args:
+        app: Flask application instance
+        form_id: Facebook lead form ID
+        since: Import leads created after this datetime (UTC)
+        send_messages: Send the ad's template to imported leads
+        batch_size: Graph API page size
+        default_since: Lower bound for forms that have never been backfilled
+
+    Returns:
+        dict: Per-form stats
+    """
+    with app.app_context():
+        stats = {'form_id': form_id, 'fetched': 0, 'imported': 0, 'unknown_ad': 0, 'error': None}
+        started_at = datetime.utcnow()
+        run_id = uuid.uuid4().hex
+        claim_ttl = timedelta(seconds=app.config.get('LEAD_BACKFILL_CLAIM_SECONDS', 600))
+        claimed = False
+
+        try:
+            claimed = claim_form(form_id, run_id, claim_ttl)
+            if not claimed:
+                stats['error'] = 'Form is being backfilled by another run'
+                return stats
+
+            cursor = LeadFormCursor.query.filter_by(form_id=form_id).one()
+            if cursor.after is None:
+                # New run: start after the previous completed run unless an explicit bound is given
+                cursor.since = since or cursor.last_completed_at or default_since
+            db.session.commit()
+
+            ad_ids = dict(db.session.query(Ad.ad_id, Ad.id).all())
+            facebook_service = FacebookService()
+
+            while True:
+                page = facebook_service.get_form_leads_page(
+                    form_id, since=cursor.since, after=cursor.after, limit=batch_size
+                )
+                if page is None:
+                    stats['error'] = 'Failed to fetch leads from Facebook'
+                    return stats
+
+                leads_data = page['leads']
+                stats['fetched'] += len(leads_data)
+
+                # One indexed IN query per page against the lead_id unique indexes
+                page_ids = [lead_data.get('id') for lead_data in leads_data]
+                existing_ids = {
+                    lead_id for (lead_id,) in
+                    db.session.query(Lead.lead_id).filter(Lead.lead_id.in_(page_ids)).union(
+                        db.session.query(ArchivedLead.lead_id).filter(ArchivedLead.lead_id.in_(page_ids))
+                    )
+                }
+
+                candidates = []
+                for lead_data in leads_data:
+                    if lead_data.get('id') in existing_ids:
+                        continue
+                    ad_pk = ad_ids.get(lead_data.get('ad_id'))
+                    if not ad_pk:
+                        stats['unknown_ad'] += 1
+                        continue
+                    candidates.append((lead_data, ad_pk, parse_field_data(lead_data.get('field_data'))))
+
+                new_leads = [
+                    (build_lead(lead_data, ad_pk, form_data), form_data)
+                    for lead_data, ad_pk, form_data in candidates
+                ]
+                try:
+                    db.session.add_all([lead for lead, _ in new_leads])
+                    deltas = RollupDeltas()
+                    for lead, _ in new_leads:
+                        deltas.lead_added(lead.ad_id, lead_status(lead.message_sent, lead.error_message))
+                    deltas.apply(db.session)
+                    db.session.flush()
+                except IntegrityError:
+                    # A webhook stored one of the leads after the dedupe query
+                    db.session.rollback()
+                    new_leads = insert_leads_one_by_one(candidates)
+
+                if not renew_claim(form_id, run_id, claim_ttl):
+                    db.session.rollback()
+                    stats['error'] = 'Form was claimed by another run'
+                    return stats
+                cursor.after = page['after']
+                cursor.leads_imported = (cursor.leads_imported or 0) + len(new_leads)
+                if page['after'] is None:
+                    cursor.since = None
+                    cursor.last_completed_at = started_at
+                db.session.commit()
+                stats['imported'] += len(new_leads)
+
+                if send_messages:
+                    for lead, form_data in new_leads:
+                        send_lead_message(lead, lead.ad, form_data)
+
+                if page['after'] is None:
+                    return stats
+
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error('Error backfilling lead form %s: %s', form_id, e)
+            stats['error'] = str(e)
+            return stats
+
+        finally:
+            if claimed:
+                try:
+                    release_claim(form_id, run_id)
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error('Error releasing claim on lead form %s: %s', form_id, e)
+
+
+def backfill_leads_job(app, since=None, send_messages=False):
+    """
+    Backfill leads that never arrived through the webhook
+
+    Enumerates the lead forms of the synced active ads and imports their
+    leads concurrently on a bounded pool, one form per worker.
+
+    Args:
+        app: Flask application instance
+        since: Import leads created after this datetime (UTC); defaults to
+            each form's last completed run, or LEAD_BACKFILL_DAYS ago
+        send_messages: Send the ad's template to imported leads
+
+    Returns:
+        dict: Aggregated stats with per-form results
+    """
+    with app.app_context():
+        max_workers = app.config.get('LEAD_BACKFILL_WORKERS', 4)
+        app.logger.info('Starting lead backfill job...')
+
+        ad_ids = [ad_id for (ad_id,) in db.session.query(Ad.ad_id).filter_by(is_active=True)]
+        db.session.remove()
+
+        if not ad_ids:
+            app.logger.warning('No synced ads to backfill leads for')
+            return {'forms': 0, 'fetched': 0, 'imported': 0, 'results': []}
+
+        form_ids = discover_lead_forms(app, ad_ids, max_workers)
+
+        default_since = datetime.utcnow() - timedelta(days=app.config.get('LEAD_BACKFILL_DAYS', 90))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda form_id: backfill_form(app, form_id, since, send_messages, default_since=default_since),
+                sorted(form_ids)
+            ))
+
+        summary = {
+            'forms': len(form_ids),
+            'fetched': sum(result['fetched'] for result in results),
+            'imported': sum(result['imported'] for result in results),
+            'results': results
+        }
+
+        app.logger.info(
+            'Lead backfill completed: %d imported from %d forms (%d fetched)',
+            summary['imported'], summary['forms'], summary['fetched']
+        )
+        return summary
+
+
+def schedule_lead_backfill(app, since=None, send_messages=False):
+    """
+    Run the lead backfill once in a background thread
+
+    Uses a thread rather than the scheduler so the backfill starts in the
+    process that received the request, even when it is not the scheduler
+    leader.
+
+    Args:
+        app: Flask application instance
+        since: Import leads created after this datetime (UTC)
+        send_messages: Send the ad's template to imported leads
+    """
+    thread = threading.Thread(
+        target=backfill_leads_job,
+        args=[app],
+        kwargs={'since': since, 'send_messages': send_messages},
+        name='lead-backfill',
+        daemon=True
+    )
+    thread.start()
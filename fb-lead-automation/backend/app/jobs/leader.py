@@ -0,0 +1,206 @@
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from sqlalchemy import DateTime, literal, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from app.extensions import db, scheduler
+from app.models import SchedulerLease
+
+
+class db_utcnow(FunctionElement):
+    """
+    Current UTC time of the database server, plus an offset in seconds
+
+    Lease times are computed and compared by the database, so hosts whose
+    clocks drift apart still agree on when a lease expires.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+    name = 'db_utcnow'
+
+    def __init__(self, seconds=0):
+        super().__init__(literal(float(seconds)))
+
+
+@compiles(db_utcnow)
+def _compile_db_utcnow(element, compiler, **kw):
+    seconds = compiler.process(element.clauses, **kw)
+    return f"(CURRENT_TIMESTAMP + {seconds} * INTERVAL '1 second')"
+
+
+@compiles(db_utcnow, 'postgresql')
+def _compile_db_utcnow_postgresql(element, compiler, **kw):
+    seconds = compiler.process(element.clauses, **kw)
+    return f"(TIMEZONE('utc', CURRENT_TIMESTAMP) + {seconds} * INTERVAL '1 second')"
+
+
+@compiles(db_utcnow, 'sqlite')
+def _compile_db_utcnow_sqlite(element, compiler, **kw):
+    # The text format SQLAlchemy stores DateTime values in, so they compare as strings
+    seconds = compiler.process(element.clauses, **kw)
+    return f"STRFTIME('%Y-%m-%d %H:%M:%f000', 'now', CAST({seconds} AS TEXT) || ' seconds')"
+
+
+class SchedulerLeader:
+    """
+    DB-backed leader election for the background scheduler
+
+    Every process that may run scheduled jobs starts the scheduler paused
+    and competes for a lease row. The holder renews the lease on every
+    heartbeat and runs the jobs; when it stops heartbeating the lease
+    expires and another process takes over.
+    """
+
+    def __init__(self, app, name='scheduler'):
+        self.app = app
+        self.name = name
+        self.ttl = timedelta(seconds=app.config.get('SCHEDULER_LEASE_TTL_SECONDS', 30))
+        self.heartbeat = app.config.get('SCHEDULER_HEARTBEAT_SECONDS', 10)
+        self.holder_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def try_acquire(self):
+        """
+        Acquire or renew the lease
+
+        Expiry is judged by the database clock, never the local one.
+
+        Returns:
+            bool: True if this process holds the lease
+        """
+        ttl_seconds = self.ttl.total_seconds()
+        with self.app.app_context():
+            try:
+                result = db.session.execute(
+                    update(SchedulerLease)
+                    .where(
+                        SchedulerLease.name == self.name,
+                        or_(
+                            SchedulerLease.holder == self.holder_id,
+                            SchedulerLease.expires_at < db_utcnow()
+                        )
+                    )
+                    .values(
+                        holder=self.holder_id,
+                        expires_at=db_utcnow(ttl_seconds),
+                        heartbeat_at=db_utcnow()
+                    )
+                )
+
+                if result.rowcount == 0:
+                    if db.session.get(SchedulerLease, self.name) is not None:
+                        db.session.rollback()
+                        return False
+                    db.session.add(SchedulerLease(
+                        name=self.name,
+                        holder=self.holder_id,
+                        expires_at=db_utcnow(ttl_seconds),
+                        heartbeat_at=db_utcnow(),
+                        acquired_at=db_utcnow()
+                    ))
+
+                db.session.commit()
+                return True
+
+            except IntegrityError:
+                # Another process inserted the lease first
+                db.session.rollback()
+                return False
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error('Scheduler lease heartbeat failed: %s', e)
+                return False
+            finally:
+                db.session.remove()
+
+    def release(self):
+        """Give up the lease so another process can take over immediately"""
+        with self.app.app_context():
+            try:
+                db.session.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder_id)
+                    .values(expires_at=db_utcnow())
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error('Failed to release scheduler lease: %s', e)
+            finally:
+                db.session.remove()
+
+    def tick(self):
+        """Run one election round and pause/resume the scheduler accordingly"""
+        leader = self.try_acquire()
+
+        if leader and not self.is_leader:
+            self.app.logger.info('Scheduler leadership acquired by %s', self.holder_id)
+            scheduler.resume()
+        elif not leader and self.is_leader:
+            self.app.logger.warning('Scheduler leadership lost by %s', self.holder_id)
+            scheduler.pause()
+
+        self.is_leader = leader
+        return leader
+
+    def run(self):
+        """Heartbeat until stopped, then release the lease"""
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.heartbeat)
+
+        if self.is_leader:
+            scheduler.pause()
+            self.release()
+            self.is_leader = False
+
+    def start(self):
+        """Run the heartbeat loop in a daemon thread"""
+        self._thread = threading.Thread(target=self.run, name='scheduler-leader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop heartbeating and release the lease"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+def start_scheduler(app, background=True):
+    """
+    Schedule the periodic jobs and start the scheduler under leader election
+
+    The scheduler starts paused; it only runs jobs while this process holds
+    the scheduler lease.
+
+    Args:
+        app: Flask application instance
+        background: Run the election heartbeat in a daemon thread
+
+    Returns:
+        SchedulerLeader: Election handle for this process
+    """
+    from app.jobs.ad_sync_job import schedule_ad_sync
+    from app.jobs.deferred_work_job import schedule_deferred_work_retry
+    from app.jobs.lead_archive_job import schedule_lead_archive
+    from app.jobs.stale_send_job import schedule_stale_send_sweep
+    from app.jobs.tombstone_prune_job import schedule_tombstone_prune
+
+    schedule_ad_sync(app)
+    schedule_deferred_work_retry(app)
+    schedule_lead_archive(app)
+    schedule_stale_send_sweep(app)
+    schedule_tombstone_prune(app)
+    scheduler.start(paused=True)
+
+    leader = SchedulerLeader(app)
+    if background:
+        leader.start()
+    return leader
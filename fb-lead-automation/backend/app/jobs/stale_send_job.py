@@ -0,0 +1,82 @@
+from app.extensions import db, scheduler
+from app.models import Ad, Lead
+from datetime import datetime, timedelta
+
+
+def requeue_stale_sends(app):
+    """
+    Park Messenger sends that were queued long ago but never finished
+
+    Send lanes keep their queue in memory, so sends queued in a process that
+    was killed or crashed are lost with it; their leads stay unsent without
+    an error. Such sends are parked as deferred work and replayed by the
+    deferred work job. STALE_SEND_MINUTES must stay well above the time a
+    full lane takes to drain, or a send still queued elsewhere is repeated.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        int: Number of sends parked
+    """
+    from app.services.lead_processor import park_send
+    from app.services.lead_writer import lead_writer
+
+    with app.app_context():
+        minutes = app.config.get('STALE_SEND_MINUTES', 30)
+        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+
+        try:
+            rows = db.session.query(Lead.id, Ad.page_id, Lead.message_text).join(
+                Ad, Lead.ad_id == Ad.id
+            ).filter(
+                Lead.message_sent.is_(False),
+                Lead.error_message.is_(None),
+                Lead.message_text.isnot(None),
+                Lead.message_queued_at < cutoff
+            ).order_by(Lead.message_queued_at).limit(
+                app.config.get('DEFERRED_RETRY_BATCH_SIZE', 100)
+            ).all()
+
+            writes = [
+                lead_writer.update_lead(
+                    lead_id,
+                    **park_send(
+                        lead_id, page_id, message_text, 0,
+                        f'Send still queued after {minutes} minutes'
+                    )
+                )
+                for lead_id, page_id, message_text in rows
+            ]
+            for write in writes:
+                write.result(timeout=app.config['LEAD_WRITE_TIMEOUT_SECONDS'])
+
+            if rows:
+                app.logger.warning('Re-queued %d sends lost from a send lane', len(rows))
+            return len(rows)
+
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error('Error re-queuing stale sends: %s', e)
+            return 0
+
+
+def schedule_stale_send_sweep(app):
+    """
+    Schedule the stale send sweep
+
+    Args:
+        app: Flask application instance
+    """
+    interval_minutes = app.config.get('STALE_SEND_INTERVAL_MINUTES', 5)
+
+    scheduler.add_job(
+        id='requeue_stale_sends',
+        func=requeue_stale_sends,
+        args=[app],
+        trigger='interval',
+        minutes=interval_minutes,
+        replace_existing=True
+    )
+
+    app.logger.info('Stale send sweep scheduled to run every %s minutes', interval_minutes)
@@ -0,0 +1,68 @@
+from app.extensions import db, scheduler
+from app.models import ChangeSequence, Tombstone
+from sqlalchemy import func
+from datetime import datetime, timedelta
+
+
+def prune_tombstones_job(app):
+    """
+    Background job that deletes delta sync tombstones past their retention
+
+    Clients whose version is older than the pruned tombstones get a reset
+    response and refetch their listings.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        int: Number of tombstones deleted
+    """
+    with app.app_context():
+        retention_days = app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 7)
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+        try:
+            pruned_through = db.session.query(func.max(Tombstone.version)).filter(
+                Tombstone.deleted_at < cutoff
+            ).scalar()
+            if pruned_through is None:
+                return 0
+
+            deleted = Tombstone.query.filter(
+                Tombstone.version <= pruned_through
+            ).delete(synchronize_session=False)
+            ChangeSequence.query.filter(
+                ChangeSequence.id == 1,
+                ChangeSequence.pruned_through < pruned_through
+            ).update({'pruned_through': pruned_through}, synchronize_session=False)
+            db.session.commit()
+
+            app.logger.info('Pruned %d tombstones up to version %d', deleted, pruned_through)
+            return deleted
+
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error('Error pruning tombstones: %s', e)
+            return 0
+
+
+def schedule_tombstone_prune(app):
+    """
+    Schedule the tombstone prune job to run daily
+
+    Args:
+        app: Flask application instance
+    """
+    scheduler.add_job(
+        id='prune_tombstones',
+        func=prune_tombstones_job,
+        args=[app],
+        trigger='interval',
+        hours=24,
+        replace_existing=True
+    )
+
+    app.logger.info(
+        'Tombstone prune job scheduled for tombstones older than %s days',
+        app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 7)
+    )
@@ -0,0 +1,67 @@
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _json_default(obj):
+    """Serialize values the stdlib encoder does not know about"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return _default(obj)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider used by jsonify and request.get_json
+
+    Uses orjson when it is installed and falls back to the stdlib encoder
+    otherwise. Both paths serialize datetimes as ISO 8601 strings, so models
+    can return raw datetime values from to_dict().
+    """
+
+    default = staticmethod(_json_default)
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON to a string
+
+        Args:
+            obj: Data to serialize
+            **kwargs: Extra json.dumps arguments (indent and sort_keys are
+                honoured by the orjson path, anything else falls back to stdlib)
+
+        Returns:
+            str: JSON document
+        """
+        indent = kwargs.pop('indent', None)
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        kwargs.pop('separators', None)
+
+        if orjson is None or kwargs:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            if indent:
+                kwargs['indent'] = indent
+            else:
+                kwargs['separators'] = (',', ':')
+            return super().dumps(obj, sort_keys=sort_keys, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize JSON from a string or bytes"""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
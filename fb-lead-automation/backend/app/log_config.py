@@ -0,0 +1,241 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.metrics import log_records_dropped_total
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Standard LogRecord attributes; anything else on a record came from `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'dropped'}
+
+# Expired sampling windows are pruned once this many message keys are tracked
+_MAX_SAMPLING_KEYS = 10000
+
+
+def _dumps(entry):
+    if orjson is not None:
+        return orjson.dumps(entry, default=str).decode('utf-8')
+    return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        if getattr(record, 'dropped', 0):
+            entry['dropped'] = record.dropped
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return _dumps(entry)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text lines for local development"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        if getattr(record, 'dropped', 0):
+            line += f' ({record.dropped} similar messages dropped)'
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through at most `limit` records per message per window
+
+    Records are keyed by logger, level and the unformatted message template,
+    so calls that pass their values as %-style args share a key however the
+    values differ. Dropped records are counted and reported as `dropped` on
+    the first record let through in the next window.
+    """
+
+    def __init__(self, limit, window):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def filter(self, record):
+        if self.limit <= 0:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        try:
+            with self._lock:
+                state = self._windows.get(key)
+                if state is None or now - state[0] >= self.window:
+                    if state is None and len(self._windows) >= _MAX_SAMPLING_KEYS:
+                        self._prune(now)
+                    dropped = state[2] if state is not None else 0
+                    self._windows[key] = [now, 1, 0]
+                elif state[1] < self.limit:
+                    state[1] += 1
+                    dropped = 0
+                else:
+                    state[2] += 1
+                    dropped = None
+        except TypeError:
+            # Unhashable message object; never sampled
+            return True
+
+        if dropped is None:
+            log_records_dropped_total.inc('sampled')
+            return False
+        if dropped:
+            record.dropped = dropped
+        return True
+
+    def _prune(self, now):
+        for key in [key for key, state in self._windows.items() if now - state[0] >= self.window]:
+            del self._windows[key]
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without blocking the caller
+
+    Records are queued unformatted, so the message is only built (and the
+    JSON encoded) on the writer thread. Log args should therefore be plain
+    values rather than objects that change after the call. When the queue
+    is full the record is dropped and counted instead of waiting.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc('queue_full')
+
+
+class _WriterListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Block rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """Queue handler on the root logger plus the writer thread draining it"""
+
+    def __init__(self):
+        self.handler = None
+        self.output = None
+        self.listener = None
+        self.queue_size = 0
+
+    def start(self, formatter, level, queue_size, rate_limit, rate_window):
+        """
+        (Re)build the pipeline and attach it to the root logger
+
+        Args:
+            formatter: Formatter used by the writer thread
+            level: Root log level
+            queue_size: Max records waiting for the writer thread
+            rate_limit: Records let through per message per window (0 = no sampling)
+            rate_window: Sampling window in seconds
+        """
+        root = logging.getLogger()
+        self.stop()
+        if self.handler is not None:
+            root.removeHandler(self.handler)
+
+        self.queue_size = queue_size
+        self.output = logging.StreamHandler(sys.stderr)
+        self.output.setFormatter(formatter)
+
+        self.handler = AsyncQueueHandler(queue.Queue(maxsize=queue_size))
+        self.handler.addFilter(SamplingFilter(rate_limit, rate_window))
+
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        self._start_listener()
+
+    def _start_listener(self):
+        self.listener = _WriterListener(self.handler.queue, self.output)
+        self.listener.start()
+
+    def stop(self):
+        """Flush queued records and stop the writer thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _after_fork(self):
+        """Give a forked child (e.g. a gunicorn worker) its own queue and writer thread"""
+        if self.handler is None:
+            return
+        self.handler.queue = queue.Queue(maxsize=self.queue_size)
+        for log_filter in self.handler.filters:
+            if isinstance(log_filter, SamplingFilter):
+                log_filter._lock = threading.Lock()
+                log_filter._windows = {}
+        self._start_listener()
+
+
+pipeline = LogPipeline()
+
+atexit.register(pipeline.stop)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=pipeline._after_fork)
+
+
+def init_logging(app):
+    """
+    Route all logging through the non-blocking, sampled pipeline
+
+    Records from every logger (including app.logger) are queued by the root
+    handler and written to stderr by a background thread, as JSON lines when
+    LOG_FORMAT is 'json'. Messages repeated more than LOG_RATE_LIMIT times
+    per LOG_RATE_WINDOW_SECONDS are dropped and counted.
+
+    Args:
+        app: Flask application instance
+    """
+    from flask.logging import default_handler
+
+    formatter = JSONFormatter() if app.config['LOG_FORMAT'] == 'json' else TextFormatter()
+    pipeline.start(
+        formatter,
+        app.config['LOG_LEVEL'],
+        app.config['LOG_QUEUE_SIZE'],
+        app.config['LOG_RATE_LIMIT'],
+        app.config['LOG_RATE_WINDOW_SECONDS']
+    )
+
+    # Flask writes app.logger records straight to stderr otherwise
+    app.logger.removeHandler(default_handler)
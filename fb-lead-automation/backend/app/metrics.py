@@ -0,0 +1,499 @@
+import atexit
+import glob
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+JOB_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        """
+        Increment the counter
+
+        Args:
+            *labelvalues: One value per label name, in order
+            amount: Increment
+        """
+        if not self._registry._flusher_started:
+            self._registry.start_flusher()
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    @staticmethod
+    def _merge(current, value):
+        return (current or 0) + value
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, *labelvalues):
+        """
+        Record an observation
+
+        Args:
+            value: Observed value (seconds for latency histograms)
+            *labelvalues: One value per label name, in order
+        """
+        if not self._registry._flusher_started:
+            self._registry.start_flusher()
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                # Per-bucket (non-cumulative) counts, +Inf bucket, then the sum
+                entry = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[index] += 1
+            entry[-1] += value
+
+    def _samples(self):
+        with self._lock:
+            return [[list(labels), list(entry)] for labels, entry in self._values.items()]
+
+    @staticmethod
+    def _merge(current, value):
+        if current is None:
+            return list(value)
+        return [a + b for a, b in zip(current, value)]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+class MetricsRegistry:
+    """
+    In-process metrics registry with Prometheus text exposition
+
+    Recording only touches in-memory dictionaries. When a directory is
+    configured (METRICS_DIR), every process periodically writes a snapshot
+    of its metrics there and the /metrics endpoint merges the snapshots of
+    all processes. Snapshots of exited processes are folded into an archive
+    file so counters never go backwards.
+    """
+
+    ARCHIVE_FILE = 'archive.json'
+
+    def __init__(self):
+        self._metrics = {}
+        self.directory = None
+        self.flush_interval = 5
+        self._flusher_started = False
+        self._flush_lock = threading.Lock()
+        self._process_file = None
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(self, name, documentation, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(self, name, documentation, labelnames, buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def configure(self, directory=None, flush_interval=5):
+        """
+        Set the shared snapshot directory for multi-process mode
+
+        Args:
+            directory: Directory shared by all worker processes, or None
+            flush_interval: Seconds between snapshot writes
+        """
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def start_flusher(self):
+        """Start the snapshot writer thread for this process (once per process)"""
+        with self._flush_lock:
+            if self._flusher_started:
+                return
+            self._flusher_started = True
+
+        if not self.directory:
+            return
+
+        self._process_file = os.path.join(
+            self.directory,
+            f'metrics-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json'
+        )
+        thread = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        thread.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def snapshot(self):
+        """
+        Get this process's samples
+
+        Returns:
+            dict: Metric name to [[labelvalues, value], ...]
+        """
+        return {name: metric._samples() for name, metric in self._metrics.items()}
+
+    def flush(self):
+        """Write this process's snapshot to the shared directory"""
+        if not self._process_file:
+            return
+        tmp_path = f'{self._process_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'pid': os.getpid(), 'samples': self.snapshot()}, f)
+        os.replace(tmp_path, self._process_file)
+
+    def _after_fork(self):
+        """Start from empty values in a forked child (e.g. gunicorn workers)"""
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+        self._flush_lock = threading.Lock()
+        self._flusher_started = False
+        self._process_file = None
+
+    def _merge_into(self, merged, samples):
+        for name, metric_samples in samples.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            values = merged.setdefault(name, {})
+            for labels, value in metric_samples:
+                key = tuple(labels)
+                values[key] = metric._merge(values.get(key), value)
+
+    def _is_dead(self, path, pid):
+        if f'-{socket.gethostname()}-' not in os.path.basename(path):
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return False
+        return False
+
+    def _collect_directory(self):
+        """Merge all process snapshots, archiving those of exited processes"""
+        self.flush()
+
+        lock_file = open(os.path.join(self.directory, '.lock'), 'a')
+        try:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            archive_path = os.path.join(self.directory, self.ARCHIVE_FILE)
+            merged = {}
+            archive = {}
+            dead_paths = []
+
+            if os.path.exists(archive_path):
+                with open(archive_path) as f:
+                    self._merge_into(archive, json.load(f))
+
+            for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+                try:
+                    with open(path) as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+                if path != self._process_file and self._is_dead(path, data.get('pid')):
+                    self._merge_into(archive, data['samples'])
+                    dead_paths.append(path)
+                else:
+                    self._merge_into(merged, data['samples'])
+
+            if dead_paths:
+                tmp_path = f'{archive_path}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({
+                        name: [[list(labels), value] for labels, value in values.items()]
+                        for name, values in archive.items()
+                    }, f)
+                os.replace(tmp_path, archive_path)
+                for path in dead_paths:
+                    os.remove(path)
+
+            for name, values in archive.items():
+                self._merge_into(merged, {name: [[labels, value] for labels, value in values.items()]})
+
+            return merged
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def collect(self):
+        """
+        Get merged samples for all processes sharing the metrics directory
+
+        Returns:
+            dict: Metric name to {labelvalues: value}
+        """
+        if self.directory:
+            return self._collect_directory()
+
+        merged = {}
+        self._merge_into(merged, self.snapshot())
+        return merged
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text
+        """
+        merged = self.collect()
+        lines = []
+
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+
+            for labels, value in sorted(merged.get(name, {}).items()):
+                if metric.type == 'counter':
+                    lines.append(f'{name}{_format_labels(metric.labelnames, labels)} {value}')
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(metric.buckets + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == '+Inf' else f'le="{_format_bound(bound)}"'
+                    lines.append(
+                        f'{name}_bucket{_format_labels(metric.labelnames, labels, le)} {cumulative}'
+                    )
+                lines.append(f'{name}_sum{_format_labels(metric.labelnames, labels)} {value[-1]}')
+                lines.append(f'{name}_count{_format_labels(metric.labelnames, labels)} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._after_fork)
+
+
+# HTTP
+http_requests_total = registry.counter(
+    'http_requests_total', 'HTTP requests by endpoint and status',
+    ('blueprint', 'endpoint', 'method', 'status')
+)
+http_request_duration_seconds = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ('blueprint', 'endpoint', 'method')
+)
+http_request_sql_statements = registry.histogram(
+    'http_request_sql_statements', 'SQL statements executed per request',
+    ('blueprint', 'endpoint'), buckets=COUNT_BUCKETS
+)
+http_request_sql_seconds = registry.histogram(
+    'http_request_sql_seconds', 'Time spent in SQL per request',
+    ('blueprint', 'endpoint')
+)
+
+# Database
+db_statements_total = registry.counter(
+    'db_statements_total', 'SQL statements executed'
+)
+db_statement_duration_seconds = registry.histogram(
+    'db_statement_duration_seconds', 'SQL statement latency'
+)
+
+# Graph API
+graph_api_requests_total = registry.counter(
+    'graph_api_requests_total', 'Graph API calls by endpoint and outcome',
+    ('service', 'endpoint', 'outcome')
+)
+graph_api_request_duration_seconds = registry.histogram(
+    'graph_api_request_duration_seconds', 'Graph API call latency',
+    ('service', 'endpoint')
+)
+graph_api_errors_total = registry.counter(
+    'graph_api_errors_total', 'Graph API errors by error code',
+    ('service', 'endpoint', 'code')
+)
+
+# Webhook
+webhook_events_total = registry.counter(
+    'webhook_events_total', 'Leadgen webhook events (received, deduped, processed, deferred, skipped, failed)',
+    ('result',)
+)
+
+# Ad sync job
+ad_sync_duration_seconds = registry.histogram(
+    'ad_sync_duration_seconds', 'Ad sync run duration', buckets=JOB_BUCKETS
+)
+ad_sync_rows_total = registry.counter(
+    'ad_sync_rows_total', 'Ads written by the ad sync (created, updated, deactivated)',
+    ('action',)
+)
+ad_sync_account_errors_total = registry.counter(
+    'ad_sync_account_errors_total', 'Ad accounts that failed to sync'
+)
+
+# Lead writer (group commits)
+lead_write_batch_size = registry.histogram(
+    'lead_write_batch_size', 'Lead writes committed per transaction', buckets=COUNT_BUCKETS
+)
+lead_write_commit_seconds = registry.histogram(
+    'lead_write_commit_seconds', 'Time to write and commit one batch of lead writes'
+)
+lead_write_errors_total = registry.counter(
+    'lead_write_errors_total', 'Lead write batches that failed and were retried one by one'
+)
+
+# Logging
+log_records_dropped_total = registry.counter(
+    'log_records_dropped_total', 'Log records dropped (sampled, queue_full)',
+    ('reason',)
+)
+
+
+_request_stats = threading.local()
+
+
+def init_metrics(app, db):
+    """
+    Record HTTP and SQL metrics for the app
+
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension, already initialized for the app
+    """
+    from flask import request
+    from sqlalchemy import event
+
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    registry.configure(app.config.get('METRICS_DIR'), app.config.get('METRICS_FLUSH_SECONDS', 5))
+
+    @app.before_request
+    def start_request_metrics():
+        _request_stats.started = time.perf_counter()
+        _request_stats.sql_count = 0
+        _request_stats.sql_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = getattr(_request_stats, 'started', None)
+        if started is None:
+            return response
+
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'unmatched'
+        http_requests_total.inc(blueprint, endpoint, request.method, str(response.status_code))
+        http_request_duration_seconds.observe(
+            time.perf_counter() - started, blueprint, endpoint, request.method
+        )
+        http_request_sql_statements.observe(_request_stats.sql_count, blueprint, endpoint)
+        http_request_sql_seconds.observe(_request_stats.sql_time, blueprint, endpoint)
+        return response
+
+    @app.teardown_request
+    def clear_request_metrics(exc):
+        _request_stats.started = None
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['metrics_started'] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop('metrics_started', time.perf_counter())
+        db_statements_total.inc()
+        db_statement_duration_seconds.observe(elapsed)
+        if getattr(_request_stats, 'started', None) is not None:
+            _request_stats.sql_count += 1
+            _request_stats.sql_time += elapsed
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def observe_graph_call(service, endpoint, started, response=None, error=None):
+    """
+    Record a Graph API call
+
+    Args:
+        service: Calling service, e.g. 'facebook' or 'messenger'
+        endpoint: Logical Graph endpoint, e.g. 'ads'
+        started: time.perf_counter() value taken before the call
+        response: requests.Response, if one was received
+        error: Exception raised before a response was received
+    """
+    graph_api_request_duration_seconds.observe(time.perf_counter() - started, service, endpoint)
+
+    if response is not None and response.status_code < 400:
+        graph_api_requests_total.inc(service, endpoint, 'success')
+        return
+
+    if response is not None:
+        try:
+            code = response.json().get('error', {}).get('code') or response.status_code
+        except ValueError:
+            code = response.status_code
+    else:
+        code = type(error).__name__ if error else 'unknown'
+
+    graph_api_requests_total.inc(service, endpoint, 'error')
+    graph_api_errors_total.inc(service, endpoint, str(code))
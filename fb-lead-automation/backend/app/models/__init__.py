@@ -1,5 +1,12 @@
+from app.models.campaign import Campaign, AdSet
 from app.models.ad import Ad
 from app.models.message_template import MessageTemplate
 from app.models.lead import Lead
+from app.models.lead_field import LeadField
+from app.models.lead_form_cursor import LeadFormCursor
+from app.models.archived_lead import ArchivedLead, LeadArchiveStat
+from app.models.scheduler_lease import SchedulerLease
+from app.models.deferred_work import DeferredWork
+from app.models.change_sequence import ChangeSequence, Tombstone
 
-__all__ = ['Ad', 'MessageTemplate', 'Lead']
+__all__ = ['Campaign', 'AdSet', 'Ad', 'MessageTemplate', 'Lead', 'LeadField', 'LeadFormCursor', 'ArchivedLead', 'LeadArchiveStat', 'SchedulerLease', 'DeferredWork', 'ChangeSequence', 'Tombstone']
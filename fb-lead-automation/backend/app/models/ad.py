@@ -5,41 +5,53 @@ class Ad(db.Model):
     """Ad model representing Facebook/Instagram ads"""
 
     __tablename__ = 'ads'
+    # Each listing filter is followed by created_at, the default sort
+    __table_args__ = (
+        db.Index('ix_ads_is_active_created_at', 'is_active', 'created_at'),
+        db.Index('ix_ads_campaign_id_created_at', 'campaign_id', 'created_at'),
+        db.Index('ix_ads_adset_id_created_at', 'adset_id', 'created_at'),
+        db.Index('ix_ads_status_created_at', 'status', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     ad_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
-    ad_name = db.Column(db.String(255), nullable=False)
-    campaign_id = db.Column(db.String(100))
-    campaign_name = db.Column(db.String(255))
-    adset_id = db.Column(db.String(100))
-    adset_name = db.Column(db.String(255))
+    account_id = db.Column(db.String(100), index=True)
+    page_id = db.Column(db.String(100), index=True)
+    ad_name = db.Column(db.String(255), nullable=False, index=True)
+    # Campaign and ad set names live on their own rows (see Campaign, AdSet)
+    campaign_id = db.Column(db.String(100), db.ForeignKey('campaigns.campaign_id'))
+    adset_id = db.Column(db.String(100), db.ForeignKey('adsets.adset_id'))
     status = db.Column(db.String(50))
     platform = db.Column(db.String(50), default='facebook')
     is_active = db.Column(db.Boolean, default=True)
     last_synced_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Delta sync version of the last change (see app.services.change_tracking)
+    change_version = db.Column(db.BigInteger, default=0, nullable=False, index=True)
 
     # Relationships
     message_template = db.relationship('MessageTemplate', backref='ad', uselist=False, cascade='all, delete-orphan')
     leads = db.relationship('Lead', backref='ad', lazy='dynamic', cascade='all, delete-orphan')
 
     def to_dict(self):
-        """Convert ad to dictionary"""
+        """Convert ad to dictionary (eager-load campaign, adset and message_template when serializing many)"""
         return {
             'id': self.id,
             'ad_id': self.ad_id,
+            'account_id': self.account_id,
+            'page_id': self.page_id,
             'ad_name': self.ad_name,
             'campaign_id': self.campaign_id,
-            'campaign_name': self.campaign_name,
+            'campaign_name': self.campaign.name if self.campaign else None,
             'adset_id': self.adset_id,
-            'adset_name': self.adset_name,
+            'adset_name': self.adset.name if self.adset else None,
             'status': self.status,
             'platform': self.platform,
             'is_active': self.is_active,
-            'last_synced_at': self.last_synced_at.isoformat() if self.last_synced_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'last_synced_at': self.last_synced_at,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'has_template': self.message_template is not None
         }
 
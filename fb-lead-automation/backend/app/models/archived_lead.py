@@ -0,0 +1,65 @@
+from app.extensions import db
+from datetime import datetime
+import json
+
+class ArchivedLead(db.Model):
+    """Lead moved out of the hot leads table by the retention job"""
+
+    __tablename__ = 'archived_leads'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # leads.id the lead had, so archived leads stay addressable by it
+    original_id = db.Column(db.Integer, nullable=False, index=True)
+    lead_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    ad_id = db.Column(db.Integer, nullable=False, index=True)
+    user_fb_id = db.Column(db.String(100))
+    user_name = db.Column(db.String(255))
+    message_sent = db.Column(db.Boolean, default=False)
+    message_text = db.Column(db.Text)
+    message_sent_at = db.Column(db.DateTime)
+    error_message = db.Column(db.Text)
+    form_data = db.Column(db.Text, default='{}')
+    created_at = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def get_form_data(self):
+        """Get form data as dictionary"""
+        try:
+            return json.loads(self.form_data) if self.form_data else {}
+        except:
+            return {}
+
+    def to_dict(self):
+        """Convert archived lead to dictionary (same shape as Lead.to_dict)"""
+        return {
+            'id': self.original_id,
+            'lead_id': self.lead_id,
+            'ad_id': self.ad_id,
+            'user_fb_id': self.user_fb_id,
+            'user_name': self.user_name,
+            'message_sent': self.message_sent,
+            'message_text': self.message_text,
+            'message_sent_at': self.message_sent_at,
+            'error_message': self.error_message,
+            'form_data': self.get_form_data(),
+            'created_at': self.created_at,
+            'archived_at': self.archived_at
+        }
+
+    def __repr__(self):
+        return f'<ArchivedLead {self.lead_id}>'
+
+
+class LeadArchiveStat(db.Model):
+    """Per-ad counters of archived leads, kept so lead statistics stay complete"""
+
+    __tablename__ = 'lead_archive_stats'
+
+    ad_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total = db.Column(db.Integer, default=0, nullable=False)
+    sent = db.Column(db.Integer, default=0, nullable=False)
+    failed = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LeadArchiveStat ad={self.ad_id} total={self.total}>'
@@ -0,0 +1,83 @@
+from app.extensions import db
+from datetime import datetime
+
+
+def _send_rate(sent_count, lead_count):
+    return round(sent_count / lead_count * 100, 2) if lead_count else 0
+
+
+class Campaign(db.Model):
+    """Facebook campaign, with lead counters kept up to date as leads are written"""
+
+    __tablename__ = 'campaigns'
+
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    account_id = db.Column(db.String(100), index=True)
+    name = db.Column(db.String(255))
+    # Rollups of the campaign's leads, archived ones included
+    lead_count = db.Column(db.Integer, default=0, nullable=False)
+    sent_count = db.Column(db.Integer, default=0, nullable=False)
+    failed_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    adsets = db.relationship('AdSet', backref='campaign', lazy='dynamic')
+    ads = db.relationship('Ad', backref='campaign', lazy='dynamic')
+
+    def to_dict(self):
+        """Convert campaign to dictionary"""
+        return {
+            'id': self.id,
+            'campaign_id': self.campaign_id,
+            'account_id': self.account_id,
+            'name': self.name,
+            'lead_count': self.lead_count,
+            'sent_count': self.sent_count,
+            'failed_count': self.failed_count,
+            'send_rate': _send_rate(self.sent_count, self.lead_count),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+    def __repr__(self):
+        return f'<Campaign {self.name}>'
+
+
+class AdSet(db.Model):
+    """Facebook ad set, with lead counters kept up to date as leads are written"""
+
+    __tablename__ = 'adsets'
+
+    id = db.Column(db.Integer, primary_key=True)
+    adset_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    campaign_id = db.Column(db.String(100), db.ForeignKey('campaigns.campaign_id'), index=True)
+    name = db.Column(db.String(255))
+    # Rollups of the ad set's leads, archived ones included
+    lead_count = db.Column(db.Integer, default=0, nullable=False)
+    sent_count = db.Column(db.Integer, default=0, nullable=False)
+    failed_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    ads = db.relationship('Ad', backref='adset', lazy='dynamic')
+
+    def to_dict(self):
+        """Convert ad set to dictionary"""
+        return {
+            'id': self.id,
+            'adset_id': self.adset_id,
+            'campaign_id': self.campaign_id,
+            'name': self.name,
+            'lead_count': self.lead_count,
+            'sent_count': self.sent_count,
+            'failed_count': self.failed_count,
+            'send_rate': _send_rate(self.sent_count, self.lead_count),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+    def __repr__(self):
+        return f'<AdSet {self.name}>'
@@ -0,0 +1,34 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class ChangeSequence(db.Model):
+    """Single-row counter handing out change versions for delta sync"""
+
+    __tablename__ = 'change_sequence'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    value = db.Column(db.BigInteger, default=0, nullable=False)
+    # Tombstones up to this version were pruned; older clients must resync
+    pruned_through = db.Column(db.BigInteger, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<ChangeSequence {self.value}>'
+
+
+class Tombstone(db.Model):
+    """Record of a deleted ad, template or lead, served to delta sync clients"""
+
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        db.Index('ix_tombstones_entity_version', 'entity', 'version'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # 'ad', 'message' or 'lead'
+    row_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<Tombstone {self.entity} {self.row_id}>'
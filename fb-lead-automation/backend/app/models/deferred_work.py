@@ -0,0 +1,45 @@
+from app.extensions import db
+from datetime import datetime
+import json
+
+class DeferredWork(db.Model):
+    """Lead fetch or Messenger send parked after a transient Graph API failure or while its circuit was open"""
+
+    __tablename__ = 'deferred_work'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False, index=True)  # 'lead' or 'message'
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON arguments to replay
+    attempts = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, index=True)
+    # Set once DEFERRED_MAX_ATTEMPTS were used up; dead work is not retried
+    dead_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def get_payload(self):
+        """Get payload as dictionary"""
+        try:
+            return json.loads(self.payload) if self.payload else {}
+        except:
+            return {}
+
+    def set_payload(self, payload_dict):
+        """Set payload from dictionary"""
+        self.payload = json.dumps(payload_dict)
+
+    def to_dict(self):
+        """Convert deferred work to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.get_payload(),
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at,
+            'dead_at': self.dead_at,
+            'created_at': self.created_at
+        }
+
+    def __repr__(self):
+        return f'<DeferredWork {self.kind} {self.id}>'
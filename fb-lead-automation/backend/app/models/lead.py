@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.models.lead_field import LeadField
 from datetime import datetime
 import json
 
@@ -6,6 +7,13 @@ class Lead(db.Model):
     """Lead model representing users who submitted lead forms"""
 
     __tablename__ = 'leads'
+    __table_args__ = (
+        db.Index('ix_leads_ad_id_created_at', 'ad_id', 'created_at'),
+        db.Index('ix_leads_message_sent_created_at', 'message_sent', 'created_at'),
+        db.Index('ix_leads_message_sent_message_queued_at', 'message_sent', 'message_queued_at'),
+        # Never reuse ids of deleted or archived leads (archived leads keep theirs)
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     lead_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
@@ -15,20 +23,38 @@ class Lead(db.Model):
     message_sent = db.Column(db.Boolean, default=False)
     message_text = db.Column(db.Text)
     message_sent_at = db.Column(db.DateTime)
+    # When the message was last put on a send lane (see the stale send sweep)
+    message_queued_at = db.Column(db.DateTime)
     error_message = db.Column(db.Text)
     form_data = db.Column(db.Text, default='{}')  # JSON string for lead form data
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    change_version = db.Column(db.BigInteger, default=0, nullable=False, index=True)
+
+    # Relationships
+    # The ORM deletes the fields itself: SQLite doesn't enforce ON DELETE CASCADE
+    fields = db.relationship('LeadField', backref='lead', cascade='all, delete-orphan')
 
     def get_form_data(self):
-        """Get form data as dictionary"""
+        """Get form data as dictionary (parsed once per raw value)"""
+        cached = getattr(self, '_form_data_cache', None)
+        if cached is not None and cached[0] is self.form_data:
+            return cached[1]
+
         try:
-            return json.loads(self.form_data) if self.form_data else {}
+            parsed = json.loads(self.form_data) if self.form_data else {}
         except:
-            return {}
+            parsed = {}
+
+        self._form_data_cache = (self.form_data, parsed)
+        return parsed
 
     def set_form_data(self, form_data_dict):
-        """Set form data from dictionary"""
+        """Set form data from dictionary and refresh the normalized fields"""
         self.form_data = json.dumps(form_data_dict)
+        self.fields = [
+            LeadField.from_form_value(name, value)
+            for name, value in form_data_dict.items()
+        ]
 
     def to_dict(self):
         """Convert lead to dictionary"""
@@ -40,10 +66,10 @@ class Lead(db.Model):
             'user_name': self.user_name,
             'message_sent': self.message_sent,
             'message_text': self.message_text,
-            'message_sent_at': self.message_sent_at.isoformat() if self.message_sent_at else None,
+            'message_sent_at': self.message_sent_at,
             'error_message': self.error_message,
             'form_data': self.get_form_data(),
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
     def __repr__(self):
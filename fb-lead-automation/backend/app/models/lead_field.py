@@ -0,0 +1,57 @@
+from app.extensions import db
+import re
+
+
+def normalize_field_value(name, value):
+    """
+    Normalize a lead form value for lookups
+
+    Emails and names are compared case-insensitively, phone numbers by
+    digits only (keeping a leading '+').
+
+    Args:
+        name: Form field name
+        value: Raw field value
+
+    Returns:
+        str: Normalized value
+    """
+    value = str(value).strip()
+    if 'phone' in name:
+        return ('+' if value.startswith('+') else '') + re.sub(r'\D', '', value)
+    return value.lower()
+
+
+class LeadField(db.Model):
+    """Normalized lead form field, one row per field of a lead"""
+
+    __tablename__ = 'lead_fields'
+    __table_args__ = (
+        db.Index('ix_lead_fields_name_normalized_value', 'name', 'normalized_value'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    lead_id = db.Column(db.Integer, db.ForeignKey('leads.id', ondelete='CASCADE'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    value = db.Column(db.Text)
+    normalized_value = db.Column(db.String(255))
+
+    @classmethod
+    def from_form_value(cls, name, value):
+        """Build a field row from a form field name and value"""
+        value = '' if value is None else str(value)
+        return cls(
+            name=name,
+            value=value,
+            normalized_value=normalize_field_value(name, value)[:255]
+        )
+
+    def to_dict(self):
+        """Convert lead field to dictionary"""
+        return {
+            'name': self.name,
+            'value': self.value
+        }
+
+    def __repr__(self):
+        return f'<LeadField {self.name}>'
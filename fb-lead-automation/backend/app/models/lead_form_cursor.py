@@ -0,0 +1,34 @@
+from app.extensions import db
+from datetime import datetime
+
+class LeadFormCursor(db.Model):
+    """Backfill progress for a Facebook lead form"""
+
+    __tablename__ = 'lead_form_cursors'
+
+    id = db.Column(db.Integer, primary_key=True)
+    form_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    since = db.Column(db.DateTime)  # Lower bound of the run in progress
+    after = db.Column(db.String(512))  # Graph API paging cursor within the run
+    last_completed_at = db.Column(db.DateTime)  # Start time of the last finished run
+    leads_imported = db.Column(db.Integer, default=0)
+    claimed_by = db.Column(db.String(64))  # Backfill run importing the form
+    claimed_until = db.Column(db.DateTime)  # The claim lapses after this
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert cursor to dictionary"""
+        return {
+            'id': self.id,
+            'form_id': self.form_id,
+            'since': self.since,
+            'after': self.after,
+            'last_completed_at': self.last_completed_at,
+            'leads_imported': self.leads_imported,
+            'claimed_by': self.claimed_by,
+            'claimed_until': self.claimed_until,
+            'updated_at': self.updated_at
+        }
+
+    def __repr__(self):
+        return f'<LeadFormCursor {self.form_id}>'
@@ -15,6 +15,7 @@ class MessageTemplate(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_version = db.Column(db.BigInteger, default=0, nullable=False, index=True)
 
     def get_variables(self):
         """Get variables as dictionary"""
@@ -36,8 +37,8 @@ class MessageTemplate(db.Model):
             'message_text': self.message_text,
             'variables': self.get_variables(),
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
     def __repr__(self):
@@ -0,0 +1,26 @@
+from app.extensions import db
+from datetime import datetime
+
+class SchedulerLease(db.Model):
+    """Lease row held by the process allowed to run scheduled jobs"""
+
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(100), primary_key=True)
+    holder = db.Column(db.String(255), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert lease to dictionary"""
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'expires_at': self.expires_at,
+            'heartbeat_at': self.heartbeat_at,
+            'acquired_at': self.acquired_at
+        }
+
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} held by {self.holder}>'
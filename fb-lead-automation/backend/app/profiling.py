@@ -0,0 +1,210 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+# Bind parameters in any paramstyle, and expanded IN (...) lists of them
+_PARAM = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_PARAM_LIST_RE = re.compile(rf'\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_state = threading.local()
+
+
+def statement_shape(statement):
+    """
+    Normalize a SQL statement so repeated queries share one shape
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        str: Statement with parameter lists collapsed and whitespace squashed
+    """
+    return _WHITESPACE_RE.sub(' ', _PARAM_LIST_RE.sub('(?)', statement)).strip()
+
+
+def _active():
+    return getattr(_state, 'profile', None) is not None
+
+
+def record_graph_call(service, endpoint, elapsed, status):
+    """
+    Record an outbound Graph API call for the request being profiled
+
+    Args:
+        service: Calling service, e.g. 'facebook'
+        endpoint: Logical Graph endpoint
+        elapsed: Call duration in seconds
+        status: HTTP status code or exception name
+    """
+    if not _active():
+        return
+    _state.profile['graph'].append({
+        'service': service,
+        'endpoint': endpoint,
+        'ms': round(elapsed * 1000, 2),
+        'status': status
+    })
+
+
+def _should_profile(app, request):
+    if request.blueprint not in app.config['PROFILE_BLUEPRINTS']:
+        return False
+
+    header = request.headers.get(app.config['PROFILE_HEADER'])
+    if header is not None:
+        token = app.config.get('PROFILE_TOKEN')
+        return not token or header == token
+
+    sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def _top_functions(profiler, limit):
+    top = []
+    for (filename, line, name), (cc, nc, tt, ct, callers) in pstats.Stats(profiler).stats.items():
+        top.append({
+            'function': f'{os.path.basename(filename)}:{line}({name})',
+            'calls': nc,
+            'own_ms': round(tt * 1000, 2),
+            'cumulative_ms': round(ct * 1000, 2)
+        })
+    top.sort(key=lambda item: item['cumulative_ms'], reverse=True)
+    return top[:limit]
+
+
+def init_profiling(app, db):
+    """
+    Register opt-in per-request profiling for the API blueprints
+
+    When PROFILING_ENABLED is set, requests to PROFILE_BLUEPRINTS that send
+    the PROFILE_HEADER header (or are picked by PROFILE_SAMPLE_RATE) run
+    under cProfile, with their SQL statements and Graph API calls recorded.
+    Repeated statement shapes are reported as N+1 suspects. The profile is
+    written to PROFILE_DIR and summarized in the X-Profile-Summary header.
+
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension, already initialized for the app
+    """
+    from flask import request
+    from sqlalchemy import event
+
+    if not app.config.get('PROFILING_ENABLED'):
+        return
+
+    profile_dir = app.config['PROFILE_DIR']
+    threshold = app.config['PROFILE_N_PLUS_ONE_THRESHOLD']
+    os.makedirs(profile_dir, exist_ok=True)
+
+    @app.before_request
+    def start_profile():
+        _state.profile = None
+        if not _should_profile(app, request):
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this interpreter (Python 3.12+)
+            profiler = None
+
+        _state.profile = {
+            'started': time.perf_counter(),
+            'profiler': profiler,
+            'statements': Counter(),
+            'sql_count': 0,
+            'sql_ms': 0.0,
+            'graph': []
+        }
+
+    @app.after_request
+    def finish_profile(response):
+        profile = getattr(_state, 'profile', None)
+        if profile is None:
+            return response
+        _state.profile = None
+
+        profiler = profile['profiler']
+        if profiler is not None:
+            profiler.disable()
+
+        elapsed_ms = (time.perf_counter() - profile['started']) * 1000
+        repeated = [
+            {'statement': shape, 'count': count}
+            for shape, count in profile['statements'].most_common()
+            if count >= threshold
+        ]
+
+        name = (
+            f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-"
+            f"{request.endpoint or 'unmatched'}-{uuid.uuid4().hex[:6]}"
+        )
+        summary = {
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.full_path,
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 2),
+            'sql': {
+                'count': profile['sql_count'],
+                'ms': round(profile['sql_ms'], 2),
+                'n_plus_one': repeated
+            },
+            'graph': profile['graph'],
+            'top_functions': _top_functions(profiler, 25) if profiler is not None else []
+        }
+
+        try:
+            if profiler is not None:
+                profiler.dump_stats(os.path.join(profile_dir, f'{name}.prof'))
+            with open(os.path.join(profile_dir, f'{name}.json'), 'w') as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            app.logger.error('Failed to write profile %s: %s', name, e)
+
+        if repeated:
+            app.logger.warning(
+                'Possible N+1 in %s: %dx %s',
+                request.endpoint, repeated[0]['count'], repeated[0]['statement'][:200]
+            )
+
+        graph_ms = sum(call['ms'] for call in profile['graph'])
+        response.headers['X-Profile-Summary'] = (
+            f"total={elapsed_ms:.1f}ms; sql={profile['sql_count']} ({profile['sql_ms']:.1f}ms); "
+            f"n+1={len(repeated)}; graph={len(profile['graph'])} ({graph_ms:.1f}ms); file={name}"
+        )
+        return response
+
+    @app.teardown_request
+    def clear_profile(exc):
+        profile = getattr(_state, 'profile', None)
+        if profile is not None and profile['profiler'] is not None:
+            profile['profiler'].disable()
+        _state.profile = None
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _active():
+            conn.info['profile_started'] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('profile_started', None)
+        if started is None or not _active():
+            return
+        profile = _state.profile
+        profile['sql_count'] += 1
+        profile['sql_ms'] += (time.perf_counter() - started) * 1000
+        profile['statements'][statement_shape(statement)] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
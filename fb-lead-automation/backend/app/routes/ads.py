@@ -1,29 +1,190 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
-from app.models import Ad
-from app.services.facebook_service import FacebookService
+from app.models import Ad, AdSet, Campaign, Lead, LeadField, LeadArchiveStat, MessageTemplate
+from app.services.change_tracking import changes_response, current_version, record_deletes
+from app.services.rollups import RollupDeltas
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import joinedload
 from datetime import datetime
+import base64
+import json
 
 ads_bp = Blueprint('ads', __name__)
 
+# Columns returned by the ads listing (the full row is at GET /api/ads/:id)
+LIST_COLUMNS = (
+    Ad.id, Ad.ad_id, Ad.account_id, Ad.ad_name, Ad.campaign_id, Campaign.name.label('campaign_name'),
+    Ad.adset_id, AdSet.name.label('adset_name'), Ad.status, Ad.is_active, Ad.created_at
+)
+SORT_COLUMNS = {
+    'created_at': Ad.created_at,
+    'ad_name': Ad.ad_name
+}
+
+
+def _has_template():
+    return exists().where(MessageTemplate.ad_id == Ad.id)
+
+
+def _parse_bool(value):
+    return value.lower() in ['true', '1', 'yes']
+
+
+def encode_cursor(sort, order, value, ad_pk):
+    """
+    Encode the position after a listing row as an opaque cursor
+
+    Args:
+        sort: Sort column name
+        order: 'asc' or 'desc'
+        value: Sort column value of the row
+        ad_pk: Primary key of the row (tie-breaker)
+
+    Returns:
+        str: URL-safe cursor
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, order, value, ad_pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort, order):
+    """
+    Decode a listing cursor
+
+    Args:
+        cursor: Cursor from a previous page
+        sort: Sort column name of this request
+        order: 'asc' or 'desc' of this request
+
+    Returns:
+        tuple: (sort value, primary key)
+
+    Raises:
+        ValueError: If the cursor is malformed or from another sort order
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, cursor_order, value, ad_pk = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('cursor is invalid')
+
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError('cursor belongs to a different sort order')
+    if sort == 'created_at' and value is not None:
+        value = datetime.fromisoformat(value)
+    return value, ad_pk
+
+
+def apply_ad_filters(query, args):
+    """
+    Apply ads listing filters from request arguments
+
+    Supported filters map onto the (<filter>, created_at) indexes on the
+    ads table; has_template uses the unique ad_id index on templates.
+
+    Args:
+        query: Ads query to filter
+        args: Request arguments (is_active, status, account_id,
+            campaign_id, adset_id, has_template, q)
+
+    Returns:
+        Query: Filtered query
+    """
+    is_active = args.get('is_active')
+    if is_active is not None:
+        query = query.filter(Ad.is_active == _parse_bool(is_active))
+
+    for name in ('status', 'account_id', 'campaign_id', 'adset_id'):
+        value = args.get(name)
+        if value:
+            query = query.filter(getattr(Ad, name) == value)
+
+    has_template = args.get('has_template')
+    if has_template is not None:
+        query = query.filter(_has_template() if _parse_bool(has_template) else ~_has_template())
+
+    search = args.get('q', '').strip()
+    if search:
+        pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = query.filter(Ad.ad_name.ilike(f'%{pattern}%', escape='\\'))
+
+    return query
+
+
+def _list_query():
+    return (
+        db.session.query(*LIST_COLUMNS, _has_template().label('has_template'))
+        .outerjoin(Campaign, Campaign.campaign_id == Ad.campaign_id)
+        .outerjoin(AdSet, AdSet.adset_id == Ad.adset_id)
+    )
+
+
 @ads_bp.route('', methods=['GET'])
 def get_ads():
-    """Get all ads with optional filtering"""
+    """Get a page of ads with optional filtering, sorting and a cursor, or the changes since a version"""
     try:
-        is_active = request.args.get('is_active')
+        # Delta sync: every ad changed since the client's version (filters don't apply)
+        if request.args.get('since') is not None:
+            return changes_response(
+                db.session, 'ad', _list_query(), request.args['since'],
+                lambda rows: [dict(row._mapping) for row in rows]
+            )
+
+        version = current_version(db.session)[0]
+        sort = request.args.get('sort', 'created_at')
+        order = request.args.get('order', 'desc' if sort == 'created_at' else 'asc')
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+
+        if sort not in SORT_COLUMNS or order not in ('asc', 'desc'):
+            return jsonify({
+                'success': False,
+                'error': f"sort must be one of: {', '.join(SORT_COLUMNS)}; order must be asc or desc"
+            }), 400
+
+        sort_column = SORT_COLUMNS[sort]
+        query = apply_ad_filters(_list_query(), request.args)
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                value, ad_pk = decode_cursor(cursor, sort, order)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+
+            if order == 'desc':
+                query = query.filter(or_(sort_column < value, and_(sort_column == value, Ad.id < ad_pk)))
+            else:
+                query = query.filter(or_(sort_column > value, and_(sort_column == value, Ad.id > ad_pk)))
 
-        query = Ad.query
+        if order == 'desc':
+            query = query.order_by(sort_column.desc(), Ad.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Ad.id.asc())
 
-        if is_active is not None:
-            is_active_bool = is_active.lower() in ['true', '1', 'yes']
-            query = query.filter_by(is_active=is_active_bool)
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        ads = [dict(row._mapping) for row in rows[:limit]]
 
-        ads = query.order_by(Ad.created_at.desc()).all()
+        next_cursor = None
+        if has_more:
+            last = ads[-1]
+            next_cursor = encode_cursor(sort, order, last[sort], last['id'])
 
         return jsonify({
             'success': True,
-            'data': [ad.to_dict() for ad in ads],
-            'count': len(ads)
+            'data': ads,
+            'count': len(ads),
+            'pagination': {
+                'limit': limit,
+                'has_more': has_more,
+                'next_cursor': next_cursor
+            },
+            'version': version
         }), 200
 
     except Exception as e:
@@ -37,7 +198,10 @@ def get_ads():
 def get_ad(ad_id):
     """Get specific ad by ID"""
     try:
-        ad = Ad.query.get_or_404(ad_id)
+        # Everything Ad.to_dict reads, in one query
+        ad = Ad.query.options(
+            joinedload(Ad.campaign), joinedload(Ad.adset), joinedload(Ad.message_template)
+        ).get_or_404(ad_id)
 
         return jsonify({
             'success': True,
@@ -53,75 +217,29 @@ def get_ad(ad_id):
 
 @ads_bp.route('/sync', methods=['POST'])
 def sync_ads():
-    """Manually trigger ad synchronization with Facebook"""
+    """Manually trigger ad synchronization with Facebook for all ad accounts"""
     try:
-        facebook_service = FacebookService()
-        ads_data = facebook_service.get_active_ads()
+        from app.jobs.ad_sync_job import run_ad_sync
+
+        summary = run_ad_sync(current_app._get_current_object())
+        accounts = summary.pop('accounts')
+        failed = {
+            account_id: stats['error']
+            for account_id, stats in accounts.items() if 'error' in stats
+        }
 
-        if not ads_data:
+        if not accounts or len(failed) == len(accounts):
             return jsonify({
                 'success': False,
-                'error': 'Failed to fetch ads from Facebook. Check your credentials.'
+                'error': 'Failed to fetch ads from Facebook. Check your credentials.',
+                'accounts': accounts
             }), 500
 
-        # Get all existing ad IDs
-        existing_ad_ids = {ad.ad_id for ad in Ad.query.all()}
-        synced_ad_ids = set()
-
-        # Upsert ads
-        synced_count = 0
-        created_count = 0
-
-        for ad_data in ads_data:
-            ad_id = ad_data.get('id')
-            synced_ad_ids.add(ad_id)
-
-            ad = Ad.query.filter_by(ad_id=ad_id).first()
-
-            if ad:
-                # Update existing ad
-                ad.ad_name = ad_data.get('name', ad.ad_name)
-                ad.status = ad_data.get('status', ad.status)
-                ad.is_active = True
-                ad.last_synced_at = datetime.utcnow()
-                synced_count += 1
-            else:
-                # Create new ad
-                ad = Ad(
-                    ad_id=ad_id,
-                    ad_name=ad_data.get('name', ''),
-                    campaign_id=ad_data.get('campaign', {}).get('id'),
-                    campaign_name=ad_data.get('campaign', {}).get('name'),
-                    adset_id=ad_data.get('adset', {}).get('id'),
-                    adset_name=ad_data.get('adset', {}).get('name'),
-                    status=ad_data.get('status'),
-                    is_active=True,
-                    last_synced_at=datetime.utcnow()
-                )
-                db.session.add(ad)
-                created_count += 1
-
-        # Mark missing ads as inactive
-        missing_ad_ids = existing_ad_ids - synced_ad_ids
-        deactivated_count = 0
-
-        for ad_id in missing_ad_ids:
-            ad = Ad.query.filter_by(ad_id=ad_id).first()
-            if ad and ad.is_active:
-                ad.is_active = False
-                deactivated_count += 1
-
-        db.session.commit()
-
         return jsonify({
             'success': True,
             'message': 'Ads synchronized successfully',
-            'stats': {
-                'total': len(ads_data),
-                'created': created_count,
-                'updated': synced_count,
-                'deactivated': deactivated_count
-            }
+            'stats': summary,
+            'accounts': accounts
         }), 200
 
     except Exception as e:
@@ -137,7 +255,12 @@ def delete_ad(ad_id):
     """Delete ad from database"""
     try:
         ad = Ad.query.get_or_404(ad_id)
+        deltas = RollupDeltas()
+        deltas.ads_removed(db.session, [ad.id])
+        deltas.apply(db.session)
         db.session.delete(ad)
+        # Archived leads are kept, but stop counting them with the ad's live leads
+        LeadArchiveStat.query.filter_by(ad_id=ad_id).delete()
         db.session.commit()
 
         return jsonify({
@@ -151,3 +274,68 @@ def delete_ad(ad_id):
             'success': False,
             'error': str(e)
         }), 500
+
+
+@ads_bp.route('/bulk-delete', methods=['POST'])
+def bulk_delete_ads():
+    """Delete many ads, with their templates and leads, in one transaction"""
+    try:
+        data = request.get_json() or {}
+        ids = data.get('ids')
+
+        if not isinstance(ids, list) or not ids or not all(
+            isinstance(ad_id, int) and not isinstance(ad_id, bool) for ad_id in ids
+        ):
+            return jsonify({
+                'success': False,
+                'error': 'ids must be a non-empty array of ad IDs'
+            }), 400
+
+        max_items = current_app.config.get('BULK_MAX_ITEMS', 1000)
+        if len(ids) > max_items:
+            return jsonify({
+                'success': False,
+                'error': f'At most {max_items} ads per request'
+            }), 400
+
+        found = {ad_id for (ad_id,) in db.session.query(Ad.id).filter(Ad.id.in_(ids))}
+        results = [
+            {'id': ad_id, 'status': 'deleted' if ad_id in found else 'not_found'}
+            for ad_id in dict.fromkeys(ids)
+        ]
+
+        deltas = RollupDeltas()
+        deltas.ads_removed(db.session, found)
+        deltas.apply(db.session)
+
+        # Set-based deletes instead of loading every ad's leads for the ORM cascade
+        record_deletes(db.session, 'lead', select(Lead.id).where(Lead.ad_id.in_(found)))
+        record_deletes(db.session, 'message', select(MessageTemplate.id).where(MessageTemplate.ad_id.in_(found)))
+        record_deletes(db.session, 'ad', select(Ad.id).where(Ad.id.in_(found)))
+        lead_ids = db.session.query(Lead.id).filter(Lead.ad_id.in_(found)).scalar_subquery()
+        db.session.execute(LeadField.__table__.delete().where(LeadField.lead_id.in_(lead_ids)))
+        leads_deleted = db.session.execute(
+            Lead.__table__.delete().where(Lead.ad_id.in_(found))
+        ).rowcount
+        db.session.execute(MessageTemplate.__table__.delete().where(MessageTemplate.ad_id.in_(found)))
+        # Archived leads are kept, but stop counting them with the ads' live leads
+        db.session.execute(LeadArchiveStat.__table__.delete().where(LeadArchiveStat.ad_id.in_(found)))
+        db.session.execute(Ad.__table__.delete().where(Ad.id.in_(found)))
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'results': results,
+                'deleted': len(found),
+                'not_found': len(results) - len(found),
+                'leads_deleted': leads_deleted
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
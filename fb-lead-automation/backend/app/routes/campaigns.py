@@ -0,0 +1,112 @@
+from flask import Blueprint, request, jsonify
+from app.extensions import db
+from app.models import Ad, AdSet, Campaign
+from app.services.rollups import count_ad_leads
+
+campaigns_bp = Blueprint('campaigns', __name__)
+
+
+def _not_found(kind, key):
+    return jsonify({
+        'success': False,
+        'error': f'{kind} {key} not found'
+    }), 404
+
+
+@campaigns_bp.route('', methods=['GET'])
+def get_campaigns():
+    """Get campaigns with their lead counts and send rates, busiest first"""
+    try:
+        query = Campaign.query
+        account_id = request.args.get('account_id')
+        if account_id:
+            query = query.filter(Campaign.account_id == account_id)
+
+        campaigns = query.order_by(Campaign.lead_count.desc(), Campaign.id).all()
+
+        return jsonify({
+            'success': True,
+            'data': [campaign.to_dict() for campaign in campaigns],
+            'count': len(campaigns)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@campaigns_bp.route('/<campaign_id>', methods=['GET'])
+def get_campaign(campaign_id):
+    """Get a campaign (by Facebook campaign ID) with the stats of its ad sets"""
+    try:
+        campaign = Campaign.query.filter_by(campaign_id=campaign_id).first()
+        if not campaign:
+            return _not_found('Campaign', campaign_id)
+
+        adsets = campaign.adsets.order_by(AdSet.lead_count.desc(), AdSet.id).all()
+
+        return jsonify({
+            'success': True,
+            'data': {
+                **campaign.to_dict(),
+                'adsets': [adset.to_dict() for adset in adsets]
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@campaigns_bp.route('/<campaign_id>/ads', methods=['GET'])
+def get_campaign_ads(campaign_id):
+    """
+    Drill down into a campaign's ads (optionally one ad set's) with per-ad lead stats
+
+    Per-ad counts are computed for the campaign's ads only, using the
+    (ad_id, created_at) leads index and the archive counters.
+    """
+    try:
+        campaign = Campaign.query.filter_by(campaign_id=campaign_id).first()
+        if not campaign:
+            return _not_found('Campaign', campaign_id)
+
+        query = db.session.query(
+            Ad.id, Ad.ad_id, Ad.ad_name, Ad.adset_id, Ad.status, Ad.is_active, Ad.created_at
+        ).filter(Ad.campaign_id == campaign_id)
+
+        adset_id = request.args.get('adset_id')
+        if adset_id:
+            if not AdSet.query.filter_by(adset_id=adset_id, campaign_id=campaign_id).first():
+                return _not_found('Ad set', adset_id)
+            query = query.filter(Ad.adset_id == adset_id)
+
+        rows = query.order_by(Ad.created_at.desc(), Ad.id.desc()).all()
+        counts = count_ad_leads(db.session, [row.id for row in rows])
+
+        ads = []
+        for row in rows:
+            leads, sent, failed = counts.get(row.id, (0, 0, 0))
+            ads.append({
+                **row._mapping,
+                'lead_count': leads,
+                'sent_count': sent,
+                'failed_count': failed,
+                'send_rate': round(sent / leads * 100, 2) if leads else 0
+            })
+
+        return jsonify({
+            'success': True,
+            'data': ads,
+            'count': len(ads)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,60 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import func
+from app.extensions import db
+from app.models import DeferredWork
+from app.services.circuit_breaker import breakers, FAMILIES
+
+graph_bp = Blueprint('graph', __name__)
+
+
+@graph_bp.route('/breakers', methods=['GET'])
+def get_breakers():
+    """Get the Graph API circuit breakers of this process and the parked and dead work counts"""
+    try:
+        counts = (
+            db.session.query(DeferredWork.kind, DeferredWork.dead_at.isnot(None), func.count(DeferredWork.id))
+            .group_by(DeferredWork.kind, DeferredWork.dead_at.isnot(None))
+            .all()
+        )
+        deferred = {kind: count for kind, dead, count in counts if not dead}
+        dead = {kind: count for kind, dead, count in counts if dead}
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'breakers': breakers.stats(),
+                'deferred': deferred,
+                'dead': dead
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@graph_bp.route('/breakers/<family>/reset', methods=['POST'])
+def reset_breaker(family):
+    """Close a breaker of this process without waiting for its cooldown"""
+    try:
+        if family not in FAMILIES:
+            return jsonify({
+                'success': False,
+                'error': f'Unknown breaker family: {family}'
+            }), 404
+
+        breaker = breakers.get(family)
+        breaker.reset()
+
+        return jsonify({
+            'success': True,
+            'data': breaker.stats()
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
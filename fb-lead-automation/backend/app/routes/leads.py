@@ -1,37 +1,147 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from app.extensions import db
-from app.models import Lead, Ad
+from app.models import Lead, Ad, LeadField, ArchivedLead, LeadArchiveStat
+from app.models.lead_field import normalize_field_value
+from app.services.change_tracking import changes_response, current_version
+from app.services.event_bus import event_bus, SubscriberLimitReached
+from app.services.export_service import LeadExportService
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timezone
 
 leads_bp = Blueprint('leads', __name__)
 
+LEAD_STATUSES = ('sent', 'failed', 'pending')
+
+
+def _parse_datetime(value, name):
+    """Parse an ISO 8601 query parameter to naive UTC (naive input is taken as UTC)"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 datetime')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _prefix_upper_bound(prefix):
+    """
+    Get the smallest string greater than every string starting with prefix
+
+    Increments the last code point (skipping surrogates, which can't be
+    stored); trailing U+10FFFF code points are dropped first.
+
+    Returns:
+        str: Exclusive upper bound, or None if there is none
+    """
+    while prefix:
+        last = ord(prefix[-1]) + 1
+        if last <= 0x10FFFF:
+            if 0xD800 <= last <= 0xDFFF:
+                last = 0xE000
+            return prefix[:-1] + chr(last)
+        prefix = prefix[:-1]
+    return None
+
+
+def apply_lead_filters(query, args):
+    """
+    Apply leads listing filters from request arguments
+
+    Supported filters map onto the (ad_id, created_at) and
+    (message_sent, created_at) indexes on the leads table.
+
+    Args:
+        query: Lead query to filter
+        args: Request arguments (ad_id, campaign_id, status,
+            created_from, created_to)
+
+    Returns:
+        Query: Filtered query
+
+    Raises:
+        ValueError: If a filter value is invalid
+    """
+    ad_id = args.get('ad_id', type=int)
+    if ad_id is not None:
+        query = query.filter(Lead.ad_id == ad_id)
+
+    campaign_id = args.get('campaign_id')
+    if campaign_id:
+        campaign_ads = db.session.query(Ad.id).filter(Ad.campaign_id == campaign_id)
+        query = query.filter(Lead.ad_id.in_(campaign_ads))
+
+    status = args.get('status')
+    if status:
+        if status not in LEAD_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(LEAD_STATUSES)}")
+        if status == 'sent':
+            query = query.filter(Lead.message_sent == True)
+        elif status == 'failed':
+            query = query.filter(Lead.message_sent == False, Lead.error_message.isnot(None))
+        else:
+            query = query.filter(Lead.message_sent == False, Lead.error_message.is_(None))
+
+    created_from = args.get('created_from')
+    if created_from:
+        query = query.filter(Lead.created_at >= _parse_datetime(created_from, 'created_from'))
+
+    created_to = args.get('created_to')
+    if created_to:
+        query = query.filter(Lead.created_at < _parse_datetime(created_to, 'created_to'))
+
+    return query
+
+def _lead_rows(leads):
+    """Serialize listed leads with the name of their ad (prefetched in one query)"""
+    ad_names = dict(
+        db.session.query(Ad.id, Ad.ad_name).filter(Ad.id.in_({lead.ad_id for lead in leads}))
+    )
+    leads_data = []
+    for lead in leads:
+        lead_dict = lead.to_dict()
+        if lead.ad_id in ad_names:
+            lead_dict['ad_name'] = ad_names[lead.ad_id]
+        leads_data.append(lead_dict)
+    return leads_data
+
+
 @leads_bp.route('', methods=['GET'])
 def get_leads():
-    """Get all leads with pagination"""
+    """Get all leads with pagination and optional filtering, or the changes since a version"""
     try:
+        # Delta sync: every hot lead changed since the client's version
+        # (filters and pagination don't apply; archived leads count as deleted)
+        if request.args.get('since') is not None:
+            return changes_response(
+                db.session, 'lead', Lead.query, request.args['since'], _lead_rows
+            )
+
+        version = current_version(db.session)[0]
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
 
         # Limit per_page to avoid performance issues
         per_page = min(per_page, 100)
 
-        pagination = Lead.query.order_by(Lead.created_at.desc()).paginate(
+        try:
+            query = apply_lead_filters(Lead.query, request.args)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        pagination = query.order_by(Lead.created_at.desc()).paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
 
-        # Enrich leads with ad information
-        leads_data = []
-        for lead in pagination.items:
-            lead_dict = lead.to_dict()
-            if lead.ad:
-                lead_dict['ad_name'] = lead.ad.ad_name
-            leads_data.append(lead_dict)
-
         return jsonify({
             'success': True,
-            'data': leads_data,
+            'data': _lead_rows(pagination.items),
             'pagination': {
                 'page': pagination.page,
                 'per_page': pagination.per_page,
@@ -39,7 +149,8 @@ def get_leads():
                 'pages': pagination.pages,
                 'has_next': pagination.has_next,
                 'has_prev': pagination.has_prev
-            }
+            },
+            'version': version
         }), 200
 
     except Exception as e:
@@ -51,14 +162,18 @@ def get_leads():
 
 @leads_bp.route('/<int:lead_id>', methods=['GET'])
 def get_lead(lead_id):
-    """Get specific lead by ID"""
+    """Get specific lead by ID (falls back to the archive)"""
     try:
-        lead = Lead.query.get_or_404(lead_id)
+        lead = db.session.get(Lead, lead_id) or ArchivedLead.query.filter_by(
+            original_id=lead_id
+        ).order_by(ArchivedLead.id.desc()).first_or_404()
 
         lead_dict = lead.to_dict()
-        if lead.ad:
-            lead_dict['ad_name'] = lead.ad.ad_name
-            lead_dict['campaign_name'] = lead.ad.campaign_name
+        lead_dict['archived'] = isinstance(lead, ArchivedLead)
+        ad = db.session.get(Ad, lead.ad_id, options=[joinedload(Ad.campaign)])
+        if ad:
+            lead_dict['ad_name'] = ad.ad_name
+            lead_dict['campaign_name'] = ad.campaign.name if ad.campaign else None
 
         return jsonify({
             'success': True,
@@ -72,16 +187,172 @@ def get_lead(lead_id):
         }), 404
 
 
+@leads_bp.route('/export', methods=['GET'])
+def export_leads():
+    """
+    Stream all matching leads as CSV or NDJSON
+
+    Accepts the same filters as the leads listing plus:
+        format: 'csv' (default) or 'ndjson'
+        fields: Comma-separated form fields to export as CSV columns
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in LeadExportService.FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"format must be one of: {', '.join(LeadExportService.FORMATS)}"
+        }), 400
+
+    try:
+        query = apply_lead_filters(Lead.query, request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    export_service = LeadExportService(query)
+    timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+
+    if export_format == 'csv':
+        fields = request.args.get('fields')
+        field_names = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        body = export_service.generate_csv(field_names)
+        mimetype = 'text/csv'
+    else:
+        body = export_service.generate_ndjson()
+        mimetype = 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename=leads-{timestamp}.{export_format}',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@leads_bp.route('/backfill', methods=['POST'])
+def backfill_leads():
+    """
+    Start a background backfill of leads missed by the webhook
+
+    Body (optional):
+        since: ISO 8601 datetime; defaults to each form's last completed run
+        send_messages: Send templates to imported leads (default false)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        since = None
+        if data.get('since'):
+            since = _parse_datetime(data['since'], 'since')
+
+        from app.jobs.lead_backfill_job import schedule_lead_backfill
+        schedule_lead_backfill(
+            current_app._get_current_object(),
+            since=since,
+            send_messages=bool(data.get('send_messages', False))
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Lead backfill started'
+        }), 202
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@leads_bp.route('/lookup', methods=['GET'])
+def lookup_leads():
+    """
+    Find leads by a normalized form field value
+
+    Query params:
+        field: Form field name (e.g. email, phone_number, first_name)
+        value: Value to look up
+        match: 'exact' (default) or 'prefix'
+        limit: Maximum number of leads to return (default 50, max 100)
+    """
+    try:
+        field = request.args.get('field')
+        value = request.args.get('value')
+        match = request.args.get('match', 'exact')
+        limit = min(request.args.get('limit', 50, type=int), 100)
+
+        if not field or not value:
+            return jsonify({
+                'success': False,
+                'error': 'field and value are required'
+            }), 400
+
+        if match not in ('exact', 'prefix'):
+            return jsonify({
+                'success': False,
+                'error': 'match must be exact or prefix'
+            }), 400
+
+        normalized = normalize_field_value(field, value)
+        if not normalized or ('phone' in field and not normalized.lstrip('+')):
+            return jsonify({
+                'success': False,
+                'error': 'value has nothing to match once normalized'
+            }), 400
+
+        matching = db.session.query(LeadField.lead_id).filter(LeadField.name == field)
+
+        if match == 'exact':
+            matching = matching.filter(LeadField.normalized_value == normalized)
+        else:
+            # Range scan instead of LIKE so the (name, normalized_value) index is used
+            matching = matching.filter(LeadField.normalized_value >= normalized)
+            upper_bound = _prefix_upper_bound(normalized)
+            if upper_bound is not None:
+                matching = matching.filter(LeadField.normalized_value < upper_bound)
+
+        leads = Lead.query.filter(Lead.id.in_(matching)).order_by(
+            Lead.created_at.desc()
+        ).limit(limit).all()
+
+        return jsonify({
+            'success': True,
+            'data': [lead.to_dict() for lead in leads],
+            'count': len(leads)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @leads_bp.route('/stats', methods=['GET'])
 def get_stats():
-    """Get lead statistics"""
+    """Get lead statistics (hot leads plus archived counters)"""
     try:
-        total_leads = Lead.query.count()
-        messages_sent = Lead.query.filter_by(message_sent=True).count()
+        archived_total, archived_sent, archived_failed = db.session.query(
+            func.coalesce(func.sum(LeadArchiveStat.total), 0),
+            func.coalesce(func.sum(LeadArchiveStat.sent), 0),
+            func.coalesce(func.sum(LeadArchiveStat.failed), 0)
+        ).one()
+
+        total_leads = Lead.query.count() + archived_total
+        messages_sent = Lead.query.filter_by(message_sent=True).count() + archived_sent
         messages_failed = Lead.query.filter(
             Lead.message_sent == False,
             Lead.error_message.isnot(None)
-        ).count()
+        ).count() + archived_failed
 
         # Calculate success rate
         success_rate = 0
@@ -89,10 +360,23 @@ def get_stats():
             success_rate = round((messages_sent / total_leads) * 100, 2)
 
         # Get leads by ad
-        leads_by_ad = db.session.query(
+        counts_by_ad = {}
+        hot_counts = db.session.query(
+            Ad.id,
             Ad.ad_name,
             func.count(Lead.id).label('count')
         ).join(Lead).group_by(Ad.id).all()
+        archived_counts = db.session.query(
+            Ad.id,
+            Ad.ad_name,
+            LeadArchiveStat.total
+        ).join(LeadArchiveStat, LeadArchiveStat.ad_id == Ad.id).all()
+
+        for ad_pk, ad_name, count in hot_counts + archived_counts:
+            previous = counts_by_ad.get(ad_pk, (ad_name, 0))
+            counts_by_ad[ad_pk] = (ad_name, previous[1] + count)
+
+        leads_by_ad = list(counts_by_ad.values())
 
         return jsonify({
             'success': True,
@@ -113,3 +397,62 @@ def get_stats():
             'success': False,
             'error': str(e)
         }), 500
+
+
+@leads_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """
+    Server-Sent Events stream of lead and message events
+
+    Emits lead.created, message.sent and message.failed events. Clients
+    reconnecting with a Last-Event-ID header (or last_event_id query param)
+    receive the events they missed while still in the history buffer.
+
+    Every open stream holds a server thread, so a process serves at most
+    EVENT_MAX_STREAMS of them and answers 503 beyond that.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    json_provider = current_app.json
+    heartbeat = current_app.config.get('EVENT_HEARTBEAT_SECONDS', 15)
+    try:
+        subscription = event_bus.subscribe(last_event_id)
+    except SubscriberLimitReached:
+        response = jsonify({
+            'success': False,
+            'error': 'Too many open event streams, retry later'
+        })
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    if subscription.overflowed:
+                        # Client fell behind; it reconnects and resumes from history
+                        return
+                    yield ': keep-alive\n\n'
+                    continue
+                yield (
+                    f"id: {event['id']}\n"
+                    f"event: {event['type']}\n"
+                    f"data: {json_provider.dumps(event['data'])}\n\n"
+                )
+        finally:
+            subscription.close()
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -1,20 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
 from app.models import MessageTemplate, Ad
+from app.services.change_tracking import changes_response, current_version
 from app.services.template_service import TemplateService
 
 messages_bp = Blueprint('messages', __name__)
 
 @messages_bp.route('', methods=['GET'])
 def get_messages():
-    """Get all message templates"""
+    """Get all message templates, or the changes since a version"""
     try:
+        if request.args.get('since') is not None:
+            return changes_response(
+                db.session, 'message', MessageTemplate.query, request.args['since'],
+                lambda templates: [template.to_dict() for template in templates]
+            )
+
+        version = current_version(db.session)[0]
         templates = MessageTemplate.query.order_by(MessageTemplate.created_at.desc()).all()
 
         return jsonify({
             'success': True,
             'data': [template.to_dict() for template in templates],
-            'count': len(templates)
+            'count': len(templates),
+            'version': version
         }), 200
 
     except Exception as e:
@@ -112,6 +121,213 @@ def create_message():
         }), 500
 
 
+def _is_ad_id(value):
+    """Check that a bulk item's ad_id is an integer (bool is not)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _validate_template_item(item, template):
+    """
+    Validate one bulk template item
+
+    Args:
+        item: Template fields from the request
+        template: Existing template of the ad, or None
+
+    Returns:
+        str: Error message, or None if the item is valid
+    """
+    for field in ('template_name', 'message_text'):
+        if field in item and not (isinstance(item[field], str) and item[field].strip()):
+            return f'{field} must be a non-empty string'
+        if template is None and not item.get(field):
+            return f'{field} is required'
+
+    if 'variables' in item and not isinstance(item['variables'], dict):
+        return 'variables must be an object'
+
+    if 'is_active' in item and not isinstance(item['is_active'], bool):
+        return 'is_active must be a boolean'
+
+    return None
+
+
+def upsert_templates(items, overwrite=True):
+    """
+    Create or update the templates of many ads in one transaction
+
+    Ads and their templates are prefetched with one query each; every item
+    is validated in memory and gets its own result, so invalid items don't
+    block the valid ones.
+
+    Args:
+        items: Template dictionaries, each with an ad_id
+        overwrite: Update ads that already have a template (skip them if False)
+
+    Returns:
+        list: Per-item results with index, ad_id, status ('created',
+            'updated', 'skipped' or 'error'), template_id and error
+    """
+    # Type-check before hashing: ad_id may be any JSON value, lists included
+    ad_ids = {
+        item['ad_id'] for item in items
+        if isinstance(item, dict) and _is_ad_id(item.get('ad_id'))
+    }
+    known_ads = {ad_id for (ad_id,) in db.session.query(Ad.id).filter(Ad.id.in_(ad_ids))}
+    templates = {
+        template.ad_id: template
+        for template in MessageTemplate.query.filter(MessageTemplate.ad_id.in_(ad_ids))
+    }
+
+    results = []
+    applied = []
+    seen = set()
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'ad_id': None, 'status': 'error', 'error': 'Item must be an object'})
+            continue
+
+        ad_id = item.get('ad_id')
+        result = {'index': index, 'ad_id': ad_id}
+        results.append(result)
+        template = templates.get(ad_id) if _is_ad_id(ad_id) else None
+
+        if not _is_ad_id(ad_id):
+            error = 'ad_id is required' if ad_id is None else 'ad_id must be an integer'
+        elif ad_id not in known_ads:
+            error = 'Ad not found'
+        elif ad_id in seen:
+            error = 'Duplicate ad_id in request'
+        else:
+            error = _validate_template_item(item, template)
+
+        if error:
+            result.update(status='error', error=error)
+            continue
+        seen.add(ad_id)
+
+        if template is not None and not overwrite:
+            result.update(status='skipped', template_id=template.id)
+            continue
+
+        if template is None:
+            template = MessageTemplate(ad_id=ad_id, is_active=True)
+            db.session.add(template)
+            result['status'] = 'created'
+        else:
+            result['status'] = 'updated'
+
+        for field in ('template_name', 'message_text', 'is_active'):
+            if field in item:
+                setattr(template, field, item[field])
+        if 'variables' in item:
+            template.set_variables(item['variables'])
+
+        applied.append((result, template))
+
+    # Assign ids before the commit expires the instances
+    db.session.flush()
+    for result, template in applied:
+        result['template_id'] = template.id
+    db.session.commit()
+
+    return results
+
+
+def _bulk_response(results):
+    counts = {'created': 0, 'updated': 0, 'skipped': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'results': results,
+            'created': counts['created'],
+            'updated': counts['updated'],
+            'skipped': counts['skipped'],
+            'failed': counts['error']
+        }
+    }), 200
+
+
+@messages_bp.route('/bulk', methods=['POST'])
+def bulk_upsert_messages():
+    """Create or update templates for many ads in one transaction"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('templates')
+
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'error': 'templates must be a non-empty array'
+            }), 400
+
+        max_items = current_app.config.get('BULK_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return jsonify({
+                'success': False,
+                'error': f'At most {max_items} templates per request'
+            }), 400
+
+        return _bulk_response(upsert_templates(items, overwrite=data.get('overwrite', True)))
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@messages_bp.route('/apply', methods=['POST'])
+def apply_message_to_group():
+    """Create or update one template on every ad of a campaign or ad set"""
+    try:
+        data = request.get_json() or {}
+        campaign_id = data.get('campaign_id')
+        adset_id = data.get('adset_id')
+
+        if bool(campaign_id) == bool(adset_id):
+            return jsonify({
+                'success': False,
+                'error': 'Exactly one of campaign_id or adset_id is required'
+            }), 400
+
+        query = db.session.query(Ad.id)
+        if campaign_id:
+            query = query.filter(Ad.campaign_id == str(campaign_id))
+        else:
+            query = query.filter(Ad.adset_id == str(adset_id))
+        if data.get('active_only'):
+            query = query.filter(Ad.is_active == True)
+
+        ad_ids = [ad_id for (ad_id,) in query.order_by(Ad.id)]
+        if not ad_ids:
+            return jsonify({
+                'success': False,
+                'error': 'No ads found for this campaign or ad set'
+            }), 404
+
+        fields = {
+            field: data[field]
+            for field in ('template_name', 'message_text', 'variables', 'is_active')
+            if field in data
+        }
+        items = [dict(fields, ad_id=ad_id) for ad_id in ad_ids]
+
+        return _bulk_response(upsert_templates(items, overwrite=data.get('overwrite', True)))
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @messages_bp.route('/<int:template_id>', methods=['PUT'])
 def update_message(template_id):
     """Update existing message template"""
@@ -206,3 +422,21 @@ def preview_message(template_id):
             'success': False,
             'error': str(e)
         }), 500
+
+
+@messages_bp.route('/lanes', methods=['GET'])
+def get_send_lanes():
+    """Get per-page Messenger send lane counters for this process"""
+    try:
+        from app.services.page_lanes import page_lanes
+
+        return jsonify({
+            'success': True,
+            'data': page_lanes.stats()
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,10 @@
+from flask import Blueprint, Response
+from app.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """Expose metrics of all worker processes in the Prometheus text format"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
 import hmac
 import hashlib
+from app.metrics import webhook_events_total
 
 webhook_bp = Blueprint('webhook', __name__)
 
@@ -31,11 +32,11 @@ def verify_webhook_signature(payload, signature):
     try:
         method, signature_hash = signature.split('=', 1)
     except ValueError:
-        current_app.logger.warning(f"Invalid signature format: {signature}")
+        current_app.logger.warning("Invalid signature format: %s", signature[:20])
         return False
     
     if method != 'sha256':
-        current_app.logger.warning(f"Unsupported signature method: {method}")
+        current_app.logger.warning("Unsupported signature method: %s", method)
         return False
     
     # Вычисляем ожидаемую подпись
@@ -50,12 +51,78 @@ def verify_webhook_signature(payload, signature):
     
     if not is_valid:
         current_app.logger.warning(
-            f"Signature mismatch. Expected: {expected_hash[:10]}..., Got: {signature_hash[:10]}..."
+            "Signature mismatch. Expected: %s..., Got: %s...", expected_hash[:10], signature_hash[:10]
         )
     
     return is_valid
 
 
+def verify_subscription(mode, token):
+    """
+    Проверяет запрос верификации webhook (hub.mode и hub.verify_token)
+    
+    Args:
+        mode: Значение hub.mode
+        token: Значение hub.verify_token
+    
+    Returns:
+        bool: True если режим subscribe и токен совпадает с VERIFY_TOKEN
+    """
+    if mode == 'subscribe' and token == current_app.config.get('VERIFY_TOKEN'):
+        current_app.logger.info("Webhook verified successfully")
+        return True
+    
+    current_app.logger.warning("Webhook verification failed")
+    return False
+
+
+def iter_leadgen_changes(data):
+    """
+    Перебирает leadgen события из тела webhook
+    
+    Args:
+        data: Разобранное тело webhook
+    
+    Yields:
+        dict: value события (leadgen_id, ad_id, form_id, ...)
+    """
+    if data.get('object') != 'page':
+        return
+    
+    for entry in data.get('entry', []):
+        for change in entry.get('changes', []):
+            if change.get('field') == 'leadgen':
+                yield change.get('value') or {}
+
+
+def handle_leadgen_change(value):
+    """
+    Обрабатывает одно leadgen событие (блокирует до сохранения лида)
+    
+    Ошибки логируются и не пробрасываются, чтобы Facebook не повторял запрос.
+    
+    Args:
+        value: value leadgen события
+    """
+    leadgen_id = value.get('leadgen_id')
+    ad_id = value.get('ad_id')
+    form_id = value.get('form_id')
+    
+    current_app.logger.info(
+        "New lead: leadgen_id=%s, ad_id=%s, form_id=%s", leadgen_id, ad_id, form_id
+    )
+    
+    webhook_events_total.inc('received')
+
+    # Обрабатываем лид (импортируем здесь чтобы избежать циклических импортов)
+    try:
+        from app.services.lead_processor import process_lead
+        process_lead(leadgen_id, ad_id, form_id)
+    except Exception as e:
+        current_app.logger.error("Error processing lead: %s", e)
+        webhook_events_total.inc('failed')
+
+
 @webhook_bp.route('/webhook', methods=['GET'])
 def webhook_verify():
     """
@@ -65,13 +132,9 @@ def webhook_verify():
     token = request.args.get('hub.verify_token')
     challenge = request.args.get('hub.challenge')
     
-    verify_token = current_app.config.get('VERIFY_TOKEN')
-    
-    if mode == 'subscribe' and token == verify_token:
-        current_app.logger.info("Webhook verified successfully")
+    if verify_subscription(mode, token):
         return challenge, 200
     else:
-        current_app.logger.warning("Webhook verification failed")
         return 'Forbidden', 403
 
 
@@ -98,35 +161,14 @@ def webhook_event():
     try:
         data = request.get_json()
     except Exception as e:
-        current_app.logger.error(f"Failed to parse webhook JSON: {e}")
+        current_app.logger.error("Failed to parse webhook JSON: %s", e)
         return jsonify({'error': 'Invalid JSON'}), 400
     
-    current_app.logger.info(f"Received webhook: {data.get('object')}")
+    current_app.logger.info("Received webhook: %s", data.get('object'))
     
     # Обрабатываем события
-    if data.get('object') == 'page':
-        entries = data.get('entry', [])
-        
-        for entry in entries:
-            changes = entry.get('changes', [])
-            
-            for change in changes:
-                if change.get('field') == 'leadgen':
-                    # Событие lead generation
-                    leadgen_id = change.get('value', {}).get('leadgen_id')
-                    ad_id = change.get('value', {}).get('ad_id')
-                    form_id = change.get('value', {}).get('form_id')
-                    
-                    current_app.logger.info(
-                        f"New lead: leadgen_id={leadgen_id}, ad_id={ad_id}, form_id={form_id}"
-                    )
-                    
-                    # Обрабатываем лид в фоне (импортируем здесь чтобы избежать циклических импортов)
-                    try:
-                        from app.services.lead_processor import process_lead
-                        process_lead(leadgen_id, ad_id, form_id)
-                    except Exception as e:
-                        current_app.logger.error(f"Error processing lead: {e}")
+    for value in iter_leadgen_changes(data):
+        handle_leadgen_change(value)
     
     # Всегда возвращаем 200 OK чтобы Facebook не повторял запрос
     return jsonify({'status': 'ok'}), 200
@@ -141,7 +183,7 @@ def webhook_test():
         return jsonify({'error': 'Only available in development'}), 403
     
     data = request.get_json()
-    current_app.logger.info(f"Test webhook received: {data}")
+    current_app.logger.info("Test webhook received: %s", data)
     
     # Обрабатываем как обычный webhook
     if data.get('object') == 'page':
@@ -157,14 +199,17 @@ def webhook_test():
                     form_id = change.get('value', {}).get('form_id')
                     
                     current_app.logger.info(
-                        f"Test lead: leadgen_id={leadgen_id}, ad_id={ad_id}"
+                        "Test lead: leadgen_id=%s, ad_id=%s", leadgen_id, ad_id
                     )
                     
+                    webhook_events_total.inc('received')
+
                     try:
                         from app.services.lead_processor import process_lead
                         process_lead(leadgen_id, ad_id, form_id)
                     except Exception as e:
-                        current_app.logger.error(f"Error processing test lead: {e}")
+                        current_app.logger.error("Error processing test lead: %s", e)
+                        webhook_events_total.inc('failed')
     
     return jsonify({'status': 'ok', 'message': 'Test webhook processed'}), 200
 
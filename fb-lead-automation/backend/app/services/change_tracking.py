@@ -0,0 +1,270 @@
+from datetime import datetime
+
+from flask import current_app, jsonify
+from sqlalchemy import event, inspect, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import Ad, ChangeSequence, Lead, MessageTemplate, Tombstone
+
+# Delta sync entities and their models
+TRACKED_MODELS = {
+    'ad': Ad,
+    'message': MessageTemplate,
+    'lead': Lead
+}
+
+# Changes to only these columns don't make a row part of the next delta
+# (the ad sync touches last_synced_at on every ad it sees)
+UNTRACKED_COLUMNS = {'last_synced_at', 'updated_at', 'change_version'}
+
+
+class ResyncRequired(Exception):
+    """The client's version can't be brought up to date with a delta"""
+
+
+def next_version(connection):
+    """
+    Get the change version of the connection's transaction
+
+    All changes in one transaction share a version, allocated on first use
+    by incrementing the change_sequence row. That row stays locked until
+    the transaction ends, so transactions that change tracked rows commit
+    in version order: once version N is committed, so is everything below.
+
+    Args:
+        connection: Connection of the writing transaction
+
+    Returns:
+        int: Change version
+    """
+    transaction = connection.get_transaction()
+    cached = connection.info.get('change_version')
+    if cached is not None and cached[0] is transaction:
+        return cached[1]
+
+    table = ChangeSequence.__table__
+    result = connection.execute(
+        table.update().where(table.c.id == 1).values(value=table.c.value + 1)
+    )
+    if result.rowcount == 0:
+        # Databases created with db.create_all() have no counter row yet
+        connection.execute(table.insert().values(id=1, value=1, pruned_through=0))
+    version = connection.execute(select(table.c.value).where(table.c.id == 1)).scalar_one()
+
+    connection.info['change_version'] = (transaction, version)
+    return version
+
+
+def session_version(session):
+    """Get the change version of a session's current transaction (see next_version)"""
+    return next_version(session.connection())
+
+
+def record_deletes(session, entity, row_ids):
+    """
+    Write tombstones for rows about to be removed with a Core DELETE
+
+    ORM deletes of tracked models are recorded automatically.
+
+    Args:
+        session: Session of the deleting transaction
+        entity: 'ad', 'message' or 'lead'
+        row_ids: Select of the primary keys being deleted
+    """
+    ids = row_ids.subquery()
+    session.execute(
+        Tombstone.__table__.insert().from_select(
+            ['entity', 'row_id', 'version', 'deleted_at'],
+            select(
+                literal(entity),
+                ids.c[0],
+                literal(session_version(session)),
+                literal(datetime.utcnow())
+            )
+        )
+    )
+
+
+def _has_tracked_changes(mapper, target):
+    state = inspect(target)
+    return any(
+        state.attrs[prop.key].history.has_changes()
+        for prop in mapper.column_attrs
+        if prop.key not in UNTRACKED_COLUMNS
+    )
+
+
+def _before_insert(mapper, connection, target):
+    target.change_version = next_version(connection)
+
+
+def _before_update(mapper, connection, target):
+    if _has_tracked_changes(mapper, target):
+        target.change_version = next_version(connection)
+
+
+def _touch_template_ads(session, flush_context):
+    # The ads listing shows has_template, so adding or removing a template changes its ad
+    ad_ids = {
+        template.ad_id for template in list(session.new) + list(session.deleted)
+        if isinstance(template, MessageTemplate)
+    }
+    if not ad_ids:
+        return
+
+    table = Ad.__table__
+    connection = session.connection()
+    connection.execute(
+        table.update().where(table.c.id.in_(ad_ids)).values(
+            change_version=next_version(connection),
+            last_synced_at=table.c.last_synced_at,
+            updated_at=table.c.updated_at
+        )
+    )
+
+
+def _tombstone_listener(entity):
+    def after_delete(mapper, connection, target):
+        connection.execute(Tombstone.__table__.insert().values(
+            entity=entity,
+            row_id=target.id,
+            version=next_version(connection),
+            deleted_at=datetime.utcnow()
+        ))
+    return after_delete
+
+
+def init_change_tracking():
+    """Version ORM inserts and updates of the tracked models and tombstone their deletes"""
+    if event.contains(Session, 'after_flush', _touch_template_ads):
+        return
+
+    for entity, model in TRACKED_MODELS.items():
+        event.listen(model, 'before_insert', _before_insert)
+        event.listen(model, 'before_update', _before_update)
+        event.listen(model, 'after_delete', _tombstone_listener(entity))
+    event.listen(Session, 'after_flush', _touch_template_ads)
+
+
+def parse_since(value):
+    """
+    Parse a ?since= version
+
+    Raises:
+        ValueError: If it is not a non-negative integer
+    """
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        since = -1
+    if since < 0:
+        raise ValueError('since must be a version returned by an earlier response')
+    return since
+
+
+def current_version(session):
+    """
+    Get the latest committed change version
+
+    Args:
+        session: Session to query with
+
+    Returns:
+        tuple: (version, pruned_through)
+    """
+    row = session.execute(
+        select(ChangeSequence.value, ChangeSequence.pruned_through).where(ChangeSequence.id == 1)
+    ).first()
+    return tuple(row) if row else (0, 0)
+
+
+def get_changes(session, entity, query, since, limit):
+    """
+    Get the rows of an entity changed and deleted after a client's version
+
+    The upper bound is the version read before the rows, so the result is
+    complete up to the returned version even while writers keep going.
+
+    Args:
+        session: Session to query with
+        entity: 'ad', 'message' or 'lead'
+        query: Query over the entity's rows (any projection that includes
+            the primary key)
+        since: Version the client is up to date with
+        limit: Most changed plus deleted rows returned in one delta
+
+    Returns:
+        tuple: (changed rows, deleted primary keys, new version)
+
+    Raises:
+        ResyncRequired: If tombstones after `since` were pruned, `since` is
+            from another database, or there are more than `limit` changes
+    """
+    model = TRACKED_MODELS[entity]
+    version, pruned_through = current_version(session)
+    if since < pruned_through or since > version:
+        raise ResyncRequired()
+
+    rows = query.filter(
+        model.change_version > since,
+        model.change_version <= version
+    ).order_by(model.change_version, model.id).limit(limit + 1).all()
+
+    deleted = [
+        row_id for (row_id,) in session.execute(
+            select(Tombstone.row_id).where(
+                Tombstone.entity == entity,
+                Tombstone.version > since,
+                Tombstone.version <= version
+            ).order_by(Tombstone.version).limit(limit + 1)
+        )
+    ]
+
+    if len(rows) + len(deleted) > limit:
+        raise ResyncRequired()
+    return rows, list(dict.fromkeys(deleted)), version
+
+
+def changes_response(session, entity, query, since, serialize):
+    """
+    Build the response of a listing request made with ?since=<version>
+
+    Returns the rows changed after the client's version, the primary keys
+    deleted since then and the new version. Clients should drop the
+    deleted rows before applying the changed ones. When a delta can't be
+    served the response has `reset: true` and the client should refetch
+    the listing.
+
+    Args:
+        session: Session to query with
+        entity: 'ad', 'message' or 'lead'
+        query: Unfiltered query over the entity's rows
+        since: Raw ?since= argument
+        serialize: Turns the query's rows into response dictionaries
+
+    Returns:
+        tuple: JSON response and status code
+    """
+    try:
+        rows, deleted, version = get_changes(
+            session, entity, query, parse_since(since), current_app.config['SYNC_MAX_CHANGES']
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except ResyncRequired:
+        return jsonify({
+            'success': True,
+            'reset': True,
+            'version': current_version(session)[0]
+        }), 200
+
+    return jsonify({
+        'success': True,
+        'data': serialize(rows),
+        'deleted': deleted,
+        'count': len(rows),
+        'version': version
+    }), 200
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Graph endpoints (as labelled by the services) grouped into breaker families
+ENDPOINT_FAMILIES = {
+    'ads': 'ads',
+    'ad_creative': 'ads',
+    'lead': 'leads',
+    'form_leads': 'leads',
+    'messages': 'messages'
+}
+FAMILIES = ('ads', 'leads', 'messages')
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling the Graph API while a family's breaker rejects calls"""
+
+
+class CircuitBreaker:
+    """
+    Breaker for one Graph API endpoint family
+
+    Over the last `window` calls (once there are at least `min_calls`), the
+    breaker opens when the share of failed calls reaches `error_rate` or the
+    share of calls slower than `slow_seconds` reaches `slow_rate`. While open,
+    calls are rejected for `cooldown` seconds. It then goes half-open: one
+    probe is let through at a time, one more for each successful probe, and
+    it closes after `recovery_calls` successes. A failed or slow probe opens
+    it again.
+    """
+
+    def __init__(self, family, window=20, min_calls=10, error_rate=0.5, slow_rate=0.5,
+                 slow_seconds=10.0, cooldown=30.0, recovery_calls=5):
+        self.family = family
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.cooldown = cooldown
+        self.recovery_calls = recovery_calls
+        self.state = CLOSED
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._calls = deque(maxlen=window)  # (failed, slow) per call
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def healthy(self):
+        """True while the breaker is closed"""
+        return self.state == CLOSED
+
+    def accepting(self):
+        """True unless the breaker is open and still cooling down (doesn't admit a call)"""
+        with self._lock:
+            return self.state != OPEN or time.time() - self.opened_at >= self.cooldown
+
+    def allow(self):
+        """
+        Admit a call
+
+        Returns:
+            bool: True if the call may go ahead; it must then be reported
+                with record()
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+                self._probe_successes = 0
+
+            if self.state == HALF_OPEN:
+                if self._probes >= 1 + self._probe_successes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, failed, elapsed):
+        """
+        Report the outcome of an admitted call
+
+        Args:
+            failed: True for connection errors, timeouts, 5xx and 429 responses
+            elapsed: Call duration in seconds
+        """
+        slow = elapsed >= self.slow_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed or slow:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.recovery_calls:
+                        self.state = CLOSED
+                        self._calls.clear()
+                return
+
+            if self.state == OPEN:
+                # Admitted before the breaker opened
+                return
+
+            self._calls.append((failed, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for call_failed, _ in self._calls if call_failed)
+            slow_calls = sum(1 for _, call_slow in self._calls if call_slow)
+            if (
+                failures / len(self._calls) >= self.error_rate
+                or slow_calls / len(self._calls) >= self.slow_rate
+            ):
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.trips += 1
+        self._calls.clear()
+
+    def reset(self):
+        """Close the breaker and forget its recent calls"""
+        with self._lock:
+            self.state = CLOSED
+            self.opened_at = None
+            self._calls.clear()
+
+    def stats(self):
+        with self._lock:
+            calls = len(self._calls)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, round(self.opened_at + self.cooldown - time.time(), 1))
+            return {
+                'family': self.family,
+                'state': self.state,
+                'window_calls': calls,
+                'error_rate': round(sum(1 for failed, _ in self._calls if failed) / calls, 3) if calls else 0.0,
+                'slow_rate': round(sum(1 for _, slow in self._calls if slow) / calls, 3) if calls else 0.0,
+                'opened_at': self.opened_at,
+                'retry_in_seconds': retry_in,
+                'probe_successes': self._probe_successes if self.state == HALF_OPEN else None,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
+
+
+class CircuitBreakers:
+    """
+    Per-family Graph API breakers plus the request timeouts they rely on
+
+    State is kept per process; each gunicorn worker trips its own breakers.
+    """
+
+    def __init__(self):
+        self.options = {}
+        self.timeout = (5.0, 30.0)
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Load the breaker thresholds and Graph API timeouts from the application config"""
+        self.timeout = (
+            app.config.get('GRAPH_CONNECT_TIMEOUT_SECONDS', 5.0),
+            app.config.get('GRAPH_READ_TIMEOUT_SECONDS', 30.0)
+        )
+        self.options = {
+            'window': app.config.get('GRAPH_BREAKER_WINDOW', 20),
+            'min_calls': app.config.get('GRAPH_BREAKER_MIN_CALLS', 10),
+            'error_rate': app.config.get('GRAPH_BREAKER_ERROR_RATE', 0.5),
+            'slow_rate': app.config.get('GRAPH_BREAKER_SLOW_RATE', 0.5),
+            'slow_seconds': app.config.get('GRAPH_BREAKER_SLOW_SECONDS', 10.0),
+            'cooldown': app.config.get('GRAPH_BREAKER_COOLDOWN_SECONDS', 30.0),
+            'recovery_calls': app.config.get('GRAPH_BREAKER_RECOVERY_CALLS', 5)
+        }
+        with self._lock:
+            self._breakers = {}
+
+    def get(self, family):
+        """Get (or create) the breaker of an endpoint family"""
+        with self._lock:
+            breaker = self._breakers.get(family)
+            if breaker is None:
+                breaker = CircuitBreaker(family, **self.options)
+                self._breakers[family] = breaker
+            return breaker
+
+    def for_endpoint(self, endpoint):
+        """Get the breaker guarding a Graph endpoint (unknown endpoints get their own)"""
+        return self.get(ENDPOINT_FAMILIES.get(endpoint, endpoint))
+
+    def stats(self):
+        with self._lock:
+            families = list(FAMILIES) + sorted(set(self._breakers) - set(FAMILIES))
+        return [self.get(family).stats() for family in families]
+
+    def _after_fork(self):
+        """A forked child (e.g. a gunicorn worker) starts with closed breakers"""
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+
+breakers = CircuitBreakers()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=breakers._after_fork)
@@ -0,0 +1,77 @@
+from flask import current_app
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import DeferredWork
+
+# Breaker family each kind of deferred work waits for
+KIND_FAMILIES = {
+    'lead': 'leads',
+    'message': 'messages'
+}
+
+
+def retry_delay(attempts):
+    """
+    Get the backoff before the next attempt of parked work
+
+    Args:
+        attempts: Attempts made so far
+
+    Returns:
+        timedelta: DEFERRED_RETRY_BASE_SECONDS doubled per attempt, capped
+            at DEFERRED_RETRY_MAX_BACKOFF_SECONDS
+    """
+    base = current_app.config.get('DEFERRED_RETRY_BASE_SECONDS', 30)
+    cap = current_app.config.get('DEFERRED_RETRY_MAX_BACKOFF_SECONDS', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** min(attempts, 20)))
+
+
+def park_work(kind, payload, attempts=0, error=None, item_id=None):
+    """
+    Park work that needs the Graph API until its circuit recovers
+
+    Args:
+        kind: 'lead' or 'message'
+        payload: JSON-serializable arguments to replay the work with
+        attempts: Attempts made so far
+        error: Why the work was parked
+        item_id: Stored work item being replayed, rescheduled instead of
+            adding a new one
+
+    Work that already had DEFERRED_MAX_ATTEMPTS attempts is marked dead
+    instead: it is kept for inspection but not retried any more.
+
+    Returns:
+        DeferredWork: Stored work item
+    """
+    item = db.session.get(DeferredWork, item_id) if item_id else None
+    if item is None:
+        item = DeferredWork(kind=kind)
+        db.session.add(item)
+    item.set_payload(payload)
+    item.attempts = attempts
+    item.last_error = error
+    item.next_attempt_at = datetime.utcnow() + retry_delay(attempts)
+
+    max_attempts = current_app.config.get('DEFERRED_MAX_ATTEMPTS', 10)
+    if max_attempts and attempts >= max_attempts:
+        item.dead_at = datetime.utcnow()
+    db.session.commit()
+
+    if item.dead_at:
+        current_app.logger.error('Gave up on %s work after %d attempts: %s', kind, attempts, error)
+    else:
+        current_app.logger.warning('Deferred %s work (attempt %d): %s', kind, attempts, error)
+    return item
+
+
+def finish_work(item_id):
+    """
+    Delete a replayed work item once its work is done
+
+    Args:
+        item_id: Stored work item, or None for work that wasn't parked
+    """
+    if item_id:
+        DeferredWork.query.filter_by(id=item_id).delete()
+        db.session.commit()
@@ -0,0 +1,140 @@
+import itertools
+import threading
+from collections import deque
+
+
+class SubscriberLimitReached(Exception):
+    """The bus already has its maximum number of subscribers"""
+
+
+class Subscription:
+    """A single subscriber's bounded event buffer"""
+
+    def __init__(self, bus, max_buffer):
+        self._bus = bus
+        self._events = deque()
+        self._max_buffer = max_buffer
+        self._condition = threading.Condition()
+        self.overflowed = False
+        self.closed = False
+
+    def _push(self, event):
+        with self._condition:
+            if self.closed:
+                return
+            if len(self._events) >= self._max_buffer:
+                # Slow consumer: stop buffering, the client resumes with Last-Event-ID
+                self.overflowed = True
+                self._condition.notify()
+                return
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event
+
+        Args:
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            dict: Event with id, type and data, or None on timeout/overflow
+        """
+        with self._condition:
+            if not self._events and not self.overflowed:
+                self._condition.wait(timeout)
+            if self._events:
+                return self._events.popleft()
+            return None
+
+    def close(self):
+        """Detach the subscription from the bus"""
+        with self._condition:
+            self.closed = True
+            self._events.clear()
+        self._bus._unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe bus for dashboard events
+
+    Every published event gets a monotonically increasing id and is kept in a
+    bounded history so reconnecting clients can resume from Last-Event-ID.
+    Events are only delivered to subscribers in the same process.
+    """
+
+    def __init__(self, history_size=1000, max_buffer=256, max_subscribers=0):
+        self.history_size = history_size
+        self.max_buffer = max_buffer
+        self.max_subscribers = max_subscribers
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Apply buffer sizes and the subscriber limit from the application config"""
+        self.history_size = app.config.get('EVENT_HISTORY_SIZE', self.history_size)
+        self.max_buffer = app.config.get('EVENT_CLIENT_BUFFER', self.max_buffer)
+        self.max_subscribers = app.config.get('EVENT_MAX_STREAMS', self.max_subscribers)
+        with self._lock:
+            self._history = deque(self._history, maxlen=self.history_size)
+
+    def publish(self, event_type, data):
+        """
+        Publish an event to all subscribers
+
+        Args:
+            event_type: Event name, e.g. 'lead.created'
+            data: JSON-serializable payload
+
+        Returns:
+            int: Event id
+        """
+        with self._lock:
+            event = {'id': next(self._ids), 'type': event_type, 'data': data}
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription._push(event)
+
+        return event['id']
+
+    def subscribe(self, last_event_id=None):
+        """
+        Subscribe to events, replaying history after last_event_id
+
+        Args:
+            last_event_id: Last event id the client has seen
+
+        Returns:
+            Subscription: Buffer to read events from
+
+        Raises:
+            SubscriberLimitReached: If max_subscribers subscriptions are open
+        """
+        subscription = Subscription(self, self.max_buffer)
+
+        with self._lock:
+            if self.max_subscribers and len(self._subscribers) >= self.max_subscribers:
+                raise SubscriberLimitReached()
+            if last_event_id is not None:
+                for event in self._history:
+                    if event['id'] > last_event_id:
+                        subscription._push(event)
+            self._subscribers.add(subscription)
+
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+event_bus = EventBus()
@@ -1,115 +1,249 @@
 import requests
 import json
+from datetime import timezone
 from flask import current_app
+from app.services.graph_api import graph_request
+
+
+class AdListingTruncated(Exception):
+    """Raised after the last page when AD_SYNC_MAX_ADS cut an ad listing short"""
 
 
 class FacebookService:
     """Service for interacting with Facebook Marketing API"""
 
-    def __init__(self):
+    def __init__(self, ad_account_id=None):
         self.access_token = current_app.config.get("FACEBOOK_ACCESS_TOKEN")
-        self.ad_account_id = current_app.config.get("FACEBOOK_AD_ACCOUNT_ID")
-        self.base_url = "https://graph.facebook.com/v24.0"
+        self.ad_account_id = ad_account_id or current_app.config.get(
+            "FACEBOOK_AD_ACCOUNT_ID"
+        )
+        self.base_url = f"{current_app.config.get('FACEBOOK_GRAPH_URL')}/v24.0"
+        self.max_ads = current_app.config.get("AD_SYNC_MAX_ADS", 0)
+        # Exception of the last failed call, for callers deciding whether to retry
+        self.last_error = None
+
+    def get_active_ad_pages(self):
+        """
+        Fetch active ads from Facebook Marketing API one page at a time
+
+        Pages are requested lazily, so the caller can write a page before
+        the next one is fetched and only one page needs to be in memory.
+
+        Yields:
+            list: Ad dictionaries of one page (nothing if credentials are
+            not configured)
 
-    def get_active_ads(self):
+        Raises:
+            requests.exceptions.RequestException: If a page can't be fetched;
+            pages already yielded stay valid but the listing is incomplete
+            AdListingTruncated: After the last page, if AD_SYNC_MAX_ADS
+            stopped the listing before its end
         """
-        Fetch active ads from Facebook Marketing API
+        if not self.access_token or not self.ad_account_id:
+            current_app.logger.warning("Facebook credentials not configured")
+            return
+
+        url = f"{self.base_url}/act_{self.ad_account_id}/ads"
+
+        params = {
+            "access_token": self.access_token,
+            "fields": "id,name,status,campaign{id,name},adset{id,name},"
+            "creative{actor_id,effective_object_story_id}",
+            # ИСПРАВЛЕНИЕ: преобразуем массив в JSON строку
+            # Facebook API требует формат: effective_status=["ACTIVE","PAUSED"]
+            "effective_status": json.dumps(["ACTIVE", "PAUSED"]),
+            "limit": 100,
+        }
+
+        total = 0
+        next_url = url
+        truncated = False
+
+        # Handle pagination
+        while next_url:
+            try:
+                response = graph_request(
+                    "facebook",
+                    "ads",
+                    "GET",
+                    next_url,
+                    params=params if next_url == url else None,
+                )
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                current_app.logger.error("Facebook API error: %s", e)
+                if hasattr(e, "response") and e.response is not None:
+                    current_app.logger.error("Response: %s", e.response.text)
+                raise
+
+            data = response.json()
+            ads = data.get("data", [])
+            total += len(ads)
+
+            # Get next page URL
+            paging = data.get("paging", {})
+            next_url = paging.get("next")
+            params = None  # Clear params for subsequent requests
+
+            current_app.logger.info(
+                "Fetched %d ads from act_%s (total: %d)",
+                len(ads), self.ad_account_id, total
+            )
+
+            # Safety limit to prevent infinite loops
+            if self.max_ads and total >= self.max_ads and next_url:
+                current_app.logger.warning("Reached ad limit of %s", self.max_ads)
+                next_url = None
+                truncated = True
+
+            if ads:
+                yield ads
+
+        if truncated:
+            raise AdListingTruncated(
+                f"Ad listing of act_{self.ad_account_id} stopped at {total} ads (AD_SYNC_MAX_ADS)"
+            )
+
+        current_app.logger.info(
+            "Successfully fetched %d ads from Facebook", total
+        )
+
+    def get_lead_data(self, leadgen_id):
+        """
+        Fetch specific lead data from Facebook
+
+        Args:
+            leadgen_id: Facebook lead ID
 
         Returns:
-            list: List of ad dictionaries or None on error
+            dict: Lead data or None on error
         """
         try:
-            if not self.access_token or not self.ad_account_id:
-                current_app.logger.warning("Facebook credentials not configured")
+            if not self.access_token:
+                current_app.logger.warning("Facebook access token not configured")
                 return None
 
-            url = f"{self.base_url}/act_{self.ad_account_id}/ads"
+            url = f"{self.base_url}/{leadgen_id}"
 
             params = {
                 "access_token": self.access_token,
-                "fields": "id,name,status,campaign{id,name},adset{id,name}",
-                # ИСПРАВЛЕНИЕ: преобразуем массив в JSON строку
-                # Facebook API требует формат: effective_status=["ACTIVE","PAUSED"]
-                "effective_status": json.dumps(["ACTIVE", "PAUSED"]),
-                "limit": 100,
+                # field_data carries phone_number, which is also the lead's
+                # Messenger recipient (see lead_processor.lead_recipient)
+                "fields": "id,created_time,field_data",
             }
 
-            all_ads = []
-            next_url = url
+            response = graph_request("facebook", "lead", "GET", url, params=params)
+            response.raise_for_status()
 
-            # Handle pagination
-            while next_url:
-                response = requests.get(
-                    next_url, params=params if next_url == url else None
-                )
-                response.raise_for_status()
+            lead_data = response.json()
+            current_app.logger.info("Successfully fetched lead data for %s", leadgen_id)
+            return lead_data
+
+        except requests.exceptions.RequestException as e:
+            current_app.logger.error("Facebook API error fetching lead: %s", e)
+            if hasattr(e, "response") and e.response is not None:
+                current_app.logger.error("Response: %s", e.response.text)
+            self.last_error = e
+            return None
+        except Exception as e:
+            current_app.logger.error("Error fetching lead data: %s", e)
+            self.last_error = e
+            return None
 
-                data = response.json()
-                ads = data.get("data", [])
-                all_ads.extend(ads)
+    def get_ad_lead_form_id(self, ad_id):
+        """
+        Get the lead form used by an ad's creative
 
-                # Get next page URL
-                paging = data.get("paging", {})
-                next_url = paging.get("next")
-                params = None  # Clear params for subsequent requests
+        Args:
+            ad_id: Facebook ad ID
 
-                current_app.logger.info(
-                    f"Fetched {len(ads)} ads (total: {len(all_ads)})"
-                )
+        Returns:
+            str: Lead form ID or None if the ad has no lead form or on error
+        """
+        try:
+            if not self.access_token:
+                current_app.logger.warning("Facebook access token not configured")
+                return None
 
-                # Safety limit to prevent infinite loops
-                if len(all_ads) >= 1000:
-                    current_app.logger.warning("Reached ad limit of 1000")
-                    break
+            url = f"{self.base_url}/{ad_id}"
 
-            current_app.logger.info(
-                f"Successfully fetched {len(all_ads)} ads from Facebook"
-            )
-            return all_ads
+            params = {
+                "access_token": self.access_token,
+                "fields": "creative{object_story_spec}",
+            }
+
+            response = graph_request("facebook", "ad_creative", "GET", url, params=params)
+            response.raise_for_status()
+
+            story_spec = response.json().get("creative", {}).get("object_story_spec", {})
+            for key in ("link_data", "video_data"):
+                form_id = (
+                    story_spec.get(key, {})
+                    .get("call_to_action", {})
+                    .get("value", {})
+                    .get("lead_gen_form_id")
+                )
+                if form_id:
+                    return form_id
+            return None
 
         except requests.exceptions.RequestException as e:
-            current_app.logger.error(f"Facebook API error: {str(e)}")
+            current_app.logger.error("Facebook API error fetching ad creative: %s", e)
             if hasattr(e, "response") and e.response is not None:
-                current_app.logger.error(f"Response: {e.response.text}")
+                current_app.logger.error("Response: %s", e.response.text)
             return None
         except Exception as e:
-            current_app.logger.error(f"Error fetching ads: {str(e)}")
+            current_app.logger.error("Error fetching ad lead form: %s", e)
             return None
 
-    def get_lead_data(self, leadgen_id):
+    def get_form_leads_page(self, form_id, since=None, after=None, limit=100):
         """
-        Fetch specific lead data from Facebook
+        Fetch one page of leads submitted to a lead form
 
         Args:
-            leadgen_id: Facebook lead ID
+            form_id: Facebook lead form ID
+            since: Only return leads created after this datetime (UTC)
+            after: Paging cursor returned by the previous page
+            limit: Page size
 
         Returns:
-            dict: Lead data or None on error
+            dict: {'leads': [...], 'after': next cursor or None} or None on error
         """
         try:
             if not self.access_token:
                 current_app.logger.warning("Facebook access token not configured")
                 return None
 
-            url = f"{self.base_url}/{leadgen_id}"
+            url = f"{self.base_url}/{form_id}/leads"
 
             params = {
                 "access_token": self.access_token,
-                "fields": "id,created_time,field_data",
+                "fields": "id,created_time,ad_id,form_id,field_data",
+                "limit": limit,
             }
-
-            response = requests.get(url, params=params)
+            if since:
+                params["filtering"] = json.dumps([{
+                    "field": "time_created",
+                    "operator": "GREATER_THAN",
+                    "value": int(since.replace(tzinfo=timezone.utc).timestamp()),
+                }])
+            if after:
+                params["after"] = after
+
+            response = graph_request("facebook", "form_leads", "GET", url, params=params)
             response.raise_for_status()
 
-            lead_data = response.json()
-            current_app.logger.info(f"Successfully fetched lead data for {leadgen_id}")
-            return lead_data
+            data = response.json()
+            paging = data.get("paging", {})
+            next_after = paging.get("cursors", {}).get("after") if paging.get("next") else None
+
+            return {"leads": data.get("data", []), "after": next_after}
 
         except requests.exceptions.RequestException as e:
-            current_app.logger.error(f"Facebook API error fetching lead: {str(e)}")
+            current_app.logger.error("Facebook API error fetching form leads: %s", e)
             if hasattr(e, "response") and e.response is not None:
-                current_app.logger.error(f"Response: {e.response.text}")
+                current_app.logger.error("Response: %s", e.response.text)
             return None
         except Exception as e:
-            current_app.logger.error(f"Error fetching lead data: {str(e)}")
-            return None
\ No newline at end of file
+            current_app.logger.error("Error fetching form leads: %s", e)
+            return None
@@ -0,0 +1,67 @@
+import time
+import requests
+from app.metrics import observe_graph_call, graph_api_requests_total
+from app.profiling import record_graph_call
+from app.services.circuit_breaker import breakers, CircuitOpenError
+
+
+def is_transient_error(error):
+    """
+    Check whether a failed Graph API call is worth retrying later
+
+    Args:
+        error: Exception raised by the call, or None
+
+    Returns:
+        bool: True for an open circuit, timeouts, connection errors and
+            429/5xx responses (not for 4xx errors such as a deleted object
+            or a missing permission)
+    """
+    if isinstance(error, (CircuitOpenError, requests.exceptions.Timeout,
+                          requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and (response.status_code >= 500 or response.status_code == 429)
+
+
+def graph_request(service, endpoint, method, url, **kwargs):
+    """
+    Make a Graph API request and record its latency and outcome
+
+    The call goes through the circuit breaker of the endpoint's family and
+    fails fast with CircuitOpenError while the breaker rejects calls. It is
+    also added to the request profile when profiling is active.
+
+    Args:
+        service: Calling service, e.g. 'facebook' or 'messenger'
+        endpoint: Logical Graph endpoint used as the metrics label
+        method: HTTP method
+        url: Request URL
+        **kwargs: Passed to requests.request (timeout defaults to the
+            GRAPH_CONNECT/READ_TIMEOUT_SECONDS pair)
+
+    Returns:
+        requests.Response: Response (raises like requests on connection errors)
+    """
+    breaker = breakers.for_endpoint(endpoint)
+    if not breaker.allow():
+        graph_api_requests_total.inc(service, endpoint, 'rejected')
+        raise CircuitOpenError(f'Graph API {breaker.family} circuit is {breaker.state}')
+
+    kwargs.setdefault('timeout', breakers.timeout)
+    started = time.perf_counter()
+    try:
+        response = requests.request(method, url, **kwargs)
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        breaker.record(True, elapsed)
+        if isinstance(e, requests.exceptions.RequestException):
+            observe_graph_call(service, endpoint, started, error=e)
+            record_graph_call(service, endpoint, elapsed, type(e).__name__)
+        raise
+
+    elapsed = time.perf_counter() - started
+    breaker.record(response.status_code >= 500 or response.status_code == 429, elapsed)
+    observe_graph_call(service, endpoint, started, response=response)
+    record_graph_call(service, endpoint, elapsed, response.status_code)
+    return response
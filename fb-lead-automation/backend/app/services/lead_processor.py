@@ -0,0 +1,355 @@
+from flask import current_app
+from datetime import datetime, timezone
+from app.extensions import db
+from app.metrics import webhook_events_total
+from app.models import Ad, Lead, ArchivedLead
+from app.models.lead_field import normalize_field_value
+from app.services.facebook_service import FacebookService
+from app.services.messenger_service import MessengerService
+from app.services.template_service import TemplateService
+from app.services.circuit_breaker import breakers
+from app.services.deferred_work import park_work, finish_work
+from app.services.event_bus import event_bus
+from app.services.graph_api import is_transient_error
+from app.services.lead_writer import lead_writer
+from app.services.page_lanes import LaneFull, page_lanes
+
+
+def parse_field_data(field_data):
+    """
+    Flatten Graph API lead field_data into a dictionary
+
+    Args:
+        field_data: List of {'name': ..., 'values': [...]} entries
+
+    Returns:
+        dict: Field name to value (multi-value fields are comma-joined)
+    """
+    form_data = {}
+    for field in field_data or []:
+        name = field.get('name')
+        if not name:
+            continue
+        values = field.get('values') or []
+        form_data[name] = values[0] if len(values) == 1 else ', '.join(values)
+    return form_data
+
+
+def parse_graph_time(value):
+    """
+    Parse a Graph API timestamp (e.g. 2024-01-31T12:00:00+0000) to naive UTC
+
+    Args:
+        value: Timestamp string
+
+    Returns:
+        datetime: Naive UTC datetime, or the current time if missing/invalid
+    """
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z')
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+
+
+def process_lead(leadgen_id, ad_id, form_id, attempts=0):
+    """
+    Process a new lead from a leadgen webhook event
+
+    Fetches the lead from Facebook, stores it through the group-commit
+    lead writer (waiting until it is committed), fills the ad's message
+    template and queues it on the send lane of the ad's page. Publishes
+    lead and send events to the dashboard event bus.
+
+    If the lead can't be fetched because the Graph API leads circuit is
+    not closed or the error is transient (timeout, 429, 5xx), it is parked
+    as deferred work and retried later; other errors drop it. A lead is
+    never stored without its data.
+
+    Args:
+        leadgen_id: Facebook lead ID
+        ad_id: Facebook ad ID
+        form_id: Facebook lead form ID
+        attempts: Earlier deferred attempts (set by the deferred work job)
+
+    Returns:
+        Lead: Stored lead or None if it was skipped or deferred
+    """
+    if not leadgen_id:
+        webhook_events_total.inc('skipped')
+        return None
+
+    if (
+        Lead.query.filter_by(lead_id=leadgen_id).first()
+        or ArchivedLead.query.filter_by(lead_id=leadgen_id).first()
+    ):
+        current_app.logger.info('Lead %s already processed, skipping', leadgen_id)
+        webhook_events_total.inc('deduped')
+        return None
+
+    ad = Ad.query.filter_by(ad_id=ad_id).first()
+    if not ad:
+        current_app.logger.warning('Ad %s not found for lead %s', ad_id, leadgen_id)
+        webhook_events_total.inc('skipped')
+        return None
+
+    facebook_service = FacebookService()
+    lead_data = facebook_service.get_lead_data(leadgen_id)
+    if lead_data is None:
+        # Never store a lead without its data: it couldn't be messaged and
+        # the stored row would dedupe every later attempt
+        breaker = breakers.get('leads')
+        if breaker.healthy and not is_transient_error(facebook_service.last_error):
+            current_app.logger.error(
+                'Lead %s could not be fetched and is not retried: %s',
+                leadgen_id, facebook_service.last_error or 'access token not configured'
+            )
+            webhook_events_total.inc('failed')
+            return None
+
+        park_work(
+            'lead',
+            {'leadgen_id': leadgen_id, 'ad_id': ad_id, 'form_id': form_id},
+            attempts,
+            error=(
+                f'Graph API leads circuit is {breaker.state}' if not breaker.healthy
+                else str(facebook_service.last_error)
+            )
+        )
+        webhook_events_total.inc('deferred')
+        return None
+
+    form_data = parse_field_data(lead_data.get('field_data'))
+
+    lead = Lead(
+        lead_id=leadgen_id,
+        ad_id=ad.id,
+        user_name=form_data.get('full_name') or form_data.get('first_name')
+    )
+    lead.set_form_data(form_data)
+    lead = lead_writer.insert_lead(lead).result(
+        timeout=current_app.config['LEAD_WRITE_TIMEOUT_SECONDS']
+    )
+    webhook_events_total.inc('processed')
+
+    event_bus.publish('lead.created', lead.to_dict())
+
+    send_lead_message(lead, ad, form_data)
+    return lead
+
+
+def lead_recipient(lead):
+    """
+    Get the Messenger recipient of a lead
+
+    The Graph API doesn't expose who submitted a lead, so unless a
+    page-scoped user ID was stored for the lead, it is messaged through
+    Customer Matching on the phone number from its form (needs the
+    pages_messaging_phone_number permission).
+
+    Args:
+        lead: Lead instance
+
+    Returns:
+        dict: Send API recipient, or None if the lead has no usable one
+    """
+    if lead.user_fb_id:
+        return {'id': lead.user_fb_id}
+
+    phone = lead.get_form_data().get('phone_number')
+    if phone:
+        phone = normalize_field_value('phone_number', phone)
+        if phone.lstrip('+'):
+            return {'phone_number': phone}
+    return None
+
+
+def send_lead_message(lead, ad, form_data):
+    """
+    Fill the ad's template for a lead and queue it on the page's send lane
+
+    The message is sent asynchronously by the lane of the ad's page (see
+    page_lanes), so a busy page doesn't hold up sends for other pages. The
+    filled text is stored through the lead writer without waiting for it.
+    A send that doesn't fit in the lane's queue is parked as deferred work.
+
+    Args:
+        lead: Stored Lead instance (attached or detached)
+        ad: Ad the lead came from
+        form_data: Flattened lead form data
+
+    Returns:
+        Future: Resolves to True if the message was sent, or None if no
+            message was queued
+    """
+    template = ad.message_template
+    if not template or not template.is_active:
+        current_app.logger.info('No active template for ad %s, message not sent', ad.ad_id)
+        return None
+
+    template_service = TemplateService()
+    message_text = template_service.fill_template(
+        template.message_text,
+        form_data,
+        template.get_variables()
+    )
+    lead.message_text = message_text
+
+    if not lead_recipient(lead):
+        lead.error_message = 'No Messenger recipient for lead'
+        lead_writer.update_lead(
+            lead.id, message_text=message_text, error_message=lead.error_message
+        ).result(timeout=current_app.config['LEAD_WRITE_TIMEOUT_SECONDS'])
+        event_bus.publish('message.failed', lead.to_dict())
+        return None
+
+    lead_writer.update_lead(lead.id, message_text=message_text, message_queued_at=datetime.utcnow())
+
+    try:
+        return page_lanes.submit(
+            ad.page_id,
+            deliver_lead_message,
+            current_app._get_current_object(),
+            lead.id,
+            ad.page_id,
+            message_text
+        )
+    except LaneFull as e:
+        values = park_send(lead.id, ad.page_id, message_text, 0, str(e))
+        lead_writer.update_lead(lead.id, **values).result(
+            timeout=current_app.config['LEAD_WRITE_TIMEOUT_SECONDS']
+        )
+        event_bus.publish('message.failed', {**lead.to_dict(), **values})
+        return None
+
+
+def park_send(lead_id, page_id, message_text, attempts, error, item_id=None):
+    """
+    Park a Messenger send as deferred work
+
+    Args:
+        lead_id: Primary key of the lead
+        page_id: Facebook page to send as
+        message_text: Filled template
+        attempts: Attempts made so far
+        error: Why the send was parked
+        item_id: Deferred work item being replayed, if any
+
+    Returns:
+        dict: Lead column values recording the deferred (or dead) send
+    """
+    item = park_work(
+        'message',
+        {'lead_id': lead_id, 'page_id': page_id, 'message_text': message_text},
+        attempts,
+        error=error,
+        item_id=item_id
+    )
+    return {
+        'message_text': message_text,
+        'error_message': (
+            'Failed to send message via Messenger' if item.dead_at
+            else 'Messenger unavailable, send deferred'
+        )
+    }
+
+
+def deliver_lead_message(app, lead_id, page_id, message_text, attempts=0, deferred_id=None):
+    """
+    Send a lead's prepared message via Messenger (runs on a send lane)
+
+    A send that fails while the Graph API messages circuit is not closed is
+    parked as deferred work and retried later. A replayed send deletes its
+    deferred work item once it is done, or reschedules it.
+
+    Args:
+        app: Flask application instance
+        lead_id: Primary key of the lead
+        page_id: Facebook page to send as
+        message_text: Filled template (its write may not be committed yet)
+        attempts: Earlier deferred attempts (set by the deferred work job)
+        deferred_id: Deferred work item being replayed (set by the job)
+
+    Returns:
+        bool: True if the message was sent
+    """
+    with app.app_context():
+        try:
+            lead = db.session.get(Lead, lead_id)
+            if not lead or lead.message_sent:
+                finish_work(deferred_id)
+                return False
+
+            messenger_service = MessengerService(page_id=page_id)
+            if messenger_service.send_message(lead_recipient(lead), message_text):
+                values = {
+                    'message_text': message_text,
+                    'message_sent': True,
+                    'message_sent_at': datetime.utcnow(),
+                    'error_message': None
+                }
+            elif not breakers.get('messages').healthy:
+                values = park_send(
+                    lead_id, page_id, message_text, attempts,
+                    f"Graph API messages circuit is {breakers.get('messages').state}",
+                    item_id=deferred_id
+                )
+                deferred_id = None
+            else:
+                values = {
+                    'message_text': message_text,
+                    'error_message': 'Failed to send message via Messenger'
+                }
+
+            lead_writer.update_lead(lead_id, **values).result(
+                timeout=app.config['LEAD_WRITE_TIMEOUT_SECONDS']
+            )
+            finish_work(deferred_id)
+
+            sent = values.get('message_sent', False)
+            event_bus.publish(
+                'message.sent' if sent else 'message.failed',
+                {**lead.to_dict(), **values}
+            )
+            return sent
+
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error('Error sending message for lead %s: %s', lead_id, e)
+            return False
+        finally:
+            db.session.remove()
+
+
+def shutdown_send_lanes():
+    """
+    Stop the send lanes on shutdown without losing queued sends
+
+    Sends that haven't started are parked as deferred work, to be replayed
+    by whichever process runs the scheduler; running sends are waited for.
+    Replayed sends are already stored and are left to their work item.
+
+    Returns:
+        int: Number of sends parked
+    """
+    parked = 0
+    for func, args in page_lanes.shutdown(wait=True):
+        if func is not deliver_lead_message:
+            continue
+        app, lead_id, page_id, message_text, *replay = args
+        if len(replay) > 1 and replay[1]:
+            continue
+
+        with app.app_context():
+            try:
+                values = park_send(lead_id, page_id, message_text, 0, 'Send queued at shutdown')
+                lead_writer.update_lead(lead_id, **values).result(
+                    timeout=app.config['LEAD_WRITE_TIMEOUT_SECONDS']
+                )
+                parked += 1
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error('Error parking queued send for lead %s: %s', lead_id, e)
+            finally:
+                db.session.remove()
+    return parked
@@ -0,0 +1,214 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.metrics import lead_write_batch_size, lead_write_commit_seconds, lead_write_errors_total
+from app.models import Lead
+from app.services.change_tracking import session_version
+from app.services.rollups import RollupDeltas, lead_status
+
+_STOP = object()
+
+
+class LeadWriter:
+    """
+    Group-commit writer for the lead pipeline
+
+    Lead inserts and status updates from webhook requests and send lanes are
+    queued and written by one background thread, in a single transaction per
+    LEAD_WRITE_BATCH_SIZE writes or LEAD_WRITE_MAX_DELAY_MS, whichever comes
+    first. Each caller gets a Future that resolves once its write is
+    committed, so one commit (an fsync on SQLite) covers the whole batch.
+    The campaign and ad set lead counters are updated in the same
+    transaction (see RollupDeltas).
+    """
+
+    def __init__(self, batch_size=100, max_delay_ms=5):
+        self.app = None
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Bind the writer to an app and load the batch limits from its config"""
+        self.shutdown()
+        self.app = app
+        self.batch_size = max(1, app.config.get('LEAD_WRITE_BATCH_SIZE', self.batch_size))
+        self.max_delay = app.config.get('LEAD_WRITE_MAX_DELAY_MS', self.max_delay * 1000) / 1000
+
+    def insert_lead(self, lead):
+        """
+        Queue a new lead for insertion
+
+        Args:
+            lead: Transient Lead instance, not added to any session
+
+        Returns:
+            Future: Resolves to the lead once committed (detached, with its
+                id and column defaults loaded)
+        """
+        return self._submit(('insert', lead))
+
+    def update_lead(self, lead_id, **values):
+        """
+        Queue an update of a lead's columns
+
+        Args:
+            lead_id: Primary key of the lead
+            **values: Column values to set
+
+        Returns:
+            Future: Resolves to None once committed
+        """
+        return self._submit(('update', lead_id, values))
+
+    def _submit(self, op):
+        if self.app is None:
+            raise RuntimeError('LeadWriter is not initialized (call init_app first)')
+
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='lead-writer', daemon=True)
+                self._thread.start()
+            self._queue.put((op, future))
+        return future
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._write(batch)
+                if stop:
+                    return
+
+    def _next_batch(self):
+        """Wait for a write, then collect more until the batch is full or the delay is up"""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        session = Session(db.engine, expire_on_commit=False)
+        try:
+            try:
+                deltas = RollupDeltas()
+                states = self._lead_states(session, [op for op, _ in batch])
+                results = [self._apply(session, op, deltas, states) for op, _ in batch]
+                deltas.apply(session)
+                session.commit()
+            except Exception:
+                session.rollback()
+                lead_write_errors_total.inc()
+                self._write_each(session, batch)
+                return
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            session.close()
+            lead_write_batch_size.observe(len(batch))
+            lead_write_commit_seconds.observe(time.perf_counter() - started)
+
+    def _write_each(self, session, batch):
+        """Retry a failed batch one write per transaction, so only the bad writes fail"""
+        for op, future in batch:
+            if op[0] == 'insert':
+                # Forget the keys assigned by the rolled back flush
+                op[1].id = None
+                for field in op[1].fields:
+                    field.id = None
+            try:
+                deltas = RollupDeltas()
+                result = self._apply(session, op, deltas, self._lead_states(session, [op]))
+                deltas.apply(session)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                future.set_exception(e)
+            else:
+                # Detach it so a later rollback in this session doesn't expire it
+                session.expunge_all()
+                future.set_result(result)
+
+    def _lead_states(self, session, ops):
+        """Load the sent/error state of the leads whose status the updates may change"""
+        lead_ids = {
+            op[1] for op in ops
+            if op[0] == 'update' and ('message_sent' in op[2] or 'error_message' in op[2])
+        }
+        if not lead_ids:
+            return {}
+        rows = session.execute(
+            select(Lead.id, Lead.ad_id, Lead.message_sent, Lead.error_message)
+            .where(Lead.id.in_(lead_ids))
+        )
+        return {lead_id: [ad_id, sent, error] for lead_id, ad_id, sent, error in rows}
+
+    def _apply(self, session, op, deltas, states):
+        if op[0] == 'insert':
+            lead = op[1]
+            session.add(lead)
+            deltas.lead_added(lead.ad_id, lead_status(lead.message_sent, lead.error_message))
+            return lead
+
+        _, lead_id, values = op
+        session.execute(
+            update(Lead).where(Lead.id == lead_id)
+            .values(**values, change_version=session_version(session))
+        )
+
+        state = states.get(lead_id)
+        if state is not None:
+            old_status = lead_status(state[1], state[2])
+            state[1] = values.get('message_sent', state[1])
+            state[2] = values.get('error_message', state[2])
+            deltas.status_changed(state[0], old_status, lead_status(state[1], state[2]))
+        return None
+
+    def shutdown(self, wait=True):
+        """Stop the writer thread after it has written everything queued so far"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+        if wait:
+            thread.join()
+
+    def _after_fork(self):
+        """A forked child (e.g. a gunicorn worker) starts its own writer thread"""
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+
+lead_writer = LeadWriter()
+
+atexit.register(lead_writer.shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lead_writer._after_fork)
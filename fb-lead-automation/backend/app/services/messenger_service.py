@@ -1,19 +1,35 @@
 import requests
 from flask import current_app
+from app.services.graph_api import graph_request
 
 class MessengerService:
     """Service for sending messages via Facebook Messenger API"""
 
-    def __init__(self):
-        self.page_access_token = current_app.config.get('PAGE_ACCESS_TOKEN')
-        self.base_url = 'https://graph.facebook.com/v18.0/me/messages'
+    def __init__(self, page_id=None):
+        """
+        Args:
+            page_id: Send as this registered page (see PAGE_ACCESS_TOKENS);
+                unregistered pages fall back to PAGE_ACCESS_TOKEN
+        """
+        from app.services.page_lanes import page_lanes
+
+        page_token = page_lanes.get_access_token(page_id) if page_id else None
+        graph_url = current_app.config.get('FACEBOOK_GRAPH_URL')
+
+        if page_token:
+            self.page_access_token = page_token
+            self.base_url = f'{graph_url}/v18.0/{page_id}/messages'
+        else:
+            self.page_access_token = current_app.config.get('PAGE_ACCESS_TOKEN')
+            self.base_url = f'{graph_url}/v18.0/me/messages'
 
     def send_message(self, recipient_id, message_text):
         """
         Send a message to a user via Messenger
 
         Args:
-            recipient_id: Facebook user ID
+            recipient_id: Page-scoped user ID, or a Send API recipient
+                dictionary (e.g. {'phone_number': '+15551234567'})
             message_text: Message text to send
 
         Returns:
@@ -29,7 +45,7 @@ class MessengerService:
                 return False
 
             payload = {
-                'recipient': {
+                'recipient': recipient_id if isinstance(recipient_id, dict) else {
                     'id': recipient_id
                 },
                 'message': {
@@ -41,7 +57,10 @@ class MessengerService:
                 'access_token': self.page_access_token
             }
 
-            response = requests.post(
+            response = graph_request(
+                'messenger',
+                'messages',
+                'POST',
                 self.base_url,
                 params=params,
                 json=payload
@@ -53,17 +72,17 @@ class MessengerService:
             message_id = result.get('message_id')
 
             if message_id:
-                current_app.logger.info(f'Message sent successfully to {recipient_id} (message_id: {message_id})')
+                current_app.logger.info('Message sent successfully to %s (message_id: %s)', recipient_id, message_id)
                 return True
             else:
-                current_app.logger.warning(f'No message_id in response: {result}')
+                current_app.logger.warning('No message_id in response: %s', result)
                 return False
 
         except requests.exceptions.RequestException as e:
-            current_app.logger.error(f'Messenger API error: {str(e)}')
+            current_app.logger.error('Messenger API error: %s', e)
             if hasattr(e, 'response') and e.response is not None:
-                current_app.logger.error(f'Response: {e.response.text}')
+                current_app.logger.error('Response: %s', e.response.text)
             return False
         except Exception as e:
-            current_app.logger.error(f'Error sending message: {str(e)}')
+            current_app.logger.error('Error sending message: %s', e)
             return False
@@ -0,0 +1,238 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, float(rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available (no limit when rate <= 0)"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class LaneFull(Exception):
+    """A send lane already holds as many sends as it may queue"""
+
+
+class SendLane:
+    """
+    Independent send queue for one Facebook page
+
+    Each lane has its own worker threads and rate limiter, so a page with a
+    large backlog only delays its own messages. The queue lives in memory,
+    so it is bounded: callers park what doesn't fit (see LaneFull).
+    """
+
+    def __init__(self, page_id, concurrency, rate, max_pending=0):
+        self.page_id = page_id
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.limiter = RateLimiter(rate)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix=f'send-{page_id or "default"}'
+        )
+        self._lock = threading.Lock()
+        self._queued = {}
+        self.pending = 0
+        self.sent = 0
+        self.failed = 0
+
+    def submit(self, func, *args):
+        """
+        Queue a send on this lane
+
+        Args:
+            func: Callable performing the send, returns True on success
+            *args: Arguments for func
+
+        Returns:
+            Future: Resolves to the result of func
+
+        Raises:
+            LaneFull: max_pending sends are already queued or running
+        """
+        with self._lock:
+            if self.max_pending and self.pending >= self.max_pending:
+                raise LaneFull(f'Send lane {self.page_id or "default"} has {self.pending} sends queued')
+            self.pending += 1
+        future = self._executor.submit(self._run, func, args)
+        with self._lock:
+            self._queued[future] = (func, args)
+        # Runs right away if the send already finished
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._queued.pop(future, None)
+
+    def _run(self, func, args):
+        ok = False
+        try:
+            self.limiter.acquire()
+            ok = func(*args)
+            return ok
+        finally:
+            with self._lock:
+                self.pending -= 1
+                if ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'page_id': self.page_id,
+                'concurrency': self.concurrency,
+                'rate_per_second': self.limiter.rate,
+                'pending': self.pending,
+                'sent': self.sent,
+                'failed': self.failed
+            }
+
+    def shutdown(self, wait=True):
+        """
+        Stop the lane, cancelling sends that haven't started
+
+        Args:
+            wait: Wait for the sends already running
+
+        Returns:
+            list: (func, args) of the cancelled sends
+        """
+        with self._lock:
+            queued = list(self._queued.items())
+        cancelled = [send for future, send in queued if future.cancel()]
+        with self._lock:
+            self.pending -= len(cancelled)
+        self._executor.shutdown(wait=wait)
+        return cancelled
+
+
+class PageLanes:
+    """
+    Registry of Facebook pages and their Messenger send lanes
+
+    Pages are configured with PAGE_ACCESS_TOKENS (page_id:token pairs).
+    Messages for ads whose page is not registered go through the default
+    lane, which uses PAGE_ACCESS_TOKEN.
+    """
+
+    def __init__(self, concurrency=2, rate=10, max_pending=0):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_pending = max_pending
+        self.page_tokens = {}
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Load the page registry and lane limits from the application config"""
+        self.page_tokens = dict(app.config.get('PAGE_ACCESS_TOKENS') or {})
+        self.concurrency = app.config.get('PAGE_SEND_CONCURRENCY', self.concurrency)
+        self.rate = app.config.get('PAGE_SEND_RATE_PER_SECOND', self.rate)
+        self.max_pending = app.config.get('PAGE_SEND_QUEUE_SIZE', self.max_pending)
+
+    def resolve_page(self, page_id):
+        """
+        Get the lane key for a page
+
+        Args:
+            page_id: Facebook page ID or None
+
+        Returns:
+            str: page_id if it is registered, otherwise None (default lane)
+        """
+        return page_id if page_id in self.page_tokens else None
+
+    def get_access_token(self, page_id):
+        """Get the registered page access token for a page, if any"""
+        return self.page_tokens.get(page_id)
+
+    def lane(self, page_id):
+        """
+        Get (or create) the send lane for a page
+
+        Args:
+            page_id: Facebook page ID or None
+
+        Returns:
+            SendLane: Lane for the page, or the default lane
+        """
+        key = self.resolve_page(page_id)
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = SendLane(key, self.concurrency, self.rate, self.max_pending)
+                self._lanes[key] = lane
+            return lane
+
+    def submit(self, page_id, func, *args):
+        """Queue a send on the page's lane (raises LaneFull if it is full)"""
+        return self.lane(page_id).submit(func, *args)
+
+    def stats(self):
+        """
+        Get per-lane counters plus registered pages without a lane yet
+
+        Returns:
+            list: Lane stats dictionaries
+        """
+        with self._lock:
+            lanes = dict(self._lanes)
+
+        stats = [lane.stats() for lane in lanes.values()]
+        for page_id in self.page_tokens:
+            if page_id not in lanes:
+                stats.append({
+                    'page_id': page_id,
+                    'concurrency': self.concurrency,
+                    'rate_per_second': self.rate,
+                    'pending': 0,
+                    'sent': 0,
+                    'failed': 0
+                })
+        return stats
+
+    def shutdown(self, wait=True):
+        """
+        Stop all lanes, cancelling sends that haven't started
+
+        Args:
+            wait: Wait for the sends already running
+
+        Returns:
+            list: (func, args) of the cancelled sends, for the caller to park
+        """
+        with self._lock:
+            lanes = list(self._lanes.values())
+            self._lanes = {}
+        cancelled = []
+        for lane in lanes:
+            cancelled.extend(lane.shutdown(wait=wait))
+        return cancelled
+
+
+page_lanes = PageLanes()
@@ -0,0 +1,163 @@
+from collections import defaultdict
+
+from sqlalchemy import bindparam, case, func, select
+
+from app.models import Ad, AdSet, Campaign, Lead, LeadArchiveStat
+
+# Index of each status in the [leads, sent, failed] counter lists
+_STATUS_INDEX = {'sent': 1, 'failed': 2}
+
+
+def lead_status(message_sent, error_message):
+    """
+    Status a lead is counted under (same rules as the leads status filter)
+
+    Args:
+        message_sent: Lead.message_sent
+        error_message: Lead.error_message
+
+    Returns:
+        str: 'sent', 'failed' or 'pending'
+    """
+    if message_sent:
+        return 'sent'
+    if error_message is not None:
+        return 'failed'
+    return 'pending'
+
+
+def count_ad_leads(session, ad_pks):
+    """
+    Count the leads of some ads, archived ones included
+
+    Args:
+        session: Session to query with
+        ad_pks: Primary keys of the ads
+
+    Returns:
+        dict: Ad primary key to [leads, sent, failed] (ads without leads are left out)
+    """
+    counts = defaultdict(lambda: [0, 0, 0])
+    if not ad_pks:
+        return counts
+
+    hot_counts = session.execute(
+        select(
+            Lead.ad_id,
+            func.count(Lead.id),
+            func.sum(case((Lead.message_sent == True, 1), else_=0)),
+            func.sum(case(
+                ((Lead.message_sent == False) & Lead.error_message.isnot(None), 1),
+                else_=0
+            ))
+        ).where(Lead.ad_id.in_(ad_pks)).group_by(Lead.ad_id)
+    ).all()
+    archived_counts = session.execute(
+        select(LeadArchiveStat.ad_id, LeadArchiveStat.total, LeadArchiveStat.sent, LeadArchiveStat.failed)
+        .where(LeadArchiveStat.ad_id.in_(ad_pks))
+    ).all()
+
+    for ad_pk, leads, sent, failed in hot_counts + archived_counts:
+        ad_counts = counts[ad_pk]
+        ad_counts[0] += leads or 0
+        ad_counts[1] += sent or 0
+        ad_counts[2] += failed or 0
+    return counts
+
+
+class RollupDeltas:
+    """
+    Changes to the campaign and ad set lead counters, applied in one go
+
+    Writers record per-ad changes as they write leads and apply them in the
+    same transaction, so the counters match the committed leads without a
+    GROUP BY over them. Ads never move between campaigns or ad sets, so an
+    ad's leads always count towards the same rows.
+    """
+
+    def __init__(self):
+        self._ads = defaultdict(lambda: [0, 0, 0])  # ad pk -> [leads, sent, failed]
+
+    def lead_added(self, ad_pk, status, count=1):
+        """Count new leads of an ad (negative counts remove them)"""
+        counts = self._ads[ad_pk]
+        counts[0] += count
+        if status in _STATUS_INDEX:
+            counts[_STATUS_INDEX[status]] += count
+
+    def status_changed(self, ad_pk, old_status, new_status):
+        """Move a lead of an ad from one status to another"""
+        if old_status == new_status:
+            return
+        counts = self._ads[ad_pk]
+        if old_status in _STATUS_INDEX:
+            counts[_STATUS_INDEX[old_status]] -= 1
+        if new_status in _STATUS_INDEX:
+            counts[_STATUS_INDEX[new_status]] += 1
+
+    def ads_removed(self, session, ad_pks):
+        """
+        Uncount all leads of ads that are about to be deleted
+
+        Must run before the ads are deleted. Archived leads are uncounted
+        too, like the ads' archive counters are dropped.
+
+        Args:
+            session: Session of the deleting transaction
+            ad_pks: Primary keys of the ads
+        """
+        for ad_pk, (leads, sent, failed) in count_ad_leads(session, ad_pks).items():
+            counts = self._ads[ad_pk]
+            counts[0] -= leads
+            counts[1] -= sent
+            counts[2] -= failed
+
+    def apply(self, session):
+        """
+        Add the recorded changes to the counters of the ads' campaigns and ad sets
+
+        Issues one SELECT for the ads plus one executemany UPDATE per table.
+
+        Args:
+            session: Session of the transaction that wrote the leads
+        """
+        ad_counts = {ad_pk: counts for ad_pk, counts in self._ads.items() if any(counts)}
+        self._ads.clear()
+        if not ad_counts:
+            return
+
+        campaigns = defaultdict(lambda: [0, 0, 0])
+        adsets = defaultdict(lambda: [0, 0, 0])
+        rows = session.execute(
+            select(Ad.id, Ad.campaign_id, Ad.adset_id).where(Ad.id.in_(ad_counts))
+        ).all()
+        for ad_pk, campaign_id, adset_id in rows:
+            for key, totals in ((campaign_id, campaigns), (adset_id, adsets)):
+                if key is not None:
+                    totals[key] = [total + delta for total, delta in zip(totals[key], ad_counts[ad_pk])]
+
+        _add_counts(session, Campaign, 'campaign_id', campaigns)
+        _add_counts(session, AdSet, 'adset_id', adsets)
+
+
+def _add_counts(session, model, key_column, deltas):
+    params = [
+        {'row_key': key, 'leads': leads, 'sent': sent, 'failed': failed}
+        # Sorted so concurrent writers lock rows in the same order
+        for key, (leads, sent, failed) in sorted(deltas.items())
+        if leads or sent or failed
+    ]
+    if not params:
+        return
+
+    table = model.__table__
+    session.execute(
+        table.update()
+        .where(table.c[key_column] == bindparam('row_key'))
+        .values(
+            lead_count=table.c.lead_count + bindparam('leads'),
+            sent_count=table.c.sent_count + bindparam('sent'),
+            failed_count=table.c.failed_count + bindparam('failed')
+        ),
+        params
+    )
@@ -36,7 +36,7 @@ class TemplateService:
 
                 # If still not found, leave placeholder or use empty string
                 if value is None:
-                    current_app.logger.warning(f'Placeholder {{{{{placeholder}}}}} not found in data or variables')
+                    current_app.logger.warning('Placeholder {{%s}} not found in data or variables', placeholder)
                     value = ''
 
                 # Replace placeholder
@@ -45,7 +45,7 @@ class TemplateService:
             return filled_text
 
         except Exception as e:
-            current_app.logger.error(f'Error filling template: {str(e)}')
+            current_app.logger.error('Error filling template: %s', e)
             return template_text
 
     def extract_placeholders(self, template_text):
@@ -70,5 +70,5 @@ class TemplateService:
             return list(set(matches))
 
         except Exception as e:
-            current_app.logger.error(f'Error extracting placeholders: {str(e)}')
+            current_app.logger.error('Error extracting placeholders: %s', e)
             return []
@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Records how long each create_app phase takes"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named startup phase"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, logger):
+        """Log the per-phase breakdown and total startup time"""
+        if not self.enabled:
+            return
+
+        total = time.perf_counter() - self._started
+        breakdown = ', '.join(f'{name}={elapsed * 1000:.1f}ms' for name, elapsed in self.phases)
+        logger.info('App startup took %.1fms (%s)', total * 1000, breakdown)
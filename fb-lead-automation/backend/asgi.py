@@ -0,0 +1,5 @@
+from app import create_app
+from app.asgi import WebhookASGIApp
+
+# Scheduled jobs run in the gunicorn workers or worker.py, never here
+app = WebhookASGIApp(create_app())
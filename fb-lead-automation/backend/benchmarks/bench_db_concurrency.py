@@ -0,0 +1,126 @@
+"""
+Concurrent ad sync and webhook writes against SQLite
+
+Runs a sync-style writer (large upsert transactions on ads) next to several
+webhook-style writers (one lead insert per transaction) and dashboard-style
+readers, then reports throughput and "database is locked" errors. Run with
+--no-profile to compare against the default rollback-journal settings.
+
+Usage:
+    python benchmarks/bench_db_concurrency.py [--seconds 5] [--writers 4] [--no-profile]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Ad, Lead
+
+
+def make_config(path, use_profile):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SCHEDULER_ENABLED = False
+
+    if not use_profile:
+        # Driver defaults: rollback journal, synchronous=FULL, 5s lock timeout
+        BenchConfig.DB_ENGINE_PROFILE = 'none'
+    return BenchConfig
+
+
+def run(seconds, writers, use_profile):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app(make_config(path, use_profile))
+
+    with app.app_context():
+        db.create_all()
+        ad = Ad(ad_id='bench', ad_name='bench')
+        db.session.add(ad)
+        db.session.commit()
+        ad_pk = ad.id
+
+    stats = {'sync_batches': 0, 'leads': 0, 'reads': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def count(key):
+        with lock:
+            stats[key] += 1
+
+    def sync_writer():
+        with app.app_context():
+            batch = 0
+            while time.monotonic() < deadline:
+                try:
+                    for i in range(500):
+                        ad_id = f'sync-{i}'
+                        existing = Ad.query.filter_by(ad_id=ad_id).first()
+                        if existing:
+                            existing.ad_name = f'Ad {i} v{batch}'
+                        else:
+                            db.session.add(Ad(ad_id=ad_id, ad_name=f'Ad {i}'))
+                    db.session.commit()
+                    count('sync_batches')
+                except OperationalError:
+                    db.session.rollback()
+                    count('locked')
+                batch += 1
+
+    def webhook_writer(worker):
+        with app.app_context():
+            n = 0
+            while time.monotonic() < deadline:
+                try:
+                    db.session.add(Lead(lead_id=f'{worker}-{n}', ad_id=ad_pk))
+                    db.session.commit()
+                    count('leads')
+                except OperationalError:
+                    db.session.rollback()
+                    count('locked')
+                n += 1
+
+    def reader():
+        with app.app_context():
+            while time.monotonic() < deadline:
+                try:
+                    Lead.query.count()
+                    count('reads')
+                except OperationalError:
+                    db.session.rollback()
+                    count('locked')
+                db.session.remove()
+
+    threads = [threading.Thread(target=sync_writer), threading.Thread(target=reader)]
+    threads += [threading.Thread(target=webhook_writer, args=(w,)) for w in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats['profile'] = use_profile
+    stats['leads_per_sec'] = round(stats['leads'] / seconds, 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--no-profile', action='store_true')
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.seconds, args.writers, not args.no_profile), indent=2))
+
+
+if __name__ == '__main__':
+    main()
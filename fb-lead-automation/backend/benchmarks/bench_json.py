@@ -0,0 +1,111 @@
+"""
+Benchmark JSON serialization of a leads page
+
+Compares the previous path (to_dict() calling isoformat() per field, encoded
+by Flask's stdlib provider) with AppJSONProvider (raw datetimes, orjson when
+installed) and reports the compressed payload size.
+
+Usage:
+    python benchmarks/bench_json.py [--rows 100] [--repeat 200]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import AppJSONProvider, orjson
+from app.models import Lead
+
+
+def build_leads(rows):
+    """Build transient leads with realistic form data and message text"""
+    now = datetime.utcnow()
+    leads = []
+    for i in range(rows):
+        lead = Lead(
+            id=i + 1,
+            lead_id=f'{1000000000 + i}',
+            ad_id=(i % 50) + 1,
+            user_fb_id=f'{2000000000 + i}',
+            user_name=f'User {i}',
+            message_sent=i % 3 != 0,
+            message_text='Hello {0}, thanks for your interest! '.format(i) * 20,
+            message_sent_at=now - timedelta(minutes=i),
+            error_message=None if i % 3 else 'Recipient not reachable',
+            created_at=now - timedelta(minutes=i, seconds=30),
+        )
+        lead.set_form_data({
+            'first_name': f'First{i}',
+            'last_name': f'Last{i}',
+            'email': f'user{i}@example.com',
+            'phone': f'+1555{i:07d}',
+            'city': 'Springfield',
+        })
+        leads.append(lead)
+    return leads
+
+
+def legacy_to_dict(lead):
+    """Lead.to_dict() as it was before the JSON provider handled datetimes"""
+    data = lead.to_dict()
+    for key in ('message_sent_at', 'created_at'):
+        data[key] = data[key].isoformat() if data[key] else None
+    return data
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    legacy_app = Flask('legacy')
+    legacy_provider = DefaultJSONProvider(legacy_app)
+    app = Flask('current')
+    provider = AppJSONProvider(app)
+
+    leads = build_leads(args.rows)
+
+    legacy_time, legacy_body = timed(
+        lambda: legacy_provider.dumps(
+            {'success': True, 'data': [legacy_to_dict(lead) for lead in leads]},
+            separators=(',', ':')
+        ),
+        args.repeat
+    )
+    current_time, current_body = timed(
+        lambda: provider.dumps({'success': True, 'data': [lead.to_dict() for lead in leads]}),
+        args.repeat
+    )
+
+    assert json.loads(legacy_body) == json.loads(current_body)
+
+    results = {
+        'rows': args.rows,
+        'encoder': 'orjson' if orjson is not None else 'stdlib',
+        'legacy_ms': round(legacy_time * 1000, 3),
+        'current_ms': round(current_time * 1000, 3),
+        'speedup': round(legacy_time / current_time, 2),
+        'payload_bytes': len(current_body.encode('utf-8')),
+        'gzip_bytes': len(gzip.compress(current_body.encode('utf-8'), compresslevel=6)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
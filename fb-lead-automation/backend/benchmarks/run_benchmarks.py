@@ -0,0 +1,534 @@
+"""
+Benchmark suite for the backend hot paths
+
+Suites:
+    template   TemplateService.fill_template with small/medium/large templates
+    serialize  Lead.to_dict / Ad.to_dict list serialization
+    ad_sync    Full ad sync of 1k/10k/50k ads against a local Graph API stub
+    webhook    Webhook signature verification + JSON parsing throughput
+    leads_api  GET /api/leads and /api/leads/stats latency on a large table
+
+The suites run --runs times, interleaved so each case's runs are spread
+out over the whole benchmark. Every case reports the median_ms and min_ms
+of all its timings. Results are printed as JSON and can be saved with
+--output.
+Baselines are stored per size set (baselines/full.json, baselines/quick.json).
+--compare checks the run against the baseline of its size set and exits
+with status 1 if any case got more than --threshold slower in both min_ms
+and median_ms; it refuses (status 2) a missing baseline or one recorded
+with other sizes. --save-baseline stores this run's cases in the baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--suite template --suite ad_sync] [--quick]
+        [--runs 3] [--output results.json] [--compare] [--save-baseline] [--threshold 0.3]
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Ad, Lead
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+
+SIZES = {
+    'full': {'sync_ads': [1000, 10000, 50000], 'leads_rows': 1000000, 'serialize_rows': [100, 1000]},
+    'quick': {'sync_ads': [1000], 'leads_rows': 20000, 'serialize_rows': [100]},
+}
+
+APP_SECRET = 'bench-app-secret'
+
+
+def make_app(path, **overrides):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SCHEDULER_ENABLED = False
+        METRICS_DIR = ''
+        PROFILING_ENABLED = False
+        FACEBOOK_APP_SECRET = APP_SECRET
+
+    for key, value in overrides.items():
+        setattr(BenchConfig, key, value)
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+# Rate fields derived from median_ms, rescaled when runs are merged
+PER_OPERATION_FIELDS = ('per_call_us', 'per_request_us')
+THROUGHPUT_FIELDS = ('ads_per_sec', 'requests_per_sec')
+
+
+def summarize(timings):
+    """
+    Reduce the timings of a case
+
+    Returns:
+        dict: median_ms, min_ms and the timings themselves
+    """
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'min_ms': round(min(timings), 4),
+        'timings': timings,
+    }
+
+
+def measure(func, repeat, warmup=1):
+    """
+    Time func over several runs
+
+    Returns:
+        dict: median_ms, min_ms and the timings
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return summarize(timings)
+
+
+# Graph API stub
+
+class GraphStub:
+    """
+    Local Graph API serving /v24.0/act_<id>/ads with cursor paging
+
+    Runs an HTTP server in a background thread so FacebookService exercises
+    its real request/pagination code.
+    """
+
+    def __init__(self, ads_per_account):
+        self.ads_per_account = ads_per_account
+        self._pages = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = stub.render(urlparse(self.path))
+                self.send_response(200 if body else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def render(self, url):
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 3 or not parts[1].startswith('act_') or parts[2] != 'ads':
+            return b''
+
+        account_id = parts[1][4:]
+        query = parse_qs(url.query)
+        limit = int(query.get('limit', ['100'])[0])
+        offset = int(query.get('after', ['0'])[0])
+
+        key = (account_id, offset, limit)
+        if key not in self._pages:
+            end = min(offset + limit, self.ads_per_account)
+            data = {
+                'data': [
+                    {
+                        'id': f'{account_id}{i:08d}',
+                        'name': f'Ad {i}',
+                        'status': 'ACTIVE' if i % 5 else 'PAUSED',
+                        'campaign': {'id': f'c{i // 100}', 'name': f'Campaign {i // 100}'},
+                        'adset': {'id': f's{i // 20}', 'name': f'Ad set {i // 20}'},
+                        'creative': {'actor_id': f'p{i % 3}'},
+                    }
+                    for i in range(offset, end)
+                ],
+                'paging': {'cursors': {'before': str(offset), 'after': str(end)}},
+            }
+            if end < self.ads_per_account:
+                data['paging']['next'] = (
+                    f'{self.url}/v24.0/act_{account_id}/ads?limit={limit}&after={end}'
+                )
+            self._pages[key] = json.dumps(data).encode('utf-8')
+        return self._pages[key]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Suites
+
+def bench_template(workdir, sizes):
+    from app.services.template_service import TemplateService
+
+    app = make_app(os.path.join(workdir, 'template.db'))
+    service = TemplateService()
+    results = {}
+
+    # name: (placeholders, template length, calls per timed run)
+    cases = {'small': (2, 100, 5000), 'medium': (10, 1000, 1000), 'large': (50, 10000, 100)}
+    with app.app_context():
+        for name, (placeholders, length, calls) in cases.items():
+            fields = {f'field_{i}': f'value {i}' for i in range(placeholders)}
+            chunk = ' '.join(f'{{{{{field}}}}}' for field in fields)
+            filler = 'Thanks for reaching out, we will get back to you shortly. '
+            body = (filler * (length // len(filler) + 1))[:max(0, length - len(chunk))]
+            template = f'{chunk} {body}'
+
+            timing = measure(lambda: [service.fill_template(template, fields) for _ in range(calls)], 9)
+            results[f'template.fill_{name}'] = {
+                **timing,
+                'per_call_us': round(timing['median_ms'] * 1000 / calls, 3),
+                'placeholders': placeholders,
+                'template_chars': len(template),
+            }
+    return results
+
+
+def bench_serialize(workdir, sizes):
+    app = make_app(os.path.join(workdir, 'serialize.db'))
+    now = datetime.utcnow()
+    results = {}
+
+    for rows in sizes['serialize_rows']:
+        leads = []
+        ads = []
+        for i in range(rows):
+            lead = Lead(
+                id=i + 1, lead_id=f'{1000000000 + i}', ad_id=(i % 50) + 1,
+                user_fb_id=f'{2000000000 + i}', user_name=f'User {i}',
+                message_sent=i % 3 != 0, message_text=f'Hello {i}, thanks for your interest!' * 5,
+                message_sent_at=now - timedelta(minutes=i), created_at=now - timedelta(minutes=i),
+            )
+            lead.set_form_data({'first_name': f'First{i}', 'email': f'user{i}@example.com', 'phone': f'+1555{i:07d}'})
+            leads.append(lead)
+            ads.append(Ad(
+                id=i + 1, ad_id=f'{3000000000 + i}', ad_name=f'Ad {i}', campaign_id=f'c{i}',
+                status='ACTIVE', is_active=True, last_synced_at=now, created_at=now, updated_at=now,
+            ))
+
+        # Serialize the list several times per timed run to keep runs above ~10ms
+        loops = max(1, 10000 // rows)
+        with app.app_context():
+            lead_timing = measure(lambda: [app.json.dumps([lead.to_dict() for lead in leads]) for _ in range(loops)], 9)
+            ad_timing = measure(lambda: [app.json.dumps([ad.to_dict() for ad in ads]) for _ in range(loops)], 9)
+
+        results[f'serialize.leads_{rows}'] = {**lead_timing, 'rows': rows, 'loops': loops}
+        results[f'serialize.ads_{rows}'] = {**ad_timing, 'rows': rows, 'loops': loops}
+    return results
+
+
+def bench_ad_sync(workdir, sizes):
+    from app.jobs.ad_sync_job import run_ad_sync
+
+    results = {}
+    for count in sizes['sync_ads']:
+        with GraphStub(count) as stub:
+            # A fresh database per run, so every initial sync creates all ads
+            app = make_app(
+                os.path.join(tempfile.mkdtemp(dir=workdir), f'sync_{count}.db'),
+                FACEBOOK_GRAPH_URL=stub.url,
+                FACEBOOK_ACCESS_TOKEN='bench-token',
+                FACEBOOK_AD_ACCOUNT_IDS=['1'],
+                AD_SYNC_MAX_ADS=0,
+            )
+            app.logger.disabled = True
+
+            for phase in ('initial', 'resync'):
+                start = time.perf_counter()
+                summary = run_ad_sync(app)
+                elapsed = (time.perf_counter() - start) * 1000
+                assert summary['total'] == count, summary
+                results[f'ad_sync.{phase}_{count}'] = {
+                    **summarize([elapsed]),
+                    'ads_per_sec': round(count / (elapsed / 1000)),
+                    'ads': count,
+                }
+
+            with app.app_context():
+                db.engine.dispose()
+    return results
+
+
+def bench_webhook(workdir, sizes):
+    app = make_app(os.path.join(workdir, 'webhook.db'))
+    app.logger.disabled = True
+    client = app.test_client()
+
+    payload = json.dumps({
+        'object': 'page',
+        'entry': [{
+            'id': '123',
+            'time': 1700000000,
+            'changes': [{'field': 'feed', 'value': {'item': 'status', 'verb': 'add'}}] * 5,
+        }],
+    }).encode('utf-8')
+    signature = 'sha256=' + hmac.new(APP_SECRET.encode('utf-8'), payload, hashlib.sha256).hexdigest()
+    headers = {'X-Hub-Signature-256': signature, 'Content-Type': 'application/json'}
+
+    calls = 500
+
+    def post_batch():
+        for _ in range(calls):
+            response = client.post('/api/webhook/webhook', data=payload, headers=headers)
+            assert response.status_code == 200, response.status_code
+
+    timing = measure(post_batch, 9)
+    return {
+        'webhook.verify_parse': {
+            **timing,
+            'per_request_us': round(timing['median_ms'] * 1000 / calls, 1),
+            'requests_per_sec': round(calls / (timing['median_ms'] / 1000)),
+        }
+    }
+
+
+def populate_leads(app, rows, ads=100, chunk=50000):
+    """Bulk insert rows leads spread over ads ads and the last 180 days"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.session.execute(Ad.__table__.insert(), [
+            {'ad_id': f'bench{i}', 'ad_name': f'Bench ad {i}', 'campaign_id': f'c{i % 10}',
+             'is_active': True, 'platform': 'facebook', 'created_at': now, 'updated_at': now}
+            for i in range(ads)
+        ])
+        db.session.commit()
+
+        for start in range(0, rows, chunk):
+            batch = []
+            for i in range(start, min(start + chunk, rows)):
+                sent = rng.random() < 0.8
+                batch.append({
+                    'lead_id': f'lead{i}',
+                    'ad_id': rng.randint(1, ads),
+                    'user_fb_id': f'{2000000000 + i}',
+                    'user_name': f'User {i}',
+                    'message_sent': sent,
+                    'message_text': 'Hi, thanks for your interest!' if sent else None,
+                    'error_message': None if sent or rng.random() < 0.5 else 'Send failed',
+                    'form_data': json.dumps({'first_name': f'First{i}', 'email': f'user{i}@example.com'}),
+                    'created_at': now - timedelta(seconds=rng.randint(0, 180 * 86400)),
+                })
+            db.session.execute(Lead.__table__.insert(), batch)
+            db.session.commit()
+            print(f'  inserted {min(start + chunk, rows)}/{rows} leads', file=sys.stderr)
+
+
+def bench_leads_api(workdir, sizes):
+    rows = sizes['leads_rows']
+    path = os.path.join(workdir, 'leads.db')
+    # Later runs reuse the table; the requests don't write to it
+    populated = os.path.exists(path)
+    app = make_app(path)
+    app.logger.disabled = True
+    if not populated:
+        populate_leads(app, rows)
+    client = app.test_client()
+
+    def get(url):
+        def call():
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+        return call
+
+    cases = {
+        'list_page_1': '/api/leads?per_page=50',
+        'list_page_100': '/api/leads?per_page=50&page=100',
+        'list_by_ad': '/api/leads?ad_id=7',
+        'list_failed': '/api/leads?status=failed',
+        'stats': '/api/leads/stats',
+    }
+    return {
+        f'leads_api.{name}': {**measure(get(url), 9), 'rows': rows}
+        for name, url in cases.items()
+    }
+
+
+SUITES = {
+    'template': bench_template,
+    'serialize': bench_serialize,
+    'ad_sync': bench_ad_sync,
+    'webhook': bench_webhook,
+    'leads_api': bench_leads_api,
+}
+
+
+def merge_runs(runs):
+    """
+    Merge the results of several runs of the suites
+
+    Returns:
+        dict: Case results with median_ms and min_ms over all timings of the
+            case and its rate fields rescaled to that median
+    """
+    merged = {}
+    for case in runs[0]:
+        timings = [timing for run in runs for timing in run[case]['timings']]
+        result = {**runs[-1][case], **summarize(timings)}
+        scale = result['median_ms'] / runs[-1][case]['median_ms']
+        for field in PER_OPERATION_FIELDS:
+            if field in result:
+                result[field] = round(result[field] * scale, 3)
+        for field in THROUGHPUT_FIELDS:
+            if field in result:
+                result[field] = round(result[field] / scale)
+        del result['timings']
+        result['timings_count'] = len(timings)
+        merged[case] = result
+    return merged
+
+
+def baseline_path(size_name):
+    return os.path.join(BASELINE_DIR, f'{size_name}.json')
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare min_ms and median_ms of every case against the baseline
+
+    A case regressed only if both got more than threshold slower: one noisy
+    run moves the median and one lucky run moves the min, but not both.
+
+    Returns:
+        list: (case, min_ratio, median_ratio) for regressed cases
+    """
+    regressions = []
+    for case, metrics in results.items():
+        base = baseline.get('results', {}).get(case)
+        if not base or not base.get('min_ms') or not base.get('median_ms'):
+            print(f'{"new":>10}  {case}', file=sys.stderr)
+            continue
+        min_ratio = metrics['min_ms'] / base['min_ms']
+        median_ratio = metrics['median_ms'] / base['median_ms']
+        regressed = min(min_ratio, median_ratio) > 1 + threshold
+        marker = 'REGRESSION' if regressed else 'ok'
+        print(f'{marker:>10}  {case:<32} min {base["min_ms"]:>10.3f} -> {metrics["min_ms"]:>10.3f} ms ({min_ratio:.2f}x)'
+              f'  median {base["median_ms"]:>10.3f} -> {metrics["median_ms"]:>10.3f} ms ({median_ratio:.2f}x)',
+              file=sys.stderr)
+        if regressed:
+            regressions.append((case, min_ratio, median_ratio))
+    return regressions
+
+
+def load_baseline(path, size_name):
+    """
+    Read a baseline, refusing one recorded with other data sizes
+
+    Returns:
+        dict: Baseline, or None if it doesn't exist yet
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        baseline = json.load(f)
+    recorded = baseline.get('meta', {}).get('sizes')
+    if recorded != size_name:
+        print(f'{path} was recorded with {recorded} sizes, this run uses {size_name}; '
+              f'use the {size_name} baseline or re-record it with --save-baseline', file=sys.stderr)
+        sys.exit(2)
+    return baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), help='Suites to run (default: all)')
+    parser.add_argument('--quick', action='store_true', help='Small data sizes for a fast smoke run')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--runs', type=int, default=3, help='Runs of every suite (default: 3)')
+    parser.add_argument('--baseline', help='Baseline file (default: baselines/<full|quick>.json)')
+    parser.add_argument('--compare', action='store_true', help='Fail if slower than the baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.3, help='Allowed slowdown (default: 0.3 = 30%%)')
+    args = parser.parse_args()
+
+    size_name = 'quick' if args.quick else 'full'
+    sizes = SIZES[size_name]
+    runs = max(1, args.runs)
+    baseline_file = args.baseline or baseline_path(size_name)
+    # Fail before the (long) run when the baseline can't be used
+    baseline = load_baseline(baseline_file, size_name) if args.compare or args.save_baseline else None
+    if args.compare and baseline is None:
+        print(f'No baseline at {baseline_file}; record one with --save-baseline', file=sys.stderr)
+        sys.exit(2)
+    workdir = tempfile.mkdtemp(prefix='fb-lead-bench-')
+
+    suite_runs = []
+    for run in range(runs):
+        results = {}
+        for name in args.suite or SUITES:
+            print(f'Running {name} ({run + 1}/{runs})...', file=sys.stderr)
+            results.update(SUITES[name](workdir, sizes))
+        suite_runs.append(results)
+    results = merge_runs(suite_runs)
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': size_name,
+            'runs': runs,
+        },
+        'results': results,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    exit_code = 0
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} case(s) regressed by more than {args.threshold:.0%}', file=sys.stderr)
+            exit_code = 1
+
+    if args.save_baseline:
+        # Cases of suites not run this time keep their stored results
+        baseline = baseline or {'results': {}}
+        baseline['meta'] = report['meta']
+        baseline['results'].update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_file)), exist_ok=True)
+        with open(baseline_file, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f'Baseline saved to {baseline_file}', file=sys.stderr)
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
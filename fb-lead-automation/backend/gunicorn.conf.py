@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration for production
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+All settings come from app.config.Config (and therefore the environment).
+"""
+import multiprocessing
+import os
+import tempfile
+
+# Workers share metrics through snapshot files (see app/metrics.py); must be
+# set before the config is imported
+if not os.getenv('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='fb-lead-metrics-')
+
+from app.config import Config
+
+bind = f'0.0.0.0:{Config.PORT}'
+
+# Pre-fork workers with a thread pool each: webhook and Graph API calls are I/O bound
+workers = Config.WEB_WORKERS or multiprocessing.cpu_count() * 2 + 1
+worker_class = 'gthread'
+threads = Config.WEB_THREADS
+keepalive = Config.WEB_KEEPALIVE
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = 30
+
+# Recycle workers periodically to bound memory growth
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = Config.WEB_MAX_REQUESTS_JITTER
+
+# Load the app once in the master so workers share its memory pages
+preload_app = Config.WEB_PRELOAD
+
+accesslog = '-'
+errorlog = '-'
+
+
+_scheduler_leader = None
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master so workers never share sockets"""
+    if not server.cfg.preload_app:
+        return
+
+    from app.extensions import db
+
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Start the scheduler in each worker; the scheduler lease lets only one run jobs"""
+    global _scheduler_leader
+
+    if not Config.SCHEDULER_ENABLED:
+        return
+
+    from app.jobs.leader import start_scheduler
+    _scheduler_leader = start_scheduler(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    """Release the scheduler lease, park queued Messenger sends and drain lead writes on shutdown"""
+    from app.extensions import scheduler
+    from app.services.lead_processor import shutdown_send_lanes
+    from app.services.lead_writer import lead_writer
+
+    if _scheduler_leader is not None:
+        _scheduler_leader.stop()
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    shutdown_send_lanes()
+    lead_writer.shutdown(wait=True)
@@ -0,0 +1,36 @@
+"""Add leads filter indexes
+
+Revision ID: 2d7b9e4c1a6f
+Revises: 8c1e4f2a9b3d
+Create Date: 2026-10-19 16:24:10.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7b9e4c1a6f'
+down_revision = '8c1e4f2a9b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ads', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ads_campaign_id'), ['campaign_id'], unique=False)
+
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.create_index('ix_leads_ad_id_created_at', ['ad_id', 'created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_leads_created_at'), ['created_at'], unique=False)
+        batch_op.create_index('ix_leads_message_sent_created_at', ['message_sent', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('leads', schema=None) as batch_op:
+        batch_op.drop_index('ix_leads_message_sent_created_at')
+        batch_op.drop_index(batch_op.f('ix_leads_created_at'))
+        batch_op.drop_index('ix_leads_ad_id_created_at')
+
+    with op.batch_alter_table('ads', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ads_campaign_id'))
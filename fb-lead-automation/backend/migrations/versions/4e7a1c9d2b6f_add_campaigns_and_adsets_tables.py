@@ -0,0 +1,180 @@
+"""Add campaigns and adsets tables
+
+Revision ID: 4e7a1c9d2b6f
+Revises: 8a4d2f6b9c1e
+Create Date: 2026-10-19 17:04:59.659609
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision = '4e7a1c9d2b6f'
+down_revision = '8a4d2f6b9c1e'
+branch_labels = None
+depends_on = None
+
+ads_table = sa.table(
+    'ads',
+    sa.column('id', sa.Integer),
+    sa.column('account_id', sa.String),
+    sa.column('campaign_id', sa.String),
+    sa.column('campaign_name', sa.String),
+    sa.column('adset_id', sa.String),
+    sa.column('adset_name', sa.String)
+)
+
+leads_table = sa.table(
+    'leads',
+    sa.column('id', sa.Integer),
+    sa.column('ad_id', sa.Integer),
+    sa.column('message_sent', sa.Boolean),
+    sa.column('error_message', sa.Text)
+)
+
+archive_stats_table = sa.table(
+    'lead_archive_stats',
+    sa.column('ad_id', sa.Integer),
+    sa.column('total', sa.Integer),
+    sa.column('sent', sa.Integer),
+    sa.column('failed', sa.Integer)
+)
+
+
+def _rollup_table(name, key):
+    return sa.table(
+        name,
+        sa.column(key, sa.String),
+        sa.column('account_id', sa.String),
+        sa.column('campaign_id', sa.String),
+        sa.column('name', sa.String),
+        sa.column('lead_count', sa.Integer),
+        sa.column('sent_count', sa.Integer),
+        sa.column('failed_count', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+        sa.column('updated_at', sa.DateTime)
+    )
+
+
+def _populate(connection):
+    """Create campaign and ad set rows from the ads and count their leads"""
+    now = datetime.utcnow()
+    campaigns = _rollup_table('campaigns', 'campaign_id')
+    adsets = _rollup_table('adsets', 'adset_id')
+
+    connection.execute(campaigns.insert().from_select(
+        ['campaign_id', 'account_id', 'name', 'lead_count', 'sent_count', 'failed_count', 'created_at', 'updated_at'],
+        sa.select(
+            ads_table.c.campaign_id,
+            sa.func.max(ads_table.c.account_id),
+            sa.func.max(ads_table.c.campaign_name),
+            sa.literal(0), sa.literal(0), sa.literal(0), sa.literal(now), sa.literal(now)
+        ).where(ads_table.c.campaign_id.isnot(None)).group_by(ads_table.c.campaign_id)
+    ))
+    connection.execute(adsets.insert().from_select(
+        ['adset_id', 'campaign_id', 'name', 'lead_count', 'sent_count', 'failed_count', 'created_at', 'updated_at'],
+        sa.select(
+            ads_table.c.adset_id,
+            sa.func.max(ads_table.c.campaign_id),
+            sa.func.max(ads_table.c.adset_name),
+            sa.literal(0), sa.literal(0), sa.literal(0), sa.literal(now), sa.literal(now)
+        ).where(ads_table.c.adset_id.isnot(None)).group_by(ads_table.c.adset_id)
+    ))
+
+    sent = sa.case((leads_table.c.message_sent == sa.true(), 1), else_=0)
+    failed = sa.case(
+        ((leads_table.c.message_sent == sa.false()) & leads_table.c.error_message.isnot(None), 1),
+        else_=0
+    )
+    for table, key in ((campaigns, 'campaign_id'), (adsets, 'adset_id')):
+        def hot(value):
+            return sa.select(sa.func.coalesce(sa.func.sum(value), 0)).select_from(
+                leads_table.join(ads_table, leads_table.c.ad_id == ads_table.c.id)
+            ).where(ads_table.c[key] == table.c[key]).scalar_subquery()
+
+        def archived(column):
+            return sa.select(sa.func.coalesce(sa.func.sum(archive_stats_table.c[column]), 0)).select_from(
+                archive_stats_table.join(ads_table, archive_stats_table.c.ad_id == ads_table.c.id)
+            ).where(ads_table.c[key] == table.c[key]).scalar_subquery()
+
+        connection.execute(table.update().values(
+            lead_count=hot(sa.literal(1)) + archived('total'),
+            sent_count=hot(sent) + archived('sent'),
+            failed_count=hot(failed) + archived('failed')
+        ))
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('campaigns',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('campaign_id', sa.String(length=100), nullable=False),
+    sa.Column('account_id', sa.String(length=100), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('lead_count', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_campaigns_account_id'), ['account_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_campaigns_campaign_id'), ['campaign_id'], unique=True)
+
+    op.create_table('adsets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('adset_id', sa.String(length=100), nullable=False),
+    sa.Column('campaign_id', sa.String(length=100), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('lead_count', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.campaign_id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('adsets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_adsets_adset_id'), ['adset_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_adsets_campaign_id'), ['campaign_id'], unique=False)
+
+    _populate(op.get_bind())
+
+    with op.batch_alter_table('ads', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_ads_adset_id_adsets', 'adsets', ['adset_id'], ['adset_id'])
+        batch_op.create_foreign_key('fk_ads_campaign_id_campaigns', 'campaigns', ['campaign_id'], ['campaign_id'])
+        batch_op.drop_column('campaign_name')
+        batch_op.drop_column('adset_name')
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('ads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('adset_name', sa.VARCHAR(length=255), nullable=True))
+        batch_op.add_column(sa.Column('campaign_name', sa.VARCHAR(length=255), nullable=True))
+        batch_op.drop_constraint('fk_ads_campaign_id_campaigns', type_='foreignkey')
+        batch_op.drop_constraint('fk_ads_adset_id_adsets', type_='foreignkey')
+
+    # Copy the names back onto the ads
+    for name, key in (('campaigns', 'campaign_id'), ('adsets', 'adset_id')):
+        table = _rollup_table(name, key)
+        op.get_bind().execute(ads_table.update().values(**{
+            key.replace('_id', '_name'): sa.select(table.c.name).where(table.c[key] == ads_table.c[key]).scalar_subquery()
+        }))
+
+    with op.batch_alter_table('adsets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_adsets_campaign_id'))
+        batch_op.drop_index(batch_op.f('ix_adsets_adset_id'))
+
+    op.drop_table('adsets')
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_campaigns_campaign_id'))
+        batch_op.drop_index(batch_op.f('ix_campaigns_account_id'))
+
+    op.drop_table('campaigns')
+    # ### end Alembic commands ###
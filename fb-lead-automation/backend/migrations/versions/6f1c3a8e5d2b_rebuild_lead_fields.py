@@ -0,0 +1,86 @@
+"""Rebuild lead fields
+
+Revision ID: 6f1c3a8e5d2b
+Revises: 5b9e3d7a1c4f
+Create Date: 2026-10-19 17:27:37.930615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1c3a8e5d2b'
+down_revision = '5b9e3d7a1c4f'
+branch_labels = None
+depends_on = None
+
+REBUILD_BATCH_SIZE = 1000
+
+leads_table = sa.table(
+    'leads',
+    sa.column('id', sa.Integer),
+    sa.column('form_data', sa.Text)
+)
+
+lead_fields_table = sa.table(
+    'lead_fields',
+    sa.column('lead_id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('value', sa.Text),
+    sa.column('normalized_value', sa.String)
+)
+
+
+def _normalize(name, value):
+    # Frozen copy of app.models.lead_field.normalize_field_value
+    value = str(value).strip()
+    if 'phone' in name:
+        return ('+' if value.startswith('+') else '') + re.sub(r'\D', '', value)
+    return value.lower()
+
+
+def upgrade():
+    # ORM deletes of ads and leads relied on ON DELETE CASCADE, which SQLite
+    # doesn't enforce, so fields of deleted leads were left behind and could
+    # end up under a new lead reusing the id. form_data is the source of
+    # truth, so rebuild the whole table from it.
+    connection = op.get_bind()
+    connection.execute(lead_fields_table.delete())
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(leads_table.c.id, leads_table.c.form_data)
+            .where(leads_table.c.id > last_id)
+            .order_by(leads_table.c.id)
+            .limit(REBUILD_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        fields = []
+        for lead_id, form_data in rows:
+            try:
+                data = json.loads(form_data) if form_data else {}
+            except ValueError:
+                data = {}
+            for name, value in data.items():
+                value = '' if value is None else str(value)
+                fields.append({
+                    'lead_id': lead_id,
+                    'name': name[:100],
+                    'value': value,
+                    'normalized_value': _normalize(name, value)[:255]
+                })
+
+        if fields:
+            connection.execute(lead_fields_table.insert(), fields)
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    # Data-only migration: the rebuilt rows are valid for the previous revision
+    pass
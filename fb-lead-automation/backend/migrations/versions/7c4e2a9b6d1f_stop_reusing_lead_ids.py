@@ -0,0 +1,104 @@
+"""Stop reusing lead ids
+
+Revision ID: 7c4e2a9b6d1f
+Revises: 6f1c3a8e5d2b
+Create Date: 2026-10-19 18:02:11.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2a9b6d1f'
+down_revision = '6f1c3a8e5d2b'
+branch_labels = None
+depends_on = None
+
+LEAD_COLUMNS = [
+    'lead_id', 'ad_id', 'user_fb_id', 'user_name', 'message_sent',
+    'message_text', 'message_sent_at', 'error_message', 'form_data',
+    'created_at', 'archived_at'
+]
+
+
+def _create_archived_leads(name, surrogate_id):
+    id_columns = [sa.Column('id', sa.Integer(), autoincrement=not surrogate_id, nullable=False)]
+    if surrogate_id:
+        id_columns = [
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('original_id', sa.Integer(), nullable=False)
+        ]
+    op.create_table(name,
+    *id_columns,
+    sa.Column('lead_id', sa.String(length=100), nullable=False),
+    sa.Column('ad_id', sa.Integer(), nullable=False),
+    sa.Column('user_fb_id', sa.String(length=100), nullable=True),
+    sa.Column('user_name', sa.String(length=255), nullable=True),
+    sa.Column('message_sent', sa.Boolean(), nullable=True),
+    sa.Column('message_text', sa.Text(), nullable=True),
+    sa.Column('message_sent_at', sa.DateTime(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('form_data', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_archived_lead_indexes(surrogate_id):
+    with op.batch_alter_table('archived_leads', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archived_leads_ad_id'), ['ad_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_archived_leads_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_archived_leads_lead_id'), ['lead_id'], unique=True)
+        if surrogate_id:
+            batch_op.create_index(batch_op.f('ix_archived_leads_original_id'), ['original_id'], unique=False)
+
+
+def upgrade():
+    # archived_leads used leads.id as its primary key, but SQLite hands the
+    # ids of deleted and archived leads out again: a new lead could collide
+    # with an archived one (lookups by id returned the wrong lead, archiving
+    # it failed on the primary key). Archived leads get their own key and
+    # keep the old id in original_id.
+    _create_archived_leads('_archived_leads_new', surrogate_id=True)
+    columns = ', '.join(LEAD_COLUMNS)
+    op.execute(
+        f'INSERT INTO _archived_leads_new (original_id, {columns}) '
+        f'SELECT id, {columns} FROM archived_leads ORDER BY id'
+    )
+    op.drop_table('archived_leads')
+    op.rename_table('_archived_leads_new', 'archived_leads')
+    _create_archived_lead_indexes(surrogate_id=True)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        # AUTOINCREMENT keeps SQLite from reusing the ids of deleted leads
+        with op.batch_alter_table('leads', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+        # Continue after every id handed out so far, archived ones included
+        op.execute("DELETE FROM sqlite_sequence WHERE name = 'leads'")
+        op.execute(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT 'leads', max("
+            "(SELECT coalesce(max(id), 0) FROM leads), "
+            "(SELECT coalesce(max(original_id), 0) FROM archived_leads))"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('leads', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+            pass
+
+    # Keeps the newest archived copy of an id that was archived more than once
+    _create_archived_leads('_archived_leads_old', surrogate_id=False)
+    columns = ', '.join(LEAD_COLUMNS)
+    op.execute(
+        f'INSERT INTO _archived_leads_old (id, {columns}) '
+        f'SELECT original_id, {columns} FROM archived_leads '
+        f'WHERE id IN (SELECT max(id) FROM archived_leads GROUP BY original_id)'
+    )
+    op.drop_table('archived_leads')
+    op.rename_table('_archived_leads_old', 'archived_leads')
+    _create_archived_lead_indexes(surrogate_id=False)
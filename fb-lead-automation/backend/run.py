@@ -1,12 +1,17 @@
 from app import create_app
+from app.jobs.leader import start_scheduler
 import os
 
-app = create_app()
-
 if __name__ == '__main__':
+    app = create_app()
+
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
 
+    # With the reloader, only its child process serves (and runs jobs)
+    if app.config.get('SCHEDULER_ENABLED') and (not debug or os.getenv('WERKZEUG_RUN_MAIN') == 'true'):
+        start_scheduler(app)
+
     app.run(
         host='0.0.0.0',
         port=port,
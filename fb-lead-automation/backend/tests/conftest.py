@@ -0,0 +1,32 @@
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App on a fresh SQLite file (file-backed, so worker threads share it)"""
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+        SCHEDULER_ENABLED = False
+        METRICS_ENABLED = False
+        LOG_FORMAT = 'text'
+        LOG_LEVEL = 'ERROR'
+        FACEBOOK_ACCESS_TOKEN = 'test-token'
+        PAGE_ACCESS_TOKEN = 'test-page-token'
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
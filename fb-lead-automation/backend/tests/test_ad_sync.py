@@ -0,0 +1,45 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from app.extensions import db
+from app.jobs.ad_sync_job import run_ad_sync
+from app.models import Ad
+
+
+def ads_page(ids, next_url=None):
+    data = {'data': [{'id': ad_id, 'name': f'Ad {ad_id}', 'status': 'ACTIVE'} for ad_id in ids], 'paging': {}}
+    if next_url:
+        data['paging']['next'] = next_url
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode('utf-8')
+    return response
+
+
+def fake_listing(method, url, **kwargs):
+    if 'after=2' in url:
+        return ads_page(['ad-3', 'ad-4'])
+    return ads_page(['ad-1', 'ad-2'], next_url='https://graph.example/v24.0/act_1/ads?after=2')
+
+
+@pytest.mark.parametrize('max_ads, listed, stale_active', [
+    (0, 4, False),
+    (2, 2, True),
+])
+def test_capped_listing_does_not_deactivate_unlisted_ads(app, max_ads, listed, stale_active):
+    app.config.update(FACEBOOK_AD_ACCOUNT_IDS=['1'], AD_SYNC_MAX_ADS=max_ads)
+    db.session.add(Ad(ad_id='ad-stale', ad_name='Stale', account_id='1', is_active=True))
+    db.session.commit()
+
+    with mock.patch('app.services.graph_api.requests.request', side_effect=fake_listing):
+        summary = run_ad_sync(app)
+
+    account = summary['accounts']['1']
+    assert 'error' not in account
+    assert account['total'] == listed
+    assert account.get('truncated', False) is (max_ads != 0)
+    db.session.expire_all()
+    assert Ad.query.filter_by(ad_id='ad-stale').one().is_active is stale_active
@@ -0,0 +1,18 @@
+from app import create_app
+from app.config import Config
+from app.extensions import scheduler
+
+
+def test_create_app_does_not_start_the_scheduler(tmp_path, monkeypatch):
+    monkeypatch.setenv('FLASK_RUN_FROM_CLI', 'true')
+
+    class CLIConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "cli.db"}'
+        SCHEDULER_ENABLED = True
+        METRICS_ENABLED = False
+        LOG_LEVEL = 'ERROR'
+
+    create_app(CLIConfig)
+
+    assert not scheduler.running
+    assert scheduler.get_jobs() == []
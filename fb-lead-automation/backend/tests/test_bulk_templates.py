@@ -0,0 +1,28 @@
+from app.extensions import db
+from app.models import Ad, MessageTemplate
+
+
+def test_bulk_upsert_reports_invalid_ad_ids_per_item(app, client):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.commit()
+    template = {'template_name': 'Welcome', 'message_text': 'Hi!'}
+
+    response = client.post('/api/messages/bulk', json={'templates': [
+        dict(template, ad_id=[ad.id]),
+        dict(template, ad_id={'id': ad.id}),
+        dict(template, ad_id=True),
+        dict(template),
+        dict(template, ad_id=ad.id),
+    ]})
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert [(result['status'], result.get('error')) for result in data['results']] == [
+        ('error', 'ad_id must be an integer'),
+        ('error', 'ad_id must be an integer'),
+        ('error', 'ad_id must be an integer'),
+        ('error', 'ad_id is required'),
+        ('created', None),
+    ]
+    assert MessageTemplate.query.one().ad_id == ad.id
@@ -0,0 +1,76 @@
+import threading
+from unittest import mock
+
+from app.extensions import db
+from app.jobs.ad_sync_job import run_ad_sync
+from app.models import Ad, Lead
+from app.services.facebook_service import FacebookService
+from app.services.lead_processor import process_lead
+
+SYNC_PAGES = 10
+ADS_PER_PAGE = 200
+WEBHOOK_THREADS = 4
+LEADS_PER_THREAD = 50
+
+
+def ad_pages(self):
+    for page in range(SYNC_PAGES):
+        yield [
+            {
+                'id': f'sync-{page}-{n}',
+                'name': f'Ad {page}-{n}',
+                'status': 'ACTIVE',
+                'campaign': {'id': f'c{page}', 'name': f'Campaign {page}'},
+                'adset': {'id': f's{page}', 'name': f'Ad set {page}'},
+            }
+            for n in range(ADS_PER_PAGE)
+        ]
+
+
+def lead_data(self, leadgen_id):
+    return {'id': leadgen_id, 'field_data': [{'name': 'full_name', 'values': ['Jane Doe']}]}
+
+
+def test_ad_sync_and_webhook_writes_run_concurrently_on_wal(app):
+    assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+    app.config['FACEBOOK_AD_ACCOUNT_IDS'] = ['1']
+    db.session.add(Ad(ad_id='webhook-ad', ad_name='Webhook ad', page_id='page-1'))
+    db.session.commit()
+
+    errors = []
+    summaries = []
+    start = threading.Barrier(WEBHOOK_THREADS + 1)
+
+    def sync():
+        try:
+            start.wait()
+            summaries.append(run_ad_sync(app))
+        except Exception as e:
+            errors.append(e)
+
+    def webhook(worker):
+        with app.app_context():
+            try:
+                start.wait()
+                for n in range(LEADS_PER_THREAD):
+                    assert process_lead(f'lead-{worker}-{n}', 'webhook-ad', 'form-1') is not None
+            except Exception as e:
+                errors.append(e)
+
+    with mock.patch.object(FacebookService, 'get_active_ad_pages', ad_pages), \
+            mock.patch.object(FacebookService, 'get_lead_data', lead_data):
+        threads = [threading.Thread(target=sync)]
+        threads += [threading.Thread(target=webhook, args=(w,)) for w in range(WEBHOOK_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+    assert errors == []
+    assert summaries[0]['accounts'] == {
+        '1': {'total': SYNC_PAGES * ADS_PER_PAGE, 'created': SYNC_PAGES * ADS_PER_PAGE,
+              'updated': 0, 'deactivated': 0}
+    }
+    db.session.expire_all()
+    assert Ad.query.filter(Ad.ad_id.like('sync-%')).count() == SYNC_PAGES * ADS_PER_PAGE
+    assert Lead.query.count() == WEBHOOK_THREADS * LEADS_PER_THREAD
@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from app.extensions import db
+from app.jobs.deferred_work_job import retry_deferred_work
+from app.jobs.stale_send_job import requeue_stale_sends
+from app.models import Ad, DeferredWork, Lead
+from app.services.deferred_work import park_work
+from app.services.messenger_service import MessengerService
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def park_due_message():
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1', page_id='page-1')
+    db.session.add(ad)
+    db.session.flush()
+    lead = Lead(lead_id='lead-1', ad_id=ad.id, user_fb_id='psid-1',
+                error_message='Messenger unavailable, send deferred')
+    db.session.add(lead)
+    db.session.commit()
+    item = park_work('message', {'lead_id': lead.id, 'page_id': 'page-1', 'message_text': 'Hi!'})
+    item.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    return lead.id, item.id
+
+
+def test_replayed_message_keeps_its_item_until_the_send_finishes(app):
+    lead_id, item_id = park_due_message()
+
+    # The lane never runs the send, as if the process died with it queued
+    with mock.patch('app.services.page_lanes.page_lanes.submit') as submit:
+        retry_deferred_work(app)
+
+    assert submit.call_args.args[-1] == item_id
+    db.session.expire_all()
+    item = db.session.get(DeferredWork, item_id)
+    assert item.attempts == 1
+    assert item.next_attempt_at > datetime.utcnow()
+
+
+def test_replayed_message_deletes_its_item_once_sent(app):
+    lead_id, item_id = park_due_message()
+
+    with mock.patch.object(MessengerService, 'send_message', return_value=True):
+        retry_deferred_work(app)
+
+        def sent():
+            db.session.expire_all()
+            return db.session.get(Lead, lead_id).message_sent
+
+        assert wait_for(sent)
+
+    assert wait_for(lambda: DeferredWork.query.count() == 0)
+
+
+def test_sends_queued_long_ago_are_requeued_as_deferred_work(app):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1', page_id='page-1')
+    db.session.add(ad)
+    db.session.flush()
+    long_ago = datetime.utcnow() - timedelta(hours=1)
+    db.session.add_all([
+        Lead(lead_id='lost', ad_id=ad.id, message_text='Hi!', message_queued_at=long_ago),
+        Lead(lead_id='queued', ad_id=ad.id, message_text='Hi!', message_queued_at=datetime.utcnow()),
+        Lead(lead_id='sent', ad_id=ad.id, message_text='Hi!', message_queued_at=long_ago,
+             message_sent=True),
+        Lead(lead_id='failed', ad_id=ad.id, message_text='Hi!', message_queued_at=long_ago,
+             error_message='Failed to send message via Messenger')
+    ])
+    db.session.commit()
+    lost_id = Lead.query.filter_by(lead_id='lost').one().id
+
+    assert requeue_stale_sends(app) == 1
+    assert requeue_stale_sends(app) == 0
+
+    item = DeferredWork.query.one()
+    assert item.get_payload() == {'lead_id': lost_id, 'page_id': 'page-1', 'message_text': 'Hi!'}
+    db.session.expire_all()
+    assert db.session.get(Lead, lost_id).error_message == 'Messenger unavailable, send deferred'
@@ -0,0 +1,28 @@
+import pytest
+
+from app.services.event_bus import EventBus, SubscriberLimitReached, event_bus
+
+
+def test_subscribe_refuses_past_the_limit_until_a_stream_closes():
+    bus = EventBus(max_subscribers=2)
+    first = bus.subscribe()
+    bus.subscribe()
+
+    with pytest.raises(SubscriberLimitReached):
+        bus.subscribe()
+
+    first.close()
+    bus.subscribe()
+
+
+def test_stream_answers_503_when_the_process_is_at_its_stream_limit(client, monkeypatch):
+    monkeypatch.setattr(event_bus, 'max_subscribers', 1)
+    held = event_bus.subscribe()
+    try:
+        response = client.get('/api/leads/stream')
+    finally:
+        held.close()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
+    assert response.get_json()['success'] is False
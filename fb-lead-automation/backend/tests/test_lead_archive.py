@@ -0,0 +1,49 @@
+from app.extensions import db
+from app.jobs.lead_archive_job import archive_lead_batch
+from app.models import Ad, Lead, ArchivedLead
+
+
+def add_lead(ad, lead_id):
+    lead = Lead(lead_id=lead_id, ad_id=ad.id, user_name=lead_id)
+    db.session.add(lead)
+    db.session.commit()
+    return lead
+
+
+def archive(lead):
+    archive_lead_batch([lead.id])
+    db.session.commit()
+
+
+def test_new_leads_do_not_reuse_archived_ids(app, client):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.commit()
+    archived = add_lead(ad, 'lead-archived')
+    archived_id = archived.id
+    archive(archived)
+
+    new = add_lead(ad, 'lead-new')
+
+    assert new.id != archived_id
+    response = client.get(f'/api/leads/{archived_id}')
+    assert response.get_json()['data']['lead_id'] == 'lead-archived'
+    assert response.get_json()['data']['archived'] is True
+    assert client.get(f'/api/leads/{new.id}').get_json()['data']['lead_id'] == 'lead-new'
+
+
+def test_archiving_a_lead_with_an_archived_id_keeps_both(app, client):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.commit()
+    first = add_lead(ad, 'lead-first')
+    lead_id = first.id
+    archive(first)
+    # A lead stored before ids stopped being reused
+    db.session.add(Lead(id=lead_id, lead_id='lead-second', ad_id=ad.id))
+    db.session.commit()
+
+    archive(db.session.get(Lead, lead_id))
+
+    assert sorted(lead.lead_id for lead in ArchivedLead.query) == ['lead-first', 'lead-second']
+    assert client.get(f'/api/leads/{lead_id}').get_json()['data']['lead_id'] == 'lead-second'
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.jobs.lead_backfill_job import backfill_form
+from app.models import Ad, Lead, LeadFormCursor
+from app.services.facebook_service import FacebookService
+
+
+def graph_lead(lead_id):
+    return {
+        'id': lead_id,
+        'ad_id': 'ad-1',
+        'created_time': '2026-01-31T12:00:00+0000',
+        'field_data': [{'name': 'full_name', 'values': ['Jane Doe']}]
+    }
+
+
+def add_ad():
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.commit()
+    return ad.id
+
+
+def test_form_claimed_by_another_run_is_skipped_until_the_claim_lapses(app):
+    add_ad()
+    db.session.add(LeadFormCursor(
+        form_id='form-1', claimed_by='other-run',
+        claimed_until=datetime.utcnow() + timedelta(minutes=5)
+    ))
+    db.session.commit()
+    page = {'leads': [graph_lead('lead-1')], 'after': None}
+
+    with mock.patch.object(FacebookService, 'get_form_leads_page', return_value=page) as fetch:
+        stats = backfill_form(app, 'form-1', since=None)
+        assert stats['error'] == 'Form is being backfilled by another run'
+        assert not fetch.called
+
+        LeadFormCursor.query.update({'claimed_until': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        stats = backfill_form(app, 'form-1', since=None)
+
+    assert stats['error'] is None
+    assert stats['imported'] == 1
+    cursor = LeadFormCursor.query.one()
+    assert cursor.claimed_by is None
+    assert cursor.last_completed_at is not None
+
+
+def test_lead_stored_by_the_webhook_mid_page_does_not_abort_the_form(app):
+    ad_pk = add_ad()
+    page = {'leads': [graph_lead('lead-1'), graph_lead('lead-2')], 'after': None}
+    raced = []
+
+    def webhook_stores_lead_1(session, flush_context, instances):
+        if raced or not any(isinstance(obj, Lead) for obj in session.new):
+            return
+        raced.append(True)
+        with db.engine.begin() as connection:
+            connection.execute(insert(Lead.__table__).values(
+                lead_id='lead-1', ad_id=ad_pk, message_sent=False, form_data='{}', change_version=0
+            ))
+
+    event.listen(Session, 'before_flush', webhook_stores_lead_1)
+    try:
+        with mock.patch.object(FacebookService, 'get_form_leads_page', return_value=page):
+            stats = backfill_form(app, 'form-1', since=None)
+    finally:
+        event.remove(Session, 'before_flush', webhook_stores_lead_1)
+
+    assert raced
+    assert stats['error'] is None
+    assert stats['imported'] == 1
+    assert sorted(lead_id for (lead_id,) in db.session.query(Lead.lead_id)) == ['lead-1', 'lead-2']
+    assert LeadFormCursor.query.one().leads_imported == 1
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+from app.extensions import db
+from app.models import Ad, Lead
+
+
+def add_lead():
+    ad = Ad(ad_id='ad-1', ad_name='=Ad 1')
+    db.session.add(ad)
+    db.session.flush()
+    lead = Lead(lead_id='lead-1', ad_id=ad.id, user_name='@SUM(A1:A9)')
+    lead.set_form_data({
+        'full_name': '=HYPERLINK("http://example.com","x")',
+        'phone_number': '+15550100200',
+        'note': '-1+2',
+        'city': 'Springfield'
+    })
+    db.session.add(lead)
+    db.session.commit()
+
+
+def test_csv_export_neutralizes_formulas(app, client):
+    add_lead()
+
+    response = client.get('/api/leads/export?format=csv&fields=full_name,phone_number,note,city,missing')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    header, row = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    record = dict(zip(header, row))
+    assert record['lead_id'] == 'lead-1'
+    assert record['ad_name'] == "'=Ad 1"
+    assert record['user_name'] == "'@SUM(A1:A9)"
+    assert record['full_name'] == '\'=HYPERLINK("http://example.com","x")'
+    assert record['phone_number'] == "'+15550100200"
+    assert record['note'] == "'-1+2"
+    assert record['city'] == 'Springfield'
+    assert record['missing'] == ''
+
+
+def test_ndjson_export_keeps_values_as_they_are(app, client):
+    add_lead()
+
+    response = client.get('/api/leads/export?format=ndjson')
+
+    assert response.status_code == 200
+    [record] = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert record['user_name'] == '@SUM(A1:A9)'
+    assert record['form_data']['full_name'] == '=HYPERLINK("http://example.com","x")'
+
+
+def test_export_rejects_unknown_formats(app, client):
+    response = client.get('/api/leads/export?format=xlsx')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
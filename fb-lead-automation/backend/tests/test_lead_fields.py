@@ -0,0 +1,66 @@
+from app.extensions import db
+from app.models import Ad, Lead, LeadField
+
+
+def add_lead(ad, lead_id, form_data):
+    lead = Lead(lead_id=lead_id, ad_id=ad.id)
+    lead.set_form_data(form_data)
+    db.session.add(lead)
+    return lead
+
+
+def test_deleting_an_ad_deletes_its_leads_fields(app, client):
+    kept_ad = Ad(ad_id='ad-kept', ad_name='Kept')
+    deleted_ad = Ad(ad_id='ad-deleted', ad_name='Deleted')
+    db.session.add_all([kept_ad, deleted_ad])
+    db.session.flush()
+    add_lead(kept_ad, 'lead-kept', {'email': 'kept@example.com'})
+    add_lead(deleted_ad, 'lead-deleted', {'email': 'jane@example.com', 'phone_number': '+1 555 0100'})
+    db.session.commit()
+
+    response = client.delete(f'/api/ads/{deleted_ad.id}')
+
+    assert response.status_code == 200
+    assert [field.normalized_value for field in LeadField.query] == ['kept@example.com']
+
+
+def test_lookup_does_not_find_fields_of_deleted_leads(app, client):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.flush()
+    lead = add_lead(ad, 'lead-1', {'email': 'jane@example.com'})
+    db.session.commit()
+
+    db.session.delete(lead)
+    db.session.commit()
+
+    response = client.get('/api/leads/lookup', query_string={'field': 'email', 'value': 'jane@example.com'})
+
+    assert LeadField.query.count() == 0
+    assert response.get_json()['data'] == []
+
+
+def test_prefix_lookup_finds_values_past_the_basic_multilingual_plane(app, client):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.flush()
+    add_lead(ad, 'lead-emoji', {'first_name': 'jo\U0001F600'})
+    add_lead(ad, 'lead-plain', {'first_name': 'joe'})
+    add_lead(ad, 'lead-other', {'first_name': 'jp'})
+    db.session.commit()
+
+    response = client.get('/api/leads/lookup', query_string={
+        'field': 'first_name', 'value': 'JO', 'match': 'prefix'
+    })
+
+    assert sorted(lead['lead_id'] for lead in response.get_json()['data']) == ['lead-emoji', 'lead-plain']
+
+
+def test_lookup_rejects_values_that_normalize_to_nothing(app, client):
+    for field, value in [('email', '   '), ('phone_number', '+ ()')]:
+        response = client.get('/api/leads/lookup', query_string={
+            'field': field, 'value': value, 'match': 'prefix'
+        })
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import sqlite
+from werkzeug.datastructures import MultiDict
+
+from app.extensions import db
+from app.models import Ad, Lead
+from app.routes.leads import apply_lead_filters
+
+CREATED_RANGE = {'created_from': '2026-01-01T00:00:00', 'created_to': '2026-02-01T00:00:00'}
+
+
+def query_plan(args):
+    """EXPLAIN QUERY PLAN of the leads listing query for some filters"""
+    query = apply_lead_filters(Lead.query, MultiDict(args)).order_by(Lead.created_at.desc())
+    sql = str(query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+@pytest.mark.parametrize('args, index', [
+    ({}, 'ix_leads_created_at'),
+    (CREATED_RANGE, 'ix_leads_created_at'),
+    ({'ad_id': '1'}, 'ix_leads_ad_id_created_at'),
+    ({'ad_id': '1', **CREATED_RANGE}, 'ix_leads_ad_id_created_at'),
+    ({'campaign_id': 'c1'}, 'ix_leads_ad_id_created_at'),
+    ({'campaign_id': 'c1', **CREATED_RANGE}, 'ix_leads_ad_id_created_at'),
+    ({'status': 'sent'}, 'ix_leads_message_sent_created_at'),
+    ({'status': 'failed'}, 'ix_leads_message_sent_created_at'),
+    ({'status': 'pending'}, 'ix_leads_message_sent_created_at'),
+    ({'status': 'sent', **CREATED_RANGE}, 'ix_leads_message_sent_created_at'),
+])
+def test_lead_filters_use_an_index(app, args, index):
+    plan = query_plan(args)
+    lead_steps = [step for step in plan if ' leads' in step]
+
+    assert any(index in step for step in lead_steps), plan
+    assert 'SCAN leads' not in plan, plan
+
+
+def test_campaign_filter_looks_up_ads_by_campaign_index(app):
+    plan = query_plan({'campaign_id': 'c1'})
+
+    assert any(step.startswith('SEARCH ads USING') and '(campaign_id=?)' in step for step in plan), plan
+
+
+def test_created_range_with_a_utc_offset_is_compared_in_utc(app, client):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1')
+    db.session.add(ad)
+    db.session.flush()
+    db.session.add_all([
+        Lead(lead_id='before', ad_id=ad.id, created_at=datetime(2026, 1, 1, 9, 30)),
+        Lead(lead_id='inside', ad_id=ad.id, created_at=datetime(2026, 1, 1, 10, 30))
+    ])
+    db.session.commit()
+
+    # 12:00+02:00 is 10:00 UTC
+    response = client.get('/api/leads', query_string={'created_from': '2026-01-01T12:00:00+02:00'})
+
+    assert [lead['lead_id'] for lead in response.get_json()['data']] == ['inside']
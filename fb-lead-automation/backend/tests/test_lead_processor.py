@@ -0,0 +1,144 @@
+import json
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+import requests
+
+from app.extensions import db
+from app.jobs.deferred_work_job import retry_deferred_work
+from app.models import Ad, DeferredWork, Lead, MessageTemplate
+from app.services.lead_processor import lead_recipient, process_lead
+
+
+def graph_response(payload, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode('utf-8')
+    return response
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def add_ad_with_template(text='Hi {{full_name}}!'):
+    ad = Ad(ad_id='ad-1', ad_name='Ad 1', page_id='page-1', is_active=True)
+    db.session.add(ad)
+    db.session.flush()
+    db.session.add(MessageTemplate(ad_id=ad.id, template_name='Welcome', message_text=text))
+    db.session.commit()
+    return ad
+
+
+def test_lead_recipient_prefers_page_scoped_id_then_form_phone():
+    lead = Lead(lead_id='l', ad_id=1, user_fb_id='psid-1')
+    lead.set_form_data({'phone_number': '+1 (555) 010-0200'})
+    assert lead_recipient(lead) == {'id': 'psid-1'}
+
+    lead.user_fb_id = None
+    assert lead_recipient(lead) == {'phone_number': '+15550100200'}
+
+    lead.set_form_data({'email': 'jane@example.com'})
+    assert lead_recipient(lead) is None
+
+
+def test_process_lead_sends_the_filled_template(app):
+    add_ad_with_template()
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        if method == 'GET':
+            return graph_response({
+                'id': 'lead-1',
+                'created_time': '2026-01-01T10:00:00+0000',
+                'field_data': [
+                    {'name': 'full_name', 'values': ['Jane Doe']},
+                    {'name': 'phone_number', 'values': ['+1 555 010 0200']},
+                ]
+            })
+        return graph_response({'recipient_id': 'psid-1', 'message_id': 'mid.1'})
+
+    with mock.patch('app.services.graph_api.requests.request', side_effect=fake_request):
+        lead = process_lead('lead-1', 'ad-1', 'form-1')
+        assert lead is not None
+
+        def sent():
+            db.session.expire_all()
+            return db.session.get(Lead, lead.id).message_sent
+
+        assert wait_for(sent)
+
+    sends = [kwargs['json'] for method, _, kwargs in calls if method == 'POST']
+    assert sends == [{
+        'recipient': {'phone_number': '+15550100200'},
+        'message': {'text': 'Hi Jane Doe!'}
+    }]
+
+    stored = db.session.get(Lead, lead.id)
+    assert stored.message_text == 'Hi Jane Doe!'
+    assert stored.error_message is None
+    assert stored.message_sent_at is not None
+
+
+@pytest.mark.parametrize('failure', [
+    requests.exceptions.Timeout('read timed out'),
+    graph_response({'error': {'message': 'Service unavailable'}}, 503),
+])
+def test_lead_that_fails_to_fetch_transiently_is_parked_not_stored(app, failure):
+    add_ad_with_template()
+
+    def fake_request(method, url, **kwargs):
+        if isinstance(failure, Exception):
+            raise failure
+        return failure
+
+    with mock.patch('app.services.graph_api.requests.request', side_effect=fake_request):
+        assert process_lead('lead-1', 'ad-1', 'form-1') is None
+
+        parked = DeferredWork.query.one()
+        assert parked.kind == 'lead'
+        assert parked.get_payload()['leadgen_id'] == 'lead-1'
+
+        parked.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        retry_deferred_work(app)
+
+    assert Lead.query.count() == 0
+    assert [item.attempts for item in DeferredWork.query] == [1]
+
+
+def test_lead_that_fails_to_fetch_permanently_is_dropped(app):
+    add_ad_with_template()
+    not_found = graph_response({'error': {'message': 'Unsupported get request', 'code': 100}}, 400)
+
+    with mock.patch('app.services.graph_api.requests.request', return_value=not_found):
+        assert process_lead('lead-1', 'ad-1', 'form-1') is None
+
+    assert Lead.query.count() == 0
+    assert DeferredWork.query.count() == 0
+
+
+def test_parked_lead_is_marked_dead_after_the_last_attempt(app, client):
+    app.config['DEFERRED_MAX_ATTEMPTS'] = 2
+    add_ad_with_template()
+
+    with mock.patch('app.services.graph_api.requests.request',
+                    side_effect=requests.exceptions.ConnectionError('refused')):
+        process_lead('lead-1', 'ad-1', 'form-1')
+        for _ in range(3):
+            DeferredWork.query.update({'next_attempt_at': datetime.utcnow() - timedelta(seconds=1)})
+            db.session.commit()
+            retry_deferred_work(app)
+
+    item = DeferredWork.query.one()
+    assert (item.attempts, item.dead_at is not None) == (2, True)
+    data = client.get('/api/graph/breakers').get_json()['data']
+    assert (data['deferred'], data['dead']) == ({}, {'lead': 1})
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.jobs.leader import SchedulerLeader, db_utcnow
+from app.models import SchedulerLease
+
+
+def test_database_clock_matches_stored_datetimes(app):
+    before = datetime.utcnow() - timedelta(seconds=1)
+    now, later = db.session.execute(select(db_utcnow(), db_utcnow(30))).one()
+
+    assert before <= now <= datetime.utcnow() + timedelta(seconds=1)
+    assert later - now == timedelta(seconds=30)
+
+
+def test_lease_is_held_until_it_expires_by_the_database_clock(app):
+    first, second = SchedulerLeader(app), SchedulerLeader(app)
+
+    assert first.try_acquire()
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    lease = db.session.get(SchedulerLease, 'scheduler')
+    assert lease.holder == first.holder_id
+    assert lease.expires_at > datetime.utcnow() + first.ttl - timedelta(seconds=5)
+
+    # Expired a moment ago
+    lease.expires_at = datetime.utcnow() - timedelta(milliseconds=10)
+    db.session.commit()
+    db.session.remove()
+    assert second.try_acquire()
+    assert not first.try_acquire()
+
+    second.release()
+    assert first.try_acquire()
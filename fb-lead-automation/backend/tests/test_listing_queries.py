@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Ad, AdSet, Campaign, Lead, MessageTemplate
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def add_ads(total):
+    """Add ads (each with a template and a lead) until there are `total` of them"""
+    if not Campaign.query.count():
+        db.session.add(Campaign(campaign_id='c1', name='Campaign 1'))
+        db.session.add(AdSet(adset_id='s1', campaign_id='c1', name='Ad set 1'))
+    for n in range(Ad.query.count(), total):
+        ad = Ad(ad_id=f'ad-{n}', ad_name=f'Ad {n}', campaign_id='c1', adset_id='s1')
+        db.session.add(ad)
+        db.session.flush()
+        db.session.add(MessageTemplate(ad_id=ad.id, template_name='Welcome', message_text='Hi!'))
+        db.session.add(Lead(lead_id=f'lead-{n}', ad_id=ad.id))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.mark.parametrize('url', ['/api/leads', '/api/leads?since=0', '/api/ads', '/api/ads?since=0'])
+def test_listing_queries_do_not_grow_with_rows(app, client, url):
+    counts = []
+    for count in (2, 6):
+        add_ads(count)
+        with count_queries() as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.get_json()['data']) == count
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_ad_detail_loads_its_relationships_in_one_query(app, client):
+    add_ads(1)
+    ad_id = Ad.query.one().id
+
+    with count_queries() as statements:
+        data = client.get(f'/api/ads/{ad_id}').get_json()['data']
+
+    assert (data['campaign_name'], data['adset_name'], data['has_template']) == ('Campaign 1', 'Ad set 1', True)
+    assert len(statements) == 1
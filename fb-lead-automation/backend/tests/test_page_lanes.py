@@ -0,0 +1,89 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from app.extensions import db
+from app.models import Ad, DeferredWork, Lead, MessageTemplate
+from app.services.lead_processor import deliver_lead_message, send_lead_message, shutdown_send_lanes
+from app.services.messenger_service import MessengerService
+from app.services.page_lanes import LaneFull, SendLane, page_lanes
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def add_lead(lead_id, ad_id='ad-1'):
+    ad = Ad.query.filter_by(ad_id=ad_id).first()
+    if ad is None:
+        ad = Ad(ad_id=ad_id, ad_name='Ad 1', page_id='page-1')
+        db.session.add(ad)
+        db.session.flush()
+        db.session.add(MessageTemplate(ad_id=ad.id, template_name='Welcome', message_text='Hi!'))
+    lead = Lead(lead_id=lead_id, ad_id=ad.id, user_fb_id=f'psid-{lead_id}')
+    db.session.add(lead)
+    db.session.commit()
+    return ad, lead
+
+
+def test_lane_refuses_sends_past_its_queue_size_and_returns_unstarted_ones():
+    release = threading.Event()
+    lane = SendLane('page-1', concurrency=1, rate=0, max_pending=2)
+    try:
+        running = lane.submit(release.wait, 5)
+        assert wait_for(lambda: running.running())
+        lane.submit(print, 'queued')
+        with pytest.raises(LaneFull):
+            lane.submit(print, 'overflow')
+
+        release.set()
+        assert lane.shutdown(wait=True) == [(print, ('queued',))]
+        assert running.result() is True
+        assert lane.stats()['pending'] == 0
+    finally:
+        release.set()
+
+
+def test_send_that_does_not_fit_its_lane_is_parked(app):
+    ad, lead = add_lead('lead-1')
+
+    with mock.patch.object(page_lanes, 'submit', side_effect=LaneFull('full')):
+        assert send_lead_message(lead, ad, {}) is None
+
+    item = DeferredWork.query.one()
+    assert item.kind == 'message'
+    assert item.get_payload() == {'lead_id': lead.id, 'page_id': 'page-1', 'message_text': 'Hi!'}
+    db.session.expire_all()
+    assert db.session.get(Lead, lead.id).error_message == 'Messenger unavailable, send deferred'
+
+
+def test_sends_still_queued_at_shutdown_are_parked(app):
+    ad, first = add_lead('lead-1')
+    _, second = add_lead('lead-2')
+    started = threading.Event()
+
+    def slow_send(recipient, message_text):
+        started.set()
+        time.sleep(0.2)
+        return True
+
+    # Lanes left by earlier tests keep their concurrency
+    page_lanes.shutdown()
+    page_lanes.concurrency = 1
+    with mock.patch.object(MessengerService, 'send_message', side_effect=slow_send):
+        page_lanes.submit('page-1', deliver_lead_message, app, first.id, 'page-1', 'Hi!')
+        assert started.wait(5)
+        page_lanes.submit('page-1', deliver_lead_message, app, second.id, 'page-1', 'Hi!')
+        assert shutdown_send_lanes() == 1
+
+    db.session.expire_all()
+    assert db.session.get(Lead, first.id).message_sent
+    assert db.session.get(Lead, second.id).error_message == 'Messenger unavailable, send deferred'
+    assert DeferredWork.query.one().get_payload()['lead_id'] == second.id
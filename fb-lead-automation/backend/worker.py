@@ -0,0 +1,17 @@
+from app import create_app
+from app.jobs.leader import start_scheduler
+import signal
+
+
+if __name__ == '__main__':
+    app = create_app()
+    leader = start_scheduler(app, background=False)
+
+    def shutdown(signum, frame):
+        leader.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    app.logger.info('Scheduler worker %s started', leader.holder_id)
+    leader.run()
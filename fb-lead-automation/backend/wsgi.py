@@ -0,0 +1,5 @@
+from app import create_app
+
+# The app may be created in the gunicorn master (preload); the scheduler is
+# started per worker after fork by gunicorn.conf.py
+app = create_app()
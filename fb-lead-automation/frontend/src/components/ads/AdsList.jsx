@@ -1,14 +1,26 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useAds, useSyncAds } from '../../hooks/useAds';
 import AdCard from './AdCard';
 import { RefreshCw } from 'lucide-react';
 
 const AdsList = () => {
   const [filter, setFilter] = useState('all');
+  const [templateFilter, setTemplateFilter] = useState('all');
+  const [search, setSearch] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
 
-  const { data, isLoading, error } = useAds(
-    filter === 'all' ? {} : { is_active: filter === 'active' }
-  );
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(search.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
+
+  const params = {};
+  if (filter !== 'all') params.is_active = filter === 'active';
+  if (templateFilter !== 'all') params.has_template = templateFilter === 'with';
+  if (debouncedSearch) params.q = debouncedSearch;
+
+  const { data, isLoading, error, fetchNextPage, hasNextPage, isFetchingNextPage } =
+    useAds(params);
 
   const syncMutation = useSyncAds();
 
@@ -37,7 +49,7 @@ const AdsList = () => {
     );
   }
 
-  const ads = data?.data || [];
+  const ads = data?.pages.flatMap((page) => page.data) || [];
 
   return (
     <div className="space-y-6">
@@ -46,7 +58,7 @@ const AdsList = () => {
         <div>
           <h2 className="text-2xl font-bold text-gray-900">Facebook Ads</h2>
           <p className="text-gray-600 mt-1">
-            {ads.length} {ads.length === 1 ? 'ad' : 'ads'} found
+            {ads.length} {ads.length === 1 ? 'ad' : 'ads'} {hasNextPage ? 'loaded' : 'found'}
           </p>
         </div>
         <button
@@ -61,8 +73,8 @@ const AdsList = () => {
         </button>
       </div>
 
-      {/* Filter Buttons */}
-      <div className="flex gap-2">
+      {/* Filters */}
+      <div className="flex flex-wrap gap-2">
         <button
           onClick={() => setFilter('all')}
           className={`px-4 py-2 rounded-lg transition ${
@@ -93,6 +105,22 @@ const AdsList = () => {
         >
           Inactive
         </button>
+        <select
+          value={templateFilter}
+          onChange={(e) => setTemplateFilter(e.target.value)}
+          className="px-4 py-2 rounded-lg border border-gray-300 bg-white text-gray-700"
+        >
+          <option value="all">Any template</option>
+          <option value="with">With template</option>
+          <option value="without">Without template</option>
+        </select>
+        <input
+          type="search"
+          value={search}
+          onChange={(e) => setSearch(e.target.value)}
+          placeholder="Search by ad name"
+          className="flex-1 min-w-[12rem] px-4 py-2 rounded-lg border border-gray-300"
+        />
       </div>
 
       {/* Ads Grid */}
@@ -110,6 +138,18 @@ const AdsList = () => {
           ))}
         </div>
       )}
+
+      {hasNextPage && (
+        <div className="flex justify-center">
+          <button
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            className="bg-gray-200 text-gray-700 px-6 py-2 rounded-lg hover:bg-gray-300 disabled:cursor-not-allowed transition"
+          >
+            {isFetchingNextPage ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,14 +1,17 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import adsService from '../services/adsService';
 
 /**
- * Hook for fetching all ads
- * @param {Object} params - Query parameters
+ * Hook for fetching ads page by page (cursor-based)
+ * @param {Object} params - Filters and sort (is_active, status, campaign_id, adset_id, has_template, q, sort, order)
  */
 export const useAds = (params = {}) => {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ['ads', params],
-    queryFn: () => adsService.getAll(params),
+    queryFn: ({ pageParam }) =>
+      adsService.getAll(pageParam ? { ...params, cursor: pageParam } : params),
+    initialPageParam: null,
+    getNextPageParam: (lastPage) => lastPage.pagination?.next_cursor || undefined,
   });
 };
 
@@ -53,3 +56,20 @@ export const useDeleteAd = () => {
     },
   });
 };
+
+/**
+ * Hook for deleting many ads at once
+ */
+export const useBulkDeleteAds = () => {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: (ids) => adsService.bulkDelete(ids),
+    onSuccess: () => {
+      // Templates and leads of the deleted ads are gone too
+      queryClient.invalidateQueries({ queryKey: ['ads'] });
+      queryClient.invalidateQueries({ queryKey: ['messages'] });
+      queryClient.invalidateQueries({ queryKey: ['leads'] });
+    },
+  });
+};
@@ -1,4 +1,5 @@
-import { useQuery } from '@tanstack/react-query';
+import { useEffect } from 'react';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import leadsService from '../services/leadsService';
 
 /**
@@ -33,3 +34,65 @@ export const useLeadStats = () => {
     queryFn: leadsService.getStats,
   });
 };
+
+// Lead bursts are refetched at most once per window
+const STREAM_REFETCH_MS = 2000;
+
+/**
+ * Merge an updated lead into a cached leads response if it contains it
+ * @param {Object} cached - Cached listing ({ data: [...] }) or lead ({ data: {...} })
+ * @param {Object} lead - Lead from a message event
+ * @returns {Object} Patched response (the same object if the lead isn't in it)
+ */
+const patchLead = (cached, lead) => {
+  if (!cached?.data) return cached;
+
+  if (Array.isArray(cached.data)) {
+    if (!cached.data.some((row) => row.id === lead.id)) return cached;
+    return {
+      ...cached,
+      data: cached.data.map((row) => (row.id === lead.id ? { ...row, ...lead } : row)),
+    };
+  }
+
+  return cached.data.id === lead.id ? { ...cached, data: { ...cached.data, ...lead } } : cached;
+};
+
+/**
+ * Hook that keeps lead queries fresh from the server event stream
+ * instead of polling
+ *
+ * Message events carry the updated lead, which is patched into the cached
+ * queries directly. New leads change which rows a page shows, so those
+ * refetch the listings, throttled to one refetch per STREAM_REFETCH_MS.
+ */
+export const useLeadStream = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    let timer = null;
+    let refetchListings = false;
+
+    const flush = () => {
+      timer = null;
+      queryClient.invalidateQueries({ queryKey: refetchListings ? ['leads'] : ['leads', 'stats'] });
+      refetchListings = false;
+    };
+
+    const unsubscribe = leadsService.subscribe((type, lead) => {
+      if (type === 'lead.created') {
+        refetchListings = true;
+      } else {
+        queryClient.setQueriesData({ queryKey: ['leads'] }, (cached) => patchLead(cached, lead));
+      }
+      if (!timer) {
+        timer = setTimeout(flush, STREAM_REFETCH_MS);
+      }
+    });
+
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, [queryClient]);
+};
@@ -1,13 +1,30 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import messagesService from '../services/messagesService';
+import { applyDelta } from '../services/deltaSync';
+
+const newestFirst = (a, b) => new Date(b.created_at) - new Date(a.created_at);
 
 /**
  * Hook for fetching all message templates
+ * Refetches only load the changes since the cached version
  */
 export const useMessages = () => {
+  const queryClient = useQueryClient();
+
   return useQuery({
     queryKey: ['messages'],
-    queryFn: messagesService.getAll,
+    queryFn: async () => {
+      const previous = queryClient.getQueryData(['messages']);
+      if (previous?.version == null) {
+        return messagesService.getAll();
+      }
+
+      const delta = await messagesService.getAll({ since: previous.version });
+      if (delta.reset) {
+        return messagesService.getAll();
+      }
+      return applyDelta(previous, delta, newestFirst);
+    },
   });
 };
 
@@ -68,6 +85,37 @@ export const useDeleteMessage = () => {
   });
 };
 
+/**
+ * Hook for creating or updating templates of many ads at once
+ */
+export const useBulkUpsertMessages = () => {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: ({ templates, overwrite }) => messagesService.bulkUpsert(templates, overwrite),
+    onSuccess: () => {
+      // One refetch for the whole batch (ads show whether they have a template)
+      queryClient.invalidateQueries({ queryKey: ['messages'] });
+      queryClient.invalidateQueries({ queryKey: ['ads'] });
+    },
+  });
+};
+
+/**
+ * Hook for applying a template to a whole campaign or ad set
+ */
+export const useApplyMessageToGroup = () => {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: (data) => messagesService.applyToGroup(data),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['messages'] });
+      queryClient.invalidateQueries({ queryKey: ['ads'] });
+    },
+  });
+};
+
 /**
  * Hook for previewing a message template
  */
@@ -1,9 +1,10 @@
-import { useLeadStats } from '../hooks/useLeads';
+import { useLeadStats, useLeadStream } from '../hooks/useLeads';
 import LeadsTable from '../components/leads/LeadsTable';
 import { Users, MessageSquare, TrendingUp, AlertCircle } from 'lucide-react';
 
 const LeadsPage = () => {
   const { data: statsData, isLoading, error } = useLeadStats();
+  useLeadStream();
 
   const stats = statsData?.data || {};
 
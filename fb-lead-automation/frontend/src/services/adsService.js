@@ -2,8 +2,8 @@ import api from './api';
 
 const adsService = {
   /**
-   * Get all ads with optional filtering
-   * @param {Object} params - Query parameters
+   * Get a page of ads with optional filtering
+   * @param {Object} params - Query parameters (filters, sort, limit, cursor)
    * @returns {Promise}
    */
   getAll: async (params = {}) => {
@@ -39,6 +39,16 @@ const adsService = {
     const response = await api.delete(`/api/ads/${id}`);
     return response.data;
   },
+
+  /**
+   * Delete many ads in one request
+   * @param {Array<number>} ids - Ad IDs
+   * @returns {Promise}
+   */
+  bulkDelete: async (ids) => {
+    const response = await api.post('/api/ads/bulk-delete', { ids });
+    return response.data;
+  },
 };
 
 export default adsService;
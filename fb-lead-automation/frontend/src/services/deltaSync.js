@@ -0,0 +1,15 @@
+/**
+ * Merge a `?since=` delta into a previously fetched listing response
+ * @param {Object} previous - Earlier response ({ data, version })
+ * @param {Object} delta - Delta response ({ data, deleted, version })
+ * @param {Function} compare - Sort order of the listing
+ * @returns {Object} Response shaped like the full listing
+ */
+export const applyDelta = (previous, delta, compare) => {
+  const rows = new Map(previous.data.map((row) => [row.id, row]));
+  delta.deleted.forEach((id) => rows.delete(id));
+  delta.data.forEach((row) => rows.set(row.id, row));
+
+  const data = [...rows.values()].sort(compare);
+  return { ...previous, data, count: data.length, version: delta.version };
+};
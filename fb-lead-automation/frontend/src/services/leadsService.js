@@ -1,9 +1,15 @@
 import api from './api';
 
+const LEAD_EVENTS = ['lead.created', 'message.sent', 'message.failed'];
+
+// Reconnect delay after the server refused a stream (matches its Retry-After)
+const STREAM_RETRY_MS = 30000;
+
 const leadsService = {
   /**
    * Get all leads with pagination
-   * @param {Object} params - Query parameters (page, per_page)
+   * @param {Object} params - Query parameters (page, per_page, ad_id, campaign_id,
+   *   status, created_from, created_to)
    * @returns {Promise}
    */
   getAll: async (params = {}) => {
@@ -29,6 +35,53 @@ const leadsService = {
     const response = await api.get('/api/leads/stats');
     return response.data;
   },
+
+  /**
+   * Build the URL of a streamed lead export
+   * @param {Object} params - Export parameters (format, fields, ad_id, created_from, created_to)
+   * @returns {string}
+   */
+  getExportUrl: (params = {}) => {
+    const query = new URLSearchParams(params).toString();
+    return `${api.defaults.baseURL}/api/leads/export${query ? `?${query}` : ''}`;
+  },
+
+  /**
+   * Subscribe to lead and message events (Server-Sent Events)
+   * @param {Function} onEvent - Called with (type, data) for each event
+   * @returns {Function} Unsubscribe function
+   */
+  subscribe: (onEvent) => {
+    let source;
+    let retryTimer;
+    let lastEventId;
+    let closed = false;
+
+    const connect = () => {
+      const query = lastEventId ? `?last_event_id=${lastEventId}` : '';
+      source = new EventSource(`${api.defaults.baseURL}/api/leads/stream${query}`);
+      LEAD_EVENTS.forEach((type) => {
+        source.addEventListener(type, (event) => {
+          lastEventId = event.lastEventId;
+          onEvent(type, JSON.parse(event.data));
+        });
+      });
+      source.onerror = () => {
+        // The browser retries dropped streams itself but gives up on error
+        // responses, e.g. 503 when the server's stream limit is reached
+        if (!closed && source.readyState === EventSource.CLOSED) {
+          retryTimer = setTimeout(connect, STREAM_RETRY_MS);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source.close();
+    };
+  },
 };
 
 export default leadsService;
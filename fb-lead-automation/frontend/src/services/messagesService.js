@@ -2,11 +2,12 @@ import api from './api';
 
 const messagesService = {
   /**
-   * Get all message templates
+   * Get all message templates, or the changes since a version
+   * @param {Object} params - Query parameters (since)
    * @returns {Promise}
    */
-  getAll: async () => {
-    const response = await api.get('/api/messages');
+  getAll: async (params = {}) => {
+    const response = await api.get('/api/messages', { params });
     return response.data;
   },
 
@@ -61,6 +62,27 @@ const messagesService = {
     const response = await api.post(`/api/messages/${id}/preview`, { lead_data: leadData });
     return response.data;
   },
+
+  /**
+   * Create or update templates for many ads in one request
+   * @param {Array} templates - Template data, each with an ad_id
+   * @param {boolean} overwrite - Update ads that already have a template
+   * @returns {Promise}
+   */
+  bulkUpsert: async (templates, overwrite = true) => {
+    const response = await api.post('/api/messages/bulk', { templates, overwrite });
+    return response.data;
+  },
+
+  /**
+   * Apply one template to every ad of a campaign or ad set
+   * @param {Object} data - campaign_id or adset_id plus template fields
+   * @returns {Promise}
+   */
+  applyToGroup: async (data) => {
+    const response = await api.post('/api/messages/apply', data);
+    return response.data;
+  },
 };
 
 export default messagesService;